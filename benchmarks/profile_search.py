@@ -0,0 +1,92 @@
+"""Measure search_profiles latency on a large SQLite profile table.
+
+    python -m benchmarks.profile_search --profiles 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+
+# A long-tailed vocabulary, roughly what a hackathon server ends up with
+SKILLS = [f"skill{i}" for i in range(400)] + [
+    "python", "javascript", "react", "design", "rust", "go", "sql",
+    "machine learning", "devops", "figma", "java", "tensorflow",
+]
+INTERESTS = [f"interest{i}" for i in range(200)] + [
+    "ai", "gaming", "climate", "health", "fintech", "education", "music",
+]
+
+
+def seed(database, profiles, rng):
+    with database.get_connection() as conn, database._transaction(conn):
+        cursor = conn.cursor()
+        for i in range(profiles):
+            picked = rng.sample(SKILLS, 4)
+            if rng.random() < 0.3 and "python" not in picked:
+                picked.append("python")  # one very common tag
+            skills = ", ".join(picked)
+            interests = ", ".join(rng.sample(INTERESTS, 2))
+            cursor.execute(
+                "INSERT INTO profiles (discord_id, discord_username, name, skills, interests) VALUES (?, ?, ?, ?, ?)",
+                (str(i), f"user{i}", f"User {i}", skills, interests)
+            )
+            database._write_profile_tags(cursor, str(i), skills, interests)
+
+
+def measure(label, func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p95 = timings[int(len(timings) * 0.95)] * 1000
+    print(f"{label:<34} p50 {p50:7.3f}ms   p95 {p95:7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        Config.DATABASE_PATH = f"{BENCH_DIR}/search.db"
+        database = Database()
+        seed(database, args.profiles, rng)
+        print(f"{args.profiles} profiles")
+
+        measure("single skill", lambda: database.search_profiles(
+            skills=rng.choice(SKILLS)), args.iterations)
+        measure("two skills (union)", lambda: database.search_profiles(
+            skills=", ".join(rng.sample(SKILLS, 2))), args.iterations)
+        measure("skill + interest (intersection)", lambda: database.search_profiles(
+            skills=rng.choice(SKILLS), interests=rng.choice(INTERESTS)), args.iterations)
+        measure("common skill", lambda: database.search_profiles(
+            skills="python"), args.iterations)
+        measure("common skill + interest", lambda: database.search_profiles(
+            skills="python", interests=rng.choice(INTERESTS)), args.iterations)
+        measure("no match", lambda: database.search_profiles(
+            skills="cobol"), args.iterations)
+        database.close()
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare ORDER BY RANDOM() with sampler-backed get_random_profiles.
+
+    python -m benchmarks.random_profiles --profiles 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+
+
+def seed(database, profiles):
+    with database.get_connection() as conn, database._transaction(conn):
+        conn.executemany(
+            "INSERT INTO profiles (discord_id, discord_username, name, skills, interests) VALUES (?, ?, ?, ?, ?)",
+            ((str(i), f"user{i}", f"User {i}", "python, rust", "ai") for i in range(profiles))
+        )
+
+
+def order_by_random(database, count):
+    with database.get_connection(readonly=True) as conn:
+        rows = conn.execute("SELECT * FROM profiles ORDER BY RANDOM() LIMIT ?", (count,)).fetchall()
+        return [database._row_to_dict(row) for row in rows]
+
+
+def measure(label, func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p95 = timings[int(len(timings) * 0.95)] * 1000
+    print(f"{label:<34} p50 {p50:7.3f}ms   p95 {p95:7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        Config.DATABASE_PATH = f"{BENCH_DIR}/random.db"
+        database = Database()
+        seed(database, args.profiles)
+        print(f"{args.profiles} profiles, {args.count} per call")
+
+        start = time.perf_counter()
+        database._get_profile_ids()
+        print(f"{'sampler warm-up (once)':<34} {(time.perf_counter() - start) * 1000:7.3f}ms")
+
+        measure("ORDER BY RANDOM()", lambda: order_by_random(database, args.count), args.iterations)
+        # Drop cached rows between calls so every sample hits the database
+        measure("get_random_profiles (cold cache)", lambda: (
+            database.profile_cache.clear(),
+            database.get_random_profiles(args.count, exclude=str(random.randrange(args.profiles)))
+        ), args.iterations)
+        measure("get_random_profiles", lambda: database.get_random_profiles(
+            args.count, exclude=str(random.randrange(args.profiles))), args.iterations)
+        database.close()
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
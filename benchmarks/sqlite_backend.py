@@ -0,0 +1,128 @@
+"""Compare the legacy connect-per-call SQLite access with the WAL backend.
+
+Runs a mixed /find-style workload (mostly profile reads and searches, some
+upserts) from several threads against both implementations and prints ops/sec
+and read latency percentiles.
+
+    python -m benchmarks.sqlite_backend --threads 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+
+SKILLS = ["python", "react", "design", "rust", "go", "sql", "ml", "devops", "figma", "java"]
+INTERESTS = ["ai", "gaming", "climate", "health", "fintech", "education", "music"]
+
+
+class LegacyDatabase(Database):
+    """The pre-WAL access pattern: one lock, a fresh connection per call."""
+
+    @contextmanager
+    def get_connection(self, readonly=False):
+        self.lock.acquire()
+        conn = None
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            yield conn
+        finally:
+            if conn is not None:
+                conn.close()
+            self.lock.release()
+
+
+def make_database(cls, path):
+    Config.DATABASE_PATH = path
+    return cls()
+
+
+def seed(database, profiles):
+    for i in range(profiles):
+        database.upsert_profile(
+            str(i), f"user{i}", f"User {i}",
+            ", ".join(random.sample(SKILLS, 3)),
+            ", ".join(random.sample(INTERESTS, 2))
+        )
+
+
+def run_workload(database, profiles, threads, seconds, write_ratio):
+    stop = time.monotonic() + seconds
+    counts = [0] * threads
+    read_latencies = [[] for _ in range(threads)]
+
+    def worker(index):
+        rng = random.Random(index)
+        while time.monotonic() < stop:
+            roll = rng.random()
+            if roll < write_ratio:
+                i = rng.randrange(profiles)
+                database.upsert_profile(
+                    str(i), f"user{i}", f"User {i}",
+                    ", ".join(rng.sample(SKILLS, 3)), ", ".join(rng.sample(INTERESTS, 2))
+                )
+            else:
+                start = time.perf_counter()
+                if roll < 0.6:
+                    database.get_profile(str(rng.randrange(profiles)))
+                else:
+                    database.search_profiles(skills=rng.choice(SKILLS), page_size=10)
+                read_latencies[index].append(time.perf_counter() - start)
+            counts[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    latencies = sorted(l for per_thread in read_latencies for l in per_thread)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return sum(counts) / seconds, pct(0.50), pct(0.95), pct(0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        print(f"{'backend':<10} {'ops/sec':>10} {'read p50':>10} {'read p95':>10} {'read p99':>10}")
+        for label, cls in (("legacy", LegacyDatabase), ("wal", Database)):
+            database = make_database(cls, f"{BENCH_DIR}/{label}.db")
+            seed(database, args.profiles)
+            ops, p50, p95, p99 = run_workload(
+                database, args.profiles, args.threads, args.seconds, args.write_ratio
+            )
+            database.close()
+            print(f"{label:<10} {ops:>10.0f} {p50:>8.2f}ms {p95:>8.2f}ms {p99:>8.2f}ms")
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Time auto_form_teams on a large set of profiles without a team.
+
+    python -m benchmarks.team_formation --profiles 10000 --team-size 4
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import time
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+from benchmarks.profile_search import seed  # noqa: E402
+
+
+def report(label, score):
+    print(
+        f"  {label:<8} skills/team {score['coverage']:5.2f} (min {score['min_coverage']})"
+        f"   overlap {score['redundancy']:5.1%}   shared interest {score['shared_interest_rate']:5.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--team-size", type=int, default=4)
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        Config.DATABASE_PATH = f"{BENCH_DIR}/formation.db"
+        database = Database()
+        seed(database, args.profiles, random.Random(42))
+
+        start = time.perf_counter()
+        preview = database.auto_form_teams(args.team_size)
+        print(f"preview: {len(preview['teams'])} teams in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        start = time.perf_counter()
+        created = database.create_formed_teams(
+            [[member["discord_id"] for member in team] for team in preview["teams"]]
+        )
+        print(f"write:   {len(created)} teams in {(time.perf_counter() - start) * 1000:.0f}ms")
+        report("greedy", preview["score"])
+        report("random", preview["score"]["baseline"])
+
+        leftover = database.auto_form_teams(args.team_size)["unassigned"]
+        database.close()
+        if leftover > 1:
+            print(f"FAILED: {leftover} profiles still without a team")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure recommend_teammates latency over a large SQLite profile table.
+
+    python -m benchmarks.teammate_recommendations --profiles 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import time
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+from benchmarks.profile_search import seed  # noqa: E402
+
+
+def seed_teams(database, profiles, rng):
+    """Put about a third of the profiles into teams of one to TEAM_MAX_SIZE members."""
+    with database.get_connection() as conn, database._transaction(conn):
+        cursor = conn.cursor()
+        ids = rng.sample(range(profiles), profiles // 3)
+        team = 0
+        while ids:
+            size = rng.randint(1, Config.TEAM_MAX_SIZE)
+            members, ids = ids[:size], ids[size:]
+            team += 1
+            cursor.execute(
+                "INSERT INTO teams (name, code, owner_id) VALUES (?, ?, ?)",
+                (f"Team {team}", f"BENCH{team:06d}", str(members[0]))
+            )
+            team_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (?, ?, ?)",
+                [(team_id, str(member), f"user{member}") for member in members]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        Config.DATABASE_PATH = f"{BENCH_DIR}/recommend.db"
+        database = Database()
+        seed(database, args.profiles, rng)
+        seed_teams(database, args.profiles, rng)
+        print(f"{args.profiles} profiles")
+
+        start = time.perf_counter()
+        database.recommender.current()
+        print(f"index build                        {(time.perf_counter() - start) * 1000:7.1f}ms")
+
+        timings = []
+        for _ in range(args.iterations):
+            user = str(rng.randrange(args.profiles))
+            start = time.perf_counter()
+            results = database.recommend_teammates(user, limit=args.limit)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p95 = timings[int(len(timings) * 0.95)] * 1000
+        p99 = timings[int(len(timings) * 0.99)] * 1000
+        print(f"recommend_teammates (top {args.limit})        p50 {p50:7.3f}ms   p95 {p95:7.3f}ms   p99 {p99:7.3f}ms")
+        print(f"sample: {[(r['discord_id'], round(r['score'], 2), r['brings'][:3]) for r in results]}")
+        database.close()
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Race simultaneous volunteer joins against a capped task and check the cap holds.
+
+    python -m benchmarks.volunteer_joins --joins 500 --cap 100 [--batch]
+"""
+import argparse
+import asyncio
+import collections
+import os
+import shutil
+import sys
+import time
+
+BENCH_DIR = "data/bench"
+
+# Point both singletons at scratch files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{BENCH_DIR}/import.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{BENCH_DIR}/import_email.db"
+
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+from bot.core.async_database import AsyncDatabase  # noqa: E402
+
+
+async def race(async_database, task_id, users):
+    return await asyncio.gather(*[
+        async_database.join_volunteer_task(task_id, user, f"user{user}") for user in users
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--joins", type=int, default=500)
+    parser.add_argument("--cap", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=Config.DATABASE_EXECUTOR_WORKERS)
+    parser.add_argument("--batch", action="store_true", help="route joins through the write batcher")
+    args = parser.parse_args()
+
+    shutil.rmtree(BENCH_DIR, ignore_errors=True)
+    try:
+        Config.DATABASE_PATH = f"{BENCH_DIR}/joins.db"
+        Config.WRITE_BATCH_ENABLED = args.batch
+        database = Database()
+        async_database = AsyncDatabase(database, args.workers, name="bench")
+
+        # One caller in ten double-clicks: a user already in the list joins again at the same time
+        duplicates = args.joins // 10
+        users = [str(i) for i in range(args.joins - duplicates)]
+        users += users[::10][:duplicates]
+
+        task_id = database.create_volunteer_task("Bench task", "0", "creator", max_volunteers=args.cap)
+        start = time.perf_counter()
+        outcomes = asyncio.run(race(async_database, task_id, users))
+        elapsed = time.perf_counter() - start
+
+        counts = collections.Counter(outcomes)
+        participants = len(database.get_volunteer_participants(task_id))
+        mode = "batched" if args.batch else "unbatched"
+        print(f"{args.joins} simultaneous joins, cap {args.cap}, {mode}: {elapsed * 1000:.1f}ms")
+        for outcome, count in sorted(counts.items()):
+            print(f"  {outcome:<10} {count}")
+        print(f"  participants stored: {participants}")
+
+        async_database.shutdown()
+        database.close()
+        if participants != min(args.cap, len(set(users))) or counts[Database.JOIN_JOINED] != participants:
+            print("FAILED: capacity was not respected")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from bot.core.database import db
-from bot.utils.embed import search_results_embed, info_embed, error_embed, PaginationView
+from bot.core.database import async_db, Database
+from bot.utils.embed import (
+    search_results_embed, teammate_recommendations_embed, team_search_results_embed,
+    info_embed, error_embed, KeysetPaginationView
+)
 from bot.utils.error_handler import (
     error_handler, defer_response, safe_send_response, 
     ValidationError, cooldown
@@ -53,14 +56,13 @@ class SearchFiltersView(discord.ui.View):
     @discord.ui.button(label="📊 Browse All", style=discord.ButtonStyle.secondary)
     async def browse_all(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            # Get all profiles with pagination
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM profiles ORDER BY updated_at DESC LIMIT 50")
-                rows = cursor.fetchall()
-                results = [db._row_to_dict(row) for row in rows]
+            view = KeysetPaginationView(
+                lambda after, size: async_db.list_profiles(page_size=size, after=after),
+                lambda rows, page: self._create_page_embed(rows, "All Profiles", page)
+            )
+            embed = await view.load()
             
-            if not results:
+            if not view.rows:
                 embed = info_embed(
                     "No Profiles Found",
                     "No profiles have been created yet. Be the first to create one with `/register-profile`!"
@@ -68,14 +70,7 @@ class SearchFiltersView(discord.ui.View):
                 await interaction.response.edit_message(embed=embed, view=None)
                 return
             
-            # Create paginated results
-            embeds = self._create_paginated_embeds(results, "All Profiles")
-            
-            if len(embeds) == 1:
-                await interaction.response.edit_message(embed=embeds[0], view=None)
-            else:
-                view = PaginationView(embeds)
-                await interaction.response.edit_message(embed=embeds[0], view=view)
+            await interaction.response.edit_message(embed=embed, view=None if view.single_page else view)
                 
         except Exception as e:
             logging.getLogger(__name__).error(f"Browse all error: {e}")
@@ -88,13 +83,29 @@ class SearchFiltersView(discord.ui.View):
     async def _perform_search(self, interaction: discord.Interaction):
         """Perform search with current filters."""
         try:
-            results = db.search_profiles(
-                skills=self.skills_filter,
-                interests=self.interests_filter,
-                limit=50  # Get more results for pagination
+            # Build the title up front so every page shares it
+            search_type = "Search Results"
+            if self.skills_filter and self.interests_filter:
+                search_type = f"Skills: {self.skills_filter[:20]}... & Interests: {self.interests_filter[:20]}..."
+            elif self.skills_filter:
+                search_type = f"Skills: {self.skills_filter}"
+            elif self.interests_filter:
+                search_type = f"Interests: {self.interests_filter}"
+            
+            # Pin the filters so later pages don't change if they are edited mid-browse
+            skills, interests = self.skills_filter, self.interests_filter
+            view = KeysetPaginationView(
+                lambda after, size: async_db.search_profiles(
+                    skills=skills,
+                    interests=interests,
+                    page_size=size,
+                    after=after
+                ),
+                lambda rows, page: self._create_page_embed(rows, search_type, page)
             )
+            embed = await view.load()
             
-            if not results:
+            if not view.rows:
                 search_terms = []
                 if self.skills_filter:
                     search_terms.append(f"Skills: {self.skills_filter}")
@@ -113,22 +124,7 @@ class SearchFiltersView(discord.ui.View):
                 await interaction.response.edit_message(embed=embed, view=None)
                 return
             
-            # Create paginated results
-            search_type = "Search Results"
-            if self.skills_filter and self.interests_filter:
-                search_type = f"Skills: {self.skills_filter[:20]}... & Interests: {self.interests_filter[:20]}..."
-            elif self.skills_filter:
-                search_type = f"Skills: {self.skills_filter}"
-            elif self.interests_filter:
-                search_type = f"Interests: {self.interests_filter}"
-            
-            embeds = self._create_paginated_embeds(results, search_type)
-            
-            if len(embeds) == 1:
-                await interaction.response.edit_message(embed=embeds[0], view=None)
-            else:
-                view = PaginationView(embeds)
-                await interaction.response.edit_message(embed=embeds[0], view=view)
+            await interaction.response.edit_message(embed=embed, view=None if view.single_page else view)
                 
         except Exception as e:
             logging.getLogger(__name__).error(f"Search error: {e}")
@@ -138,23 +134,12 @@ class SearchFiltersView(discord.ui.View):
             )
             await interaction.response.edit_message(embed=embed, view=None)
     
-    def _create_paginated_embeds(self, results: List[Dict[str, Any]], search_type: str) -> List[discord.Embed]:
-        """Create paginated embeds for search results."""
-        embeds = []
-        results_per_page = 5
-        
-        for i in range(0, len(results), results_per_page):
-            page_results = results[i:i + results_per_page]
-            page_num = (i // results_per_page) + 1
-            total_pages = (len(results) + results_per_page - 1) // results_per_page
-            
-            embed = search_results_embed(page_results)
-            embed.title = f"🔍 {search_type}"
-            embed.description = f"Found **{len(results)}** profiles • Page {page_num}/{total_pages}"
-            
-            embeds.append(embed)
-        
-        return embeds
+    def _create_page_embed(self, results: List[Dict[str, Any]], search_type: str, page_num: int) -> discord.Embed:
+        """Create the embed for one page of search results."""
+        embed = search_results_embed(results)
+        embed.title = f"🔍 {search_type}"
+        embed.description = f"Page {page_num}"
+        return embed
 
 class SearchModal(discord.ui.Modal):
     """Modal for single search input."""
@@ -223,8 +208,13 @@ class FindCog(commands.Cog):
     @app_commands.describe(
         skills="Skills to search for (comma separated, optional)",
         interests="Interests to search for (comma separated, optional)",
-        limit="Number of results to show (1-20, default: 10)"
+        limit="Number of results to show (1-20, default: 10)",
+        mode="How to match your terms (default: exact tags)"
     )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Tags (exact skill names)", value="tags"),
+        app_commands.Choice(name="Full text (phrases and prefixes, ranked)", value="fulltext")
+    ])
     @error_handler("find")
     @cooldown(3)  # 3 second cooldown
     async def find_command(
@@ -232,7 +222,8 @@ class FindCog(commands.Cog):
         interaction: discord.Interaction,
         skills: str = "",
         interests: str = "",
-        limit: app_commands.Range[int, 1, 20] = 10
+        limit: app_commands.Range[int, 1, 20] = 10,
+        mode: str = "tags"
     ):
         await defer_response(interaction, ephemeral=True)
         
@@ -264,11 +255,12 @@ class FindCog(commands.Cog):
             raise ValidationError("Interests search term is too long (max 200 characters)")
         
         # Perform search
+        search = async_db.search_profiles_fulltext if mode == "fulltext" else async_db.search_profiles
         try:
-            results = db.search_profiles(
+            results = await search(
                 skills=skills.strip() if skills else None,
                 interests=interests.strip() if interests else None,
-                limit=min(limit, 20)  # Cap at 20 for performance
+                page_size=min(limit, 20)  # Cap at 20 for performance
             )
         except Exception as e:
             self.logger.error(f"Database search error: {e}")
@@ -298,7 +290,7 @@ class FindCog(commands.Cog):
             )
             
             # Add suggestion to create profile if user doesn't have one
-            user_profile = db.get_profile(str(interaction.user.id))
+            user_profile = await async_db.get_profile(str(interaction.user.id))
             if not user_profile:
                 embed.add_field(
                     name="🚀 Get Started",
@@ -320,6 +312,8 @@ class FindCog(commands.Cog):
             search_context.append(f"Interests: {interests}")
         
         embed.description = f"Found **{len(results)}** profiles matching: {', '.join(search_context)}"
+        if mode == "fulltext":
+            embed.description += " • ranked by relevance"
         
         # Add helpful footer
         if len(results) == limit:
@@ -344,17 +338,11 @@ class FindCog(commands.Cog):
     ):
         await defer_response(interaction, ephemeral=True)
         
+        user_id = str(interaction.user.id)
         try:
-            # Get random profiles
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                if db.mode == "postgres":
-                    cursor.execute("SELECT * FROM profiles ORDER BY RANDOM() LIMIT %s", (count,))
-                else:
-                    cursor.execute("SELECT * FROM profiles ORDER BY RANDOM() LIMIT ?", (count,))
-                
-                rows = cursor.fetchall()
-                results = [db._row_to_dict(row) for row in rows]
+            # Get random profiles, never including the caller's own
+            results = await async_db.get_random_profiles(count, exclude=user_id)
+            own_profile = None if results else await async_db.get_profile(user_id)
         
         except Exception as e:
             self.logger.error(f"Random search error: {e}")
@@ -366,7 +354,7 @@ class FindCog(commands.Cog):
             await safe_send_response(interaction, embed=embed, ephemeral=True)
             return
         
-        if not results:
+        if not results and own_profile is None:
             embed = info_embed(
                 "No Profiles Available",
                 "No profiles have been created yet.",
@@ -375,10 +363,6 @@ class FindCog(commands.Cog):
             await safe_send_response(interaction, embed=embed, ephemeral=True)
             return
         
-        # Remove self from results if present
-        user_id = str(interaction.user.id)
-        results = [r for r in results if r['discord_id'] != user_id]
-        
         if not results:
             embed = info_embed(
                 "Only Your Profile Found",
@@ -400,5 +384,100 @@ class FindCog(commands.Cog):
         await safe_send_response(interaction, embed=embed, ephemeral=True)
         self.logger.info(f"Random discovery by {interaction.user.name}: {len(results)} profiles")
 
+    @app_commands.command(
+        name="recommend-teammates",
+        description="Get teammate suggestions that complement your skills"
+    )
+    @app_commands.describe(
+        count="Number of suggestions to show (1-10, default: 5)"
+    )
+    @error_handler("recommend-teammates")
+    @cooldown(5)
+    async def recommend_teammates(
+        self,
+        interaction: discord.Interaction,
+        count: app_commands.Range[int, 1, 10] = 5
+    ):
+        await defer_response(interaction, ephemeral=True)
+
+        results = await async_db.recommend_teammates(str(interaction.user.id), limit=count)
+        if results is None:
+            embed = info_embed(
+                "Profile Required",
+                "Recommendations are based on your skills and interests.",
+                "Create your profile with `/register-profile` first!"
+            )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        if not results:
+            embed = info_embed(
+                "No Recommendations Yet",
+                "Nobody outside a full team has skills that complement yours right now.",
+                "Add more skills and interests with `/edit-profile`, or check back as more people register."
+            )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        embed = teammate_recommendations_embed(results)
+        embed.add_field(
+            name="💡 Next Step",
+            value="Reach out, then share your team code from `/view-team` so they can `/join-team`!",
+            inline=False
+        )
+        await safe_send_response(interaction, embed=embed, ephemeral=True)
+        self.logger.info(f"Teammate recommendations for {interaction.user.name}: {len(results)} results")
+
+    @app_commands.command(
+        name="find-team",
+        description="Find open teams that are looking for your skills"
+    )
+    @app_commands.describe(
+        skills="Skills you can offer (comma separated)"
+    )
+    @error_handler("find-team")
+    @cooldown(3)
+    async def find_team(self, interaction: discord.Interaction, skills: str):
+        await defer_response(interaction, ephemeral=True)
+
+        if len(skills) > 200:
+            raise ValidationError("Skills search term is too long (max 200 characters)")
+        skills = skills.strip()
+
+        view = KeysetPaginationView(
+            lambda after, size: async_db.find_teams(skills, page_size=size, after=after),
+            lambda rows, page: team_search_results_embed(rows, skills, page),
+            key=Database.team_page_key
+        )
+        try:
+            embed = await view.load()
+        except Exception as e:
+            self.logger.error(f"Team search error: {e}")
+            embed = error_embed(
+                "Search Failed",
+                "Database error occurred while searching for teams.",
+                "Please try again in a few moments."
+            )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        if not view.rows:
+            embed = info_embed(
+                "No Open Teams Found",
+                f"No open team is looking for: {skills}"
+            )
+            embed.add_field(
+                name="💡 Try These Tips",
+                value="• Use common skill names (e.g., 'Python', 'Designer')\n• List several skills separated by commas\n• Start your own team with `/create-team`",
+                inline=False
+            )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        await safe_send_response(
+            interaction, embed=embed, view=None if view.single_page else view, ephemeral=True
+        )
+        self.logger.info(f"Team search by {interaction.user.name}: {len(view.rows)} teams on first page")
+
 async def setup(bot):
     await bot.add_cog(FindCog(bot))
\ No newline at end of file
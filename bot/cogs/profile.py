@@ -1,12 +1,13 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
-from bot.core.database import db
+from discord.ext import commands, tasks
+from config import Config
+from bot.core.database import async_db
 from bot.utils import validation
 from bot.utils.embed import profile_embed, success_embed, error_embed, info_embed, ConfirmationView
 from bot.utils.error_handler import (
     error_handler, defer_response, safe_send_response,
-    ProfileNotFoundError, ValidationError, DatabaseError, cooldown
+    ProfileNotFoundError, ValidationError, DatabaseError, cooldown, get_context
 )
 import logging
 
@@ -92,7 +93,7 @@ class ProfileRegistrationModal(discord.ui.Modal, title="👤 Create Your Profile
             discord_username = interaction.user.name
             
             # Check if profile already exists
-            existing_profile = db.get_profile(discord_id)
+            existing_profile = await async_db.get_profile(discord_id)
             if existing_profile:
                 embed = info_embed(
                     "Profile Already Exists",
@@ -103,7 +104,7 @@ class ProfileRegistrationModal(discord.ui.Modal, title="👤 Create Your Profile
             
             # Create profile
             try:
-                db.upsert_profile(
+                await async_db.upsert_profile(
                     discord_id,
                     discord_username,
                     validated_name,
@@ -219,7 +220,7 @@ class ProfileEditModal(discord.ui.Modal, title="✏️ Edit Your Profile"):
             
             # Update profile
             try:
-                db.upsert_profile(
+                await async_db.upsert_profile(
                     discord_id,
                     discord_username,
                     validated_name,
@@ -274,7 +275,7 @@ class ProfileActionView(discord.ui.View):
             return
         
         # Get current profile data
-        current_profile = db.get_profile(self.user_id)
+        current_profile = await async_db.get_profile(self.user_id)
         if not current_profile:
             await interaction.response.send_message(
                 "❌ Profile not found!", ephemeral=True
@@ -284,42 +285,32 @@ class ProfileActionView(discord.ui.View):
         modal = ProfileEditModal(current_profile)
         await interaction.response.send_modal(modal)
     
-    @discord.ui.button(label="🔍 Find Similar", style=discord.ButtonStyle.secondary)
-    async def find_similar(self, interaction: discord.Interaction, button: discord.ui.Button):
+    @discord.ui.button(label="🤝 Find Teammates", style=discord.ButtonStyle.secondary)
+    async def find_teammates(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            profile = db.get_profile(self.user_id)
-            if not profile:
+            # Complementary skills and shared interests, not clones of this profile
+            results = await async_db.recommend_teammates(self.user_id, limit=5)
+            if results is None:
                 await interaction.response.send_message(
                     "❌ Profile not found!", ephemeral=True
                 )
                 return
             
-            # Search for similar profiles based on skills and interests
-            results = db.search_profiles(
-                skills=profile.get('skills', ''),
-                interests=profile.get('interests', ''),
-                limit=5
-            )
-            
-            # Remove self from results
-            results = [r for r in results if r['discord_id'] != self.user_id]
-            
             if not results:
                 embed = info_embed(
-                    "No Similar Profiles Found",
-                    "Try adding more skills or interests to find people with similar backgrounds!"
+                    "No Teammates Found",
+                    "Try adding more skills or interests to find people who complement you!"
                 )
             else:
-                from bot.utils.embed import search_results_embed
-                embed = search_results_embed(results)
-                embed.title = "🔍 People Similar to You"
+                from bot.utils.embed import teammate_recommendations_embed
+                embed = teammate_recommendations_embed(results)
             
             await interaction.response.send_message(embed=embed, ephemeral=True)
             
         except Exception as e:
-            logging.getLogger(__name__).error(f"Find similar error: {e}")
+            logging.getLogger(__name__).error(f"Find teammates error: {e}")
             await interaction.response.send_message(
-                "❌ Failed to find similar profiles.", ephemeral=True
+                "❌ Failed to find teammates.", ephemeral=True
             )
     
     @discord.ui.button(label="🗑️ Delete Profile", style=discord.ButtonStyle.danger)
@@ -344,12 +335,7 @@ class ProfileActionView(discord.ui.View):
         if view.confirmed:
             try:
                 # Delete profile from database
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    query = "DELETE FROM profiles WHERE discord_id = %s" if db.mode == "postgres" else "DELETE FROM profiles WHERE discord_id = ?"
-                    cursor.execute(query, (self.user_id,))
-                    if db.mode == "sqlite":
-                        conn.commit()
+                await async_db.delete_profile(self.user_id)
                 
                 embed = success_embed(
                     "Profile Deleted",
@@ -372,6 +358,24 @@ class ProfileCog(commands.Cog):
         self.bot = bot
         self.logger = bot.logger
 
+    async def cog_load(self):
+        self.reconcile_stats.start()
+
+    async def cog_unload(self):
+        self.reconcile_stats.cancel()
+
+    @tasks.loop(minutes=Config.PROFILE_STATS_RECONCILE_MINUTES)
+    async def reconcile_stats(self):
+        """Periodically recount the /profile-stats counters to correct any drift."""
+        try:
+            await async_db.reconcile_profile_stats()
+        except Exception as e:
+            self.logger.error(f"Profile stats reconcile failed: {e}")
+
+    @reconcile_stats.before_loop
+    async def before_reconcile_stats(self):
+        await self.bot.wait_until_ready()
+
     @app_commands.command(
         name="register-profile",
         description="Create your profile to connect with other hackathon participants"
@@ -381,7 +385,7 @@ class ProfileCog(commands.Cog):
     async def register_profile(self, interaction: discord.Interaction):
         """Open profile registration modal."""
         # Check if profile already exists
-        existing_profile = db.get_profile(str(interaction.user.id))
+        existing_profile = await get_context(interaction).profile()
         if existing_profile:
             embed = info_embed(
                 "Profile Already Exists",
@@ -419,7 +423,7 @@ class ProfileCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         # Check if profile exists
-        profile = db.get_profile(str(interaction.user.id))
+        profile = await get_context(interaction).profile()
         if not profile:
             raise ProfileNotFoundError()
         
@@ -445,7 +449,7 @@ class ProfileCog(commands.Cog):
         target_user = user or interaction.user
         discord_id = str(target_user.id)
         
-        profile = db.get_profile(discord_id)
+        profile = await async_db.get_profile(discord_id)
         if not profile:
             if target_user == interaction.user:
                 raise ProfileNotFoundError()
@@ -501,35 +505,11 @@ class ProfileCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Get total profiles
-                cursor.execute("SELECT COUNT(*) FROM profiles")
-                total_profiles = cursor.fetchone()[0] if db.mode == "sqlite" else cursor.fetchone()["count"]
-                
-                # Get profiles with skills
-                cursor.execute("SELECT COUNT(*) FROM profiles WHERE skills IS NOT NULL AND skills != ''")
-                profiles_with_skills = cursor.fetchone()[0] if db.mode == "sqlite" else cursor.fetchone()["count"]
-                
-                # Get profiles with interests
-                cursor.execute("SELECT COUNT(*) FROM profiles WHERE interests IS NOT NULL AND interests != ''")
-                profiles_with_interests = cursor.fetchone()[0] if db.mode == "sqlite" else cursor.fetchone()["count"]
-                
-                # Get most common skills (simplified)
-                cursor.execute("SELECT skills FROM profiles WHERE skills IS NOT NULL AND skills != '' LIMIT 100")
-                skills_data = cursor.fetchall()
-                
-                skill_counts = {}
-                for row in skills_data:
-                    skills = row[0] if db.mode == "sqlite" else row["skills"]
-                    if skills:
-                        for skill in skills.split(','):
-                            skill = skill.strip().lower()
-                            if skill:
-                                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-                
-                top_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            stats = await async_db.get_profile_stats(top_n=5)
+            total_profiles = stats["total_profiles"]
+            profiles_with_skills = stats["profiles_with_skills"]
+            profiles_with_interests = stats["profiles_with_interests"]
+            top_skills = stats["top_skills"]
         
         except Exception as e:
             self.logger.error(f"Stats query error: {e}")
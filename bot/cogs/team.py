@@ -1,19 +1,25 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from bot.core.database import db
+from bot.core.database import Database, async_db
 from bot.utils.embed import (
     team_info_embed, success_embed, error_embed, info_embed, 
-    confirmation_embed, ConfirmationView
+    confirmation_embed, team_formation_embed, ConfirmationView
 )
 from bot.utils.error_handler import (
     error_handler, defer_response, safe_send_response,
     ProfileNotFoundError, TeamNotFoundError, ValidationError, DatabaseError,
     validate_profile_exists, validate_team_membership,
-    validate_team_ownership, cooldown
+    validate_team_ownership, get_context, cooldown
 )
+from config import Config
 import logging
 
+LEAVE_QUEUED = (
+    "Leave Queued",
+    "The database is briefly unavailable, so your leave was saved and will be applied once it's back."
+)
+
 class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
     """Modal for team creation with comprehensive information."""
     
@@ -47,7 +53,7 @@ class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
         
         self.looking_for = discord.ui.TextInput(
             label="🔍 Looking For (Optional)",
-            placeholder="What skills or team members are you looking for? (e.g., Designer, Backend Developer)",
+            placeholder="Skills you need, comma separated (e.g., Designer, Backend Developer)",
             required=False,
             max_length=200,
             style=discord.TextStyle.short
@@ -73,7 +79,7 @@ class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
         try:
             # Check if user already has a profile
             discord_id = str(interaction.user.id)
-            profile = db.get_profile(discord_id)
+            profile = await get_context(interaction).profile()
             if not profile:
                 await interaction.response.send_message(
                     "❌ You need to create a profile first! Use `/register-profile` to get started.",
@@ -81,21 +87,15 @@ class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
                 )
                 return
             
-            # Check if user is already in a team
-            existing_team = db.get_team_by_member(discord_id)
-            if existing_team:
-                await interaction.response.send_message(
-                    "❌ You're already in a team! Leave your current team first to create a new one.",
-                    ephemeral=True
-                )
-                return
-            
-            # Create team
+            # Create team; returns None if the user is already in one
             try:
-                team_id, team_code = db.create_team(
+                created = await async_db.create_team(
                     self.team_name.value,
                     discord_id,
-                    interaction.user.name
+                    interaction.user.name,
+                    description=self.team_description.value.strip(),
+                    project_idea=self.project_idea.value.strip(),
+                    looking_for=self.looking_for.value.strip()
                 )
             except Exception as e:
                 await interaction.response.send_message(
@@ -103,6 +103,14 @@ class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
                     ephemeral=True
                 )
                 return
+
+            if created is None:
+                await interaction.response.send_message(
+                    "❌ You're already in a team! Leave your current team first to create a new one.",
+                    ephemeral=True
+                )
+                return
+            team_id, team_code = created
             
             # Create success response
             embed = success_embed(
@@ -144,8 +152,12 @@ class TeamCreationModal(discord.ui.Modal, title="🏆 Create Your Team"):
                 inline=False
             )
             
-            # Get team data for the view
-            team_data = db.get_team_by_member(discord_id)
+            team_data = {
+                'id': team_id,
+                'name': self.team_name.value,
+                'code': team_code,
+                'owner_id': discord_id
+            }
             view = TeamManagementView(team_data, discord_id)
             
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
@@ -173,17 +185,22 @@ class TeamManagementView(discord.ui.View):
     @discord.ui.button(label="📋 View Members", style=discord.ButtonStyle.primary)
     async def view_members(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            members = db.get_team_members(self.team_data['id'])
+            snapshot = await get_context(interaction).team_snapshot()
+            if snapshot and snapshot["team"]["id"] == self.team_data['id']:
+                team, members = snapshot["team"], snapshot["members"]
+            else:
+                # Viewing a team the user has since left
+                team, members = self.team_data, await async_db.get_team_members(self.team_data['id'])
             
             embed = info_embed(
-                f"👥 {self.team_data['name']} - Members",
-                f"**Team Code:** `{self.team_data['code']}`"
+                f"👥 {team['name']} - Members",
+                f"**Team Code:** `{team['code']}`"
             )
             
             if members:
                 member_list = []
                 for i, member in enumerate(members, 1):
-                    role = "👑 Owner" if member['discord_id'] == self.team_data['owner_id'] else f"{i}. Member"
+                    role = "👑 Owner" if member['discord_id'] == team['owner_id'] else f"{i}. Member"
                     join_date = member['joined_at']
                     if hasattr(join_date, 'strftime'):
                         date_str = join_date.strftime("%b %d, %Y")
@@ -260,13 +277,15 @@ class TeamManagementView(discord.ui.View):
         await view.wait()
         if view.confirmed:
             try:
-                db.remove_team_member(self.user_id)
-                db.delete_team_if_empty(self.team_data['id'])
+                outcome = await async_db.leave_team(self.user_id, self.team_data['id'])
                 
-                embed = success_embed(
-                    "Left Team",
-                    f"You've successfully left **{self.team_data['name']}**."
-                )
+                if outcome == Database.LEAVE_QUEUED:
+                    embed = info_embed(*LEAVE_QUEUED)
+                else:
+                    embed = success_embed(
+                        "Left Team",
+                        f"You've successfully left **{self.team_data['name']}**."
+                    )
                 await interaction.edit_original_response(embed=embed, view=None)
                 
             except Exception as e:
@@ -308,7 +327,7 @@ class TeamManagementView(discord.ui.View):
         await view.wait()
         if view.confirmed:
             try:
-                db.delete_team(self.team_data['id'])
+                await async_db.delete_team(self.team_data['id'])
                 
                 embed = success_embed(
                     "Team Deleted",
@@ -344,44 +363,43 @@ class TransferOwnershipModal(discord.ui.Modal, title="🔄 Transfer Team Ownersh
     
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            # Find the user by username
-            guild = interaction.guild
-            new_owner_member = None
+            username = self.new_owner.value.strip().lstrip("@").lower()
             
-            # Try to find member by username
-            for member in guild.members:
-                if member.name.lower() == self.new_owner.value.lower():
-                    new_owner_member = member
-                    break
+            # Only team members can take over, so resolve against the (small) roster:
+            # the member index gives current usernames without scanning the guild
+            members = await async_db.get_team_members(self.team_id)
+            roster = {m['discord_id']: m for m in members}
+            in_guild = interaction.client.member_index.lookup(interaction.guild.id, username)
+            matches = [str(member_id) for member_id in in_guild if str(member_id) in roster]
+            if not in_guild:
+                # Username stored at join time, only for names the index hasn't seen;
+                # a name the index resolved to a non-member may have been taken over
+                matches = [m['discord_id'] for m in members if m['discord_username'].lower() == username]
             
-            if not new_owner_member:
-                embed = error_embed(
-                    "User Not Found",
-                    f"Could not find a user with username: {self.new_owner.value}",
-                    "Make sure the username is correct and the user is in this server."
-                )
+            if not matches:
+                if in_guild:
+                    embed = error_embed(
+                        "Not a Team Member",
+                        f"<@{next(iter(in_guild))}> is not a member of this team.",
+                        "Only current team members can become owners."
+                    )
+                else:
+                    embed = error_embed(
+                        "User Not Found",
+                        f"Could not find a user with username: {self.new_owner.value}",
+                        "Make sure the username is correct and the user is in this server."
+                    )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            new_owner_id = str(new_owner_member.id)
-            
-            # Check if new owner is a team member
-            members = db.get_team_members(self.team_id)
-            if not any(m['discord_id'] == new_owner_id for m in members):
-                embed = error_embed(
-                    "Not a Team Member",
-                    f"{new_owner_member.mention} is not a member of this team.",
-                    "Only current team members can become owners."
-                )
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return
+            new_owner_id = matches[0]
             
             # Transfer ownership
-            db.transfer_team_ownership(self.team_id, new_owner_id)
+            await async_db.transfer_team_ownership(self.team_id, new_owner_id)
             
             embed = success_embed(
                 "Ownership Transferred",
-                f"Team ownership has been transferred to {new_owner_member.mention}!"
+                f"Team ownership has been transferred to <@{new_owner_id}>!"
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
             
@@ -408,20 +426,16 @@ class TeamCog(commands.Cog):
     async def create_team(self, interaction: discord.Interaction):
         """Open team creation modal."""
         # Check if user is already in a team
-        current_team = db.get_team_by_member(str(interaction.user.id))
-        if current_team:
-            embed = error_embed(
-                "Already in Team",
-                f"You're already in team **{current_team['name']}**!",
-                "Leave your current team first with `/leave-team` or use the team management buttons."
-            )
+        snapshot = await get_context(interaction).team_snapshot()
+        if snapshot:
+            current_team = snapshot["team"]
             
             # Show current team info with management options
             team_data = {
                 'name': current_team['name'],
                 'code': current_team['code'],
                 'owner': current_team['owner_id'],
-                'members': [m['discord_username'] for m in db.get_team_members(current_team['id'])]
+                'members': [m['discord_username'] for m in snapshot["members"]]
             }
             
             team_embed = team_info_embed(team_data)
@@ -455,7 +469,8 @@ class TeamCog(commands.Cog):
         discord_username = interaction.user.name
         
         # Check if already in a team
-        current_team = db.get_team_by_member(discord_id)
+        context = get_context(interaction)
+        current_team = await context.team()
         if current_team:
             embed = error_embed(
                 "Already in Team",
@@ -466,7 +481,7 @@ class TeamCog(commands.Cog):
             return
         
         # Find team by code
-        team = db.get_team_by_code(code.strip().upper())
+        team = await async_db.get_team_by_code(code.strip().upper())
         if not team:
             embed = error_embed(
                 "Invalid Team Code",
@@ -477,7 +492,7 @@ class TeamCog(commands.Cog):
             return
         
         try:
-            db.add_team_member(team["id"], discord_id, discord_username)
+            await async_db.add_team_member(team["id"], discord_id, discord_username)
         except Exception as e:
             self.logger.error(f"Join team error: {e}")
             embed = error_embed(
@@ -489,14 +504,15 @@ class TeamCog(commands.Cog):
             return
         
         # Get updated team info
-        members = db.get_team_members(team["id"])
-        member_names = [m["discord_username"] for m in members]
+        context.invalidate("team")
+        snapshot = await context.team_snapshot()
+        members = snapshot["members"] if snapshot else []
         
         team_data = {
             'name': team['name'],
             'code': team['code'],
-            'owner': team['owner_id'],
-            'members': member_names
+            'owner': snapshot["owner_name"] if snapshot else team['owner_id'],
+            'members': [m["discord_username"] for m in members]
         }
         
         embed = team_info_embed(team_data)
@@ -527,21 +543,17 @@ class TeamCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         discord_id = str(interaction.user.id)
-        team = db.get_team_by_member(discord_id)
-        
-        # Get team members
-        members = db.get_team_members(team["id"])
-        member_names = [m["discord_username"] for m in members]
-        
-        # Get owner profile for display name
-        owner_profile = db.get_profile(team["owner_id"])
-        owner_name = owner_profile["name"] if owner_profile else team["owner_id"]
+        snapshot = await get_context(interaction).team_snapshot()
+        team = snapshot["team"]
         
         team_data = {
             'name': team['name'],
             'code': team['code'],
-            'owner': owner_name,
-            'members': member_names
+            'owner': snapshot["owner_name"],
+            'members': [m["discord_username"] for m in snapshot["members"]],
+            'description': team['description'],
+            'project_idea': team['project_idea'],
+            'looking_for': team['looking_for']
         }
         
         embed = team_info_embed(team_data)
@@ -570,7 +582,7 @@ class TeamCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         discord_id = str(interaction.user.id)
-        team = db.get_team_by_member(discord_id)
+        team = await get_context(interaction).team()
         
         # Check if user is team owner
         if team["owner_id"] == discord_id:
@@ -594,8 +606,12 @@ class TeamCog(commands.Cog):
         await view.wait()
         if view.confirmed:
             try:
-                db.remove_team_member(discord_id)
-                db.delete_team_if_empty(team["id"])
+                outcome = await async_db.leave_team(discord_id, team["id"])
+                
+                if outcome == Database.LEAVE_QUEUED:
+                    await interaction.edit_original_response(embed=info_embed(*LEAVE_QUEUED), view=None)
+                    self.logger.info(f"{interaction.user.name} queued leaving team {team['name']} while the database is down")
+                    return
                 
                 embed = success_embed(
                     "Left Team",
@@ -624,8 +640,7 @@ class TeamCog(commands.Cog):
     async def delete_team(self, interaction: discord.Interaction):
         await defer_response(interaction, ephemeral=True)
         
-        discord_id = str(interaction.user.id)
-        team = db.get_team_by_member(discord_id)
+        team = await get_context(interaction).team()
         
         embed = confirmation_embed(
             "Delete Team",
@@ -639,7 +654,7 @@ class TeamCog(commands.Cog):
         await view.wait()
         if view.confirmed:
             try:
-                db.delete_team(team["id"])
+                await async_db.delete_team(team["id"])
                 
                 embed = success_embed(
                     "Team Deleted",
@@ -674,12 +689,11 @@ class TeamCog(commands.Cog):
     ):
         await defer_response(interaction, ephemeral=True)
         
-        discord_id = str(interaction.user.id)
         new_owner_id = str(new_owner.id)
-        team = db.get_team_by_member(discord_id)
+        snapshot = await get_context(interaction).team_snapshot()
+        team, members = snapshot["team"], snapshot["members"]
         
         # Check if new owner is a team member
-        members = db.get_team_members(team["id"])
         if not any(m["discord_id"] == new_owner_id for m in members):
             embed = error_embed(
                 "Not a Team Member",
@@ -701,7 +715,7 @@ class TeamCog(commands.Cog):
         await view.wait()
         if view.confirmed:
             try:
-                db.transfer_team_ownership(team["id"], new_owner_id)
+                await async_db.transfer_team_ownership(team["id"], new_owner_id)
                 
                 embed = success_embed(
                     "Ownership Transferred",
@@ -719,5 +733,80 @@ class TeamCog(commands.Cog):
                 )
                 await interaction.edit_original_response(embed=embed, view=None)
 
+    @app_commands.command(
+        name="auto-form-teams",
+        description="Put every member without a team into balanced teams (admin only)"
+    )
+    @app_commands.describe(
+        team_size="Members per team (default: the maximum team size)",
+        dry_run="Preview the teams without saving them (default: true)"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    @error_handler("auto-form-teams")
+    @cooldown(30)
+    async def auto_form_teams(
+        self,
+        interaction: discord.Interaction,
+        team_size: app_commands.Range[int, 2, 20] = None,
+        dry_run: bool = True
+    ):
+        await defer_response(interaction, ephemeral=True)
+
+        team_size = team_size or Config.TEAM_MAX_SIZE
+        if team_size > Config.TEAM_MAX_SIZE:
+            raise ValidationError(f"Teams can have at most {Config.TEAM_MAX_SIZE} members")
+
+        preview = await async_db.auto_form_teams(team_size)
+        if not preview["teams"]:
+            embed = info_embed(
+                "Nobody to Place",
+                f"There are {preview['unassigned']} registered members without a team, not enough to form one."
+            )
+            if preview["unplaced"]:
+                embed.add_field(
+                    name="⏳ Still Without a Team",
+                    value=", ".join(p["discord_username"] for p in preview["unplaced"]) +
+                          "\nShare an invite code from a team with room so they can `/join-team`.",
+                    inline=False
+                )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        embed = team_formation_embed(preview, dry_run=True)
+        if dry_run:
+            embed.add_field(
+                name="✅ Ready?",
+                value="Run `/auto-form-teams dry_run:False` to create these teams.",
+                inline=False
+            )
+            await safe_send_response(interaction, embed=embed, ephemeral=True)
+            return
+
+        view = ConfirmationView()
+        await safe_send_response(interaction, embed=embed, view=view, ephemeral=True)
+
+        await view.wait()
+        if view.confirmed:
+            try:
+                # Save exactly the previewed teams; a re-run could plan different ones
+                created = await async_db.create_formed_teams(
+                    [[member["discord_id"] for member in team] for team in preview["teams"]]
+                )
+                result = {**preview, "created": created}
+                await interaction.edit_original_response(embed=team_formation_embed(result, dry_run=False), view=None)
+                self.logger.info(
+                    f"Admin {interaction.user.name} auto-formed {len(created)} teams "
+                    f"from {result['unassigned']} unassigned members"
+                )
+
+            except Exception as e:
+                self.logger.error(f"Auto form teams error: {e}")
+                embed = error_embed(
+                    "Team Formation Failed",
+                    "No teams were created.",
+                    "Someone may have joined a team since the preview. Please run the command again."
+                )
+                await interaction.edit_original_response(embed=embed, view=None)
+
 async def setup(bot):
     await bot.add_cog(TeamCog(bot))
@@ -1,7 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from bot.core.database import db
+from bot.core.database import Database, async_db
 from bot.utils.embed import (
     volunteer_task_embed, volunteer_tasks_list_embed, success_embed, 
     error_embed, info_embed, confirmation_embed, ConfirmationView, PaginationView
@@ -11,12 +11,28 @@ from bot.utils.error_handler import (
     ValidationError, DatabaseError, cooldown
 )
 import logging
+from typing import Optional
+
+# Why a join_volunteer_task call didn't add the volunteer
+JOIN_FAILURES = {
+    Database.JOIN_FULL: ("Task Full", "This task already has all the volunteers it needs."),
+    Database.JOIN_CLOSED: ("Task Closed", "This task is no longer accepting volunteers."),
+    Database.JOIN_DUPLICATE: ("Already Joined", "You're already a participant in this task."),
+    Database.JOIN_NOT_FOUND: ("Task Not Found", "This task no longer exists."),
+}
+
+JOIN_QUEUED = (
+    "Join Queued",
+    "The database is briefly unavailable, so your join was saved and will be applied once it's back. "
+    "If the task fills up or closes in the meantime, it won't go through."
+)
 
 class VolunteerTaskCreationModal(discord.ui.Modal, title="🤝 Create Volunteer Task"):
     """Modal for creating volunteer tasks with comprehensive information."""
     
-    def __init__(self):
+    def __init__(self, max_volunteers=None):
         super().__init__()
+        self.max_volunteers = max_volunteers
         
         # Create all the input fields
         self.task_title = discord.ui.TextInput(
@@ -98,10 +114,11 @@ class VolunteerTaskCreationModal(discord.ui.Modal, title="🤝 Create Volunteer
             
             # Create volunteer task
             try:
-                task_id = db.create_volunteer_task(
+                task_id = await async_db.create_volunteer_task(
                     self.task_title.value.strip(),
                     discord_id,
-                    discord_username
+                    discord_username,
+                    self.max_volunteers
                 )
             except Exception as e:
                 await interaction.response.send_message(
@@ -155,9 +172,9 @@ class VolunteerTaskCreationModal(discord.ui.Modal, title="🤝 Create Volunteer
             )
             
             # Get task data for the view
-            task_data = db.get_volunteer_task_by_id(task_id)
+            task_data = await async_db.get_volunteer_task_by_id(task_id)
             if task_data:
-                view = VolunteerTaskView(task_data, discord_id)
+                view = await VolunteerTaskView.build(task_data, discord_id)
                 await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             else:
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -171,7 +188,7 @@ class VolunteerTaskCreationModal(discord.ui.Modal, title="🤝 Create Volunteer
 class VolunteerTaskView(discord.ui.View):
     """Interactive view for volunteer task actions."""
     
-    def __init__(self, task_data: dict, user_id: str, timeout: int = 300):
+    def __init__(self, task_data: dict, user_id: str, is_participant: bool = False, timeout: int = 300):
         super().__init__(timeout=timeout)
         self.task_data = task_data
         self.user_id = user_id
@@ -180,21 +197,18 @@ class VolunteerTaskView(discord.ui.View):
         
         # Update button states based on task status and user role
         self.join_task.disabled = not self.is_open or self.is_creator
-        self.leave_task.disabled = not self._is_participant()
+        self.leave_task.disabled = not is_participant
         self.close_task.disabled = not self.is_creator or not self.is_open
         self.reopen_task.disabled = not self.is_creator or self.is_open
     
-    def _is_participant(self) -> bool:
-        """Check if user is a participant in this task."""
+    @classmethod
+    async def build(cls, task_data: dict, user_id: str, timeout: int = 300):
+        """Create the view after looking up the user's participation off the event loop."""
         try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                query = "SELECT COUNT(*) FROM volunteer_participants WHERE task_id = %s AND discord_id = %s" if db.mode == "postgres" else "SELECT COUNT(*) FROM volunteer_participants WHERE task_id = ? AND discord_id = ?"
-                cursor.execute(query, (self.task_data['id'], self.user_id))
-                count = cursor.fetchone()[0] if db.mode == "sqlite" else cursor.fetchone()["count"]
-                return count > 0
+            is_participant = await async_db.is_volunteer_participant(task_data['id'], user_id)
         except Exception:
-            return False
+            is_participant = False
+        return cls(task_data, user_id, is_participant=is_participant, timeout=timeout)
     
     @discord.ui.button(label="🙋 Join Task", style=discord.ButtonStyle.success)
     async def join_task(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -205,13 +219,13 @@ class VolunteerTaskView(discord.ui.View):
             return
         
         try:
-            success = db.join_volunteer_task(
+            outcome = await async_db.join_volunteer_task(
                 self.task_data['id'], 
                 self.user_id, 
                 interaction.user.name
             )
             
-            if success:
+            if outcome == Database.JOIN_JOINED:
                 embed = success_embed(
                     "Joined Task",
                     f"You've successfully joined **{self.task_data['title']}**!"
@@ -223,18 +237,17 @@ class VolunteerTaskView(discord.ui.View):
                 )
                 
                 # Update the view with new participant count
-                updated_task = db.get_volunteer_task_by_id(self.task_data['id'])
+                updated_task = await async_db.get_volunteer_task_by_id(self.task_data['id'])
                 if updated_task:
                     task_embed = volunteer_task_embed(updated_task)
-                    updated_view = VolunteerTaskView(updated_task, self.user_id)
+                    updated_view = await VolunteerTaskView.build(updated_task, self.user_id)
                     await interaction.response.edit_message(embed=task_embed, view=updated_view)
                 else:
                     await interaction.response.send_message(embed=embed, ephemeral=True)
+            elif outcome == Database.JOIN_QUEUED:
+                await interaction.response.send_message(embed=info_embed(*JOIN_QUEUED), ephemeral=True)
             else:
-                embed = error_embed(
-                    "Cannot Join Task",
-                    "This task is no longer available or you're already a participant."
-                )
+                embed = error_embed(*JOIN_FAILURES[outcome])
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 
         except Exception as e:
@@ -254,7 +267,7 @@ class VolunteerTaskView(discord.ui.View):
             return
         
         try:
-            success = db.leave_volunteer_task(self.task_data['id'], self.user_id)
+            success = await async_db.leave_volunteer_task(self.task_data['id'], self.user_id)
             
             if success:
                 embed = success_embed(
@@ -263,10 +276,10 @@ class VolunteerTaskView(discord.ui.View):
                 )
                 
                 # Update the view
-                updated_task = db.get_volunteer_task_by_id(self.task_data['id'])
+                updated_task = await async_db.get_volunteer_task_by_id(self.task_data['id'])
                 if updated_task:
                     task_embed = volunteer_task_embed(updated_task)
-                    updated_view = VolunteerTaskView(updated_task, self.user_id)
+                    updated_view = await VolunteerTaskView.build(updated_task, self.user_id)
                     await interaction.response.edit_message(embed=task_embed, view=updated_view)
                 else:
                     await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -288,11 +301,7 @@ class VolunteerTaskView(discord.ui.View):
     @discord.ui.button(label="👥 View Participants", style=discord.ButtonStyle.primary)
     async def view_participants(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                query = "SELECT * FROM volunteer_participants WHERE task_id = %s ORDER BY joined_at" if db.mode == "postgres" else "SELECT * FROM volunteer_participants WHERE task_id = ? ORDER BY joined_at"
-                cursor.execute(query, (self.task_data['id'],))
-                participants = cursor.fetchall()
+            participants = await async_db.get_volunteer_participants(self.task_data['id'])
             
             embed = info_embed(
                 f"👥 Participants - {self.task_data['title']}",
@@ -301,8 +310,7 @@ class VolunteerTaskView(discord.ui.View):
             
             if participants:
                 participant_list = []
-                for i, participant in enumerate(participants, 1):
-                    p_data = db._row_to_dict(participant)
+                for i, p_data in enumerate(participants, 1):
                     join_date = p_data['joined_at']
                     if hasattr(join_date, 'strftime'):
                         date_str = join_date.strftime("%b %d, %Y")
@@ -340,12 +348,7 @@ class VolunteerTaskView(discord.ui.View):
             return
         
         try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                query = "UPDATE volunteer_tasks SET status = %s WHERE id = %s" if db.mode == "postgres" else "UPDATE volunteer_tasks SET status = ? WHERE id = ?"
-                cursor.execute(query, ('closed', self.task_data['id']))
-                if db.mode == "sqlite":
-                    conn.commit()
+            await async_db.set_volunteer_task_status(self.task_data['id'], 'closed')
             
             embed = success_embed(
                 "Task Closed",
@@ -353,10 +356,10 @@ class VolunteerTaskView(discord.ui.View):
             )
             
             # Update the view
-            updated_task = db.get_volunteer_task_by_id(self.task_data['id'])
+            updated_task = await async_db.get_volunteer_task_by_id(self.task_data['id'])
             if updated_task:
                 task_embed = volunteer_task_embed(updated_task)
-                updated_view = VolunteerTaskView(updated_task, self.user_id)
+                updated_view = await VolunteerTaskView.build(updated_task, self.user_id)
                 await interaction.response.edit_message(embed=task_embed, view=updated_view)
             else:
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -378,12 +381,7 @@ class VolunteerTaskView(discord.ui.View):
             return
         
         try:
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                query = "UPDATE volunteer_tasks SET status = %s WHERE id = %s" if db.mode == "postgres" else "UPDATE volunteer_tasks SET status = ? WHERE id = ?"
-                cursor.execute(query, ('open', self.task_data['id']))
-                if db.mode == "sqlite":
-                    conn.commit()
+            await async_db.set_volunteer_task_status(self.task_data['id'], 'open')
             
             embed = success_embed(
                 "Task Reopened",
@@ -391,10 +389,10 @@ class VolunteerTaskView(discord.ui.View):
             )
             
             # Update the view
-            updated_task = db.get_volunteer_task_by_id(self.task_data['id'])
+            updated_task = await async_db.get_volunteer_task_by_id(self.task_data['id'])
             if updated_task:
                 task_embed = volunteer_task_embed(updated_task)
-                updated_view = VolunteerTaskView(updated_task, self.user_id)
+                updated_view = await VolunteerTaskView.build(updated_task, self.user_id)
                 await interaction.response.edit_message(embed=task_embed, view=updated_view)
             else:
                 await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -441,8 +439,8 @@ class CreateTaskModal(discord.ui.Modal, title="Create Volunteer Task"):
             
             # Create the task
             user = interaction.user
-            task_id = db.create_volunteer_task(title, str(user.id), user.name)
-            task_data = db.get_volunteer_task_by_id(task_id)
+            task_id = await async_db.create_volunteer_task(title, str(user.id), user.name)
+            task_data = await async_db.get_volunteer_task_by_id(task_id)
             
             if not task_data:
                 embed = error_embed(
@@ -469,7 +467,7 @@ class CreateTaskModal(discord.ui.Modal, title="Create Volunteer Task"):
                 inline=False
             )
             
-            view = VolunteerTaskView(task_data, str(user.id))
+            view = await VolunteerTaskView.build(task_data, str(user.id))
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
             
         except Exception as e:
@@ -488,12 +486,16 @@ class VolunteerCog(commands.Cog):
         self.logger = bot.logger
 
     @volunteer_group.command(name="add", description="Create a new volunteer task")
+    @app_commands.describe(
+        max_volunteers="Most volunteers that can join (leave empty for no limit)"
+    )
     @error_handler("volunteer-add")
     @cooldown(30)  # 30 second cooldown to prevent spam
-    async def add_task(self, interaction: discord.Interaction):
+    async def add_task(self, interaction: discord.Interaction,
+                       max_volunteers: Optional[app_commands.Range[int, 1, 1000]] = None):
         """Open volunteer task creation modal."""
         # Show modal for detailed creation
-        modal = VolunteerTaskCreationModal()
+        modal = VolunteerTaskCreationModal(max_volunteers)
         await interaction.response.send_modal(modal)
 
     @volunteer_group.command(name="list", description="List all volunteer tasks with interactive browsing")
@@ -511,14 +513,9 @@ class VolunteerCog(commands.Cog):
         
         try:
             if status == "all":
-                tasks = db.get_all_volunteer_tasks()
+                tasks = await async_db.get_all_volunteer_tasks()
             else:
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    query = "SELECT * FROM volunteer_tasks WHERE status = %s ORDER BY created_at DESC" if db.mode == "postgres" else "SELECT * FROM volunteer_tasks WHERE status = ? ORDER BY created_at DESC"
-                    cursor.execute(query, (status,))
-                    rows = cursor.fetchall()
-                    tasks = [db._row_to_dict(row) for row in rows]
+                tasks = await async_db.get_volunteer_tasks_by_status(status)
         except Exception as e:
             self.logger.error(f"List tasks error: {e}")
             raise DatabaseError()
@@ -569,7 +566,7 @@ class VolunteerCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         # Get task data
-        task_data = db.get_volunteer_task_by_id(task_id)
+        task_data = await async_db.get_volunteer_task_by_id(task_id)
         if not task_data:
             embed = error_embed(
                 "Task Not Found",
@@ -602,9 +599,10 @@ class VolunteerCog(commands.Cog):
             return
         
         try:
-            success = db.join_volunteer_task(task_id, user_id, user.name)
+            outcome = await async_db.join_volunteer_task(task_id, user_id, user.name)
             
-            if success:
+            if outcome == Database.JOIN_JOINED:
+                task_data = await async_db.get_volunteer_task_by_id(task_id) or task_data
                 embed = volunteer_task_embed(task_data)
                 embed.title = f"✅ Joined Task #{task_id}!"
                 embed.add_field(
@@ -613,15 +611,16 @@ class VolunteerCog(commands.Cog):
                     inline=False
                 )
                 
-                view = VolunteerTaskView(task_data, user_id)
+                view = VolunteerTaskView(task_data, user_id, is_participant=True)
                 await safe_send_response(interaction, embed=embed, view=view, ephemeral=True)
                 
                 self.logger.info(f"{user.name} joined volunteer task #{task_id}")
+            elif outcome == Database.JOIN_QUEUED:
+                await safe_send_response(interaction, embed=info_embed(*JOIN_QUEUED), ephemeral=True)
+                self.logger.info(f"{user.name} queued a join for volunteer task #{task_id} while the database is down")
             else:
-                embed = error_embed(
-                    "Cannot Join Task",
-                    "You may already be a participant or the task is no longer available."
-                )
+                title, description = JOIN_FAILURES[outcome]
+                embed = error_embed(title, description, "Look for other open tasks with `/volunteer list`.")
                 await safe_send_response(interaction, embed=embed, ephemeral=True)
                 
         except Exception as e:
@@ -641,7 +640,7 @@ class VolunteerCog(commands.Cog):
         user_id = str(user.id)
         
         try:
-            success = db.leave_volunteer_task(task_id, user_id)
+            success = await async_db.leave_volunteer_task(task_id, user_id)
             
             if success:
                 embed = success_embed(
@@ -672,7 +671,7 @@ class VolunteerCog(commands.Cog):
         user_id = str(user.id)
         
         try:
-            data = db.get_user_volunteer_status(user_id)
+            data = await async_db.get_user_volunteer_status(user_id)
             created = data.get("created", [])
             joined = data.get("joined", [])
         except Exception as e:
@@ -746,7 +745,7 @@ class VolunteerCog(commands.Cog):
     async def view_task(self, interaction: discord.Interaction, task_id: int):
         await defer_response(interaction, ephemeral=True)
         
-        task_data = db.get_volunteer_task_by_id(task_id)
+        task_data = await async_db.get_volunteer_task_by_id(task_id)
         if not task_data:
             embed = error_embed(
                 "Task Not Found",
@@ -757,7 +756,7 @@ class VolunteerCog(commands.Cog):
             return
         
         embed = volunteer_task_embed(task_data)
-        view = VolunteerTaskView(task_data, str(interaction.user.id))
+        view = await VolunteerTaskView.build(task_data, str(interaction.user.id))
         
         await safe_send_response(interaction, embed=embed, view=view, ephemeral=True)
 
@@ -772,7 +771,7 @@ class VolunteerCog(commands.Cog):
         await defer_response(interaction, ephemeral=True)
         
         # Get task data for confirmation
-        task_data = db.get_volunteer_task_by_id(task_id)
+        task_data = await async_db.get_volunteer_task_by_id(task_id)
         if not task_data:
             embed = error_embed(
                 "Task Not Found",
@@ -793,7 +792,7 @@ class VolunteerCog(commands.Cog):
         await view.wait()
         if view.confirmed:
             try:
-                success = db.remove_volunteer_task(task_id)
+                success = await async_db.remove_volunteer_task(task_id)
                 
                 if success:
                     embed = success_embed(
@@ -0,0 +1,74 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """Awaitable facade over a blocking database object.
+
+    Every public method of the wrapped database is exposed as a coroutine
+    function that runs the original call on a dedicated, bounded thread pool,
+    so a slow query never blocks the discord.py event loop::
+
+        profile = await async_db.get_profile(discord_id)
+
+    The executor is sized to the connection pool, so a burst of commands
+    queues here instead of piling up threads waiting on connections.
+    """
+
+    # Members that only make sense synchronously (context managers, row helpers)
+    _SYNC_ONLY = frozenset({"get_connection", "close"})
+
+    def __init__(self, database, max_workers, name="db"):
+        self._database = database
+        self._name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"{name}-db"
+        )
+
+    async def run(self, func, *args, **kwargs):
+        """Run an arbitrary blocking callable on the database executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self._database, name)
+        if name.startswith("_") or name in self._SYNC_ONLY or not callable(attr):
+            raise AttributeError(
+                f"'{type(self).__name__}' does not expose '{name}' asynchronously"
+            )
+
+        batcher = getattr(self._database, "write_batcher", None)
+        if batcher is not None and name in batcher:
+            # Batched writes only borrow a thread to enqueue, then await the commit
+            @functools.wraps(attr)
+            async def wrapper(*args, **kwargs):
+                result = await self.run(self._enqueue, batcher, attr, *args, **kwargs)
+                # Writes journaled during an outage return their result directly
+                if isinstance(result, Future):
+                    return await asyncio.wrap_future(result)
+                return result
+        else:
+            @functools.wraps(attr)
+            async def wrapper(*args, **kwargs):
+                return await self.run(attr, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, wrapper)
+        return wrapper
+
+    @staticmethod
+    def _enqueue(batcher, func, *args, **kwargs):
+        with batcher.deferred():
+            return func(*args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and optionally wait for in-flight queries."""
+        logger.info(f"Shutting down '{self._name}' database executor")
+        self._executor.shutdown(wait=wait, cancel_futures=True)
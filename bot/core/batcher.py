@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BatchOperation:
+    """A write the batcher knows how to apply inside a shared transaction.
+
+    ``apply(cursor, *args)`` runs the statements for one call and returns its
+    result; ``apply_many(cursor, list_of_args)`` may be given instead to write
+    a run of calls at once (e.g. with executemany). ``finish(result)`` runs
+    after the commit, still holding the connection, and returns what the
+    caller sees. ``on_error(exc)`` turns a failure into a return value, or
+    re-raises it.
+    """
+
+    def __init__(self, name, apply=None, apply_many=None, finish=None, on_error=None):
+        if apply is None and apply_many is None:
+            raise ValueError(f"Batch operation '{name}' needs apply or apply_many")
+        self.name = name
+        self.apply = apply
+        self.apply_many = apply_many
+        self.finish = finish
+        self.on_error = on_error
+
+
+class _PendingWrite:
+    __slots__ = ("operation", "args", "future", "enqueued")
+
+    def __init__(self, operation, args):
+        self.operation = operation
+        self.args = args
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+
+class WriteBatcher:
+    """Coalesce small writes from many callers into one transaction.
+
+    Writes queue for up to ``max_delay`` seconds or until ``max_batch`` are
+    waiting, then a background thread applies them together and commits once,
+    so SQLite pays one fsync per batch instead of one per row. Every caller
+    gets a Future that resolves after the commit. If the batch fails, its
+    writes are retried one by one so a single bad row only fails its own
+    caller.
+
+    With ``durability="strict"`` the batch commit is fully synced
+    (SQLite ``synchronous = FULL``); ``"relaxed"`` keeps SQLite's WAL default
+    and turns off ``synchronous_commit`` for the batch on Postgres, trading
+    the last few batches on power loss for lower commit latency.
+    """
+
+    def __init__(self, database, name="db", max_batch=None, max_delay=None, durability=None):
+        self.database = database
+        self.name = name
+        self.max_batch = max_batch or Config.WRITE_BATCH_MAX_SIZE
+        self.max_delay = (Config.WRITE_BATCH_MAX_DELAY_MS / 1000) if max_delay is None else max_delay
+        self.durability = durability or Config.WRITE_BATCH_DURABILITY
+        if self.durability not in ("strict", "relaxed"):
+            raise ValueError(f"Unknown write batch durability '{self.durability}'")
+
+        self._operations = {}
+        self._cond = threading.Condition()
+        self._pending = []
+        self._closed = False
+        self._thread = None
+        self._local = threading.local()
+
+        self._batches = 0
+        self._writes = 0
+        self._largest_batch = 0
+        self._fallbacks = 0
+
+    def register(self, name, apply=None, apply_many=None, finish=None, on_error=None):
+        self._operations[name] = BatchOperation(name, apply, apply_many, finish, on_error)
+
+    def __contains__(self, name):
+        return name in self._operations
+
+    def submit(self, name, *args):
+        """Queue a write and return a Future for its result."""
+        write = _PendingWrite(self._operations[name], args)
+        with self._cond:
+            if not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name=f"{self.name}-write-batcher", daemon=True
+                    )
+                    self._thread.start()
+                self._pending.append(write)
+                self._cond.notify()
+                return write.future
+
+        # Shutting down: write through on the caller's thread
+        self._flush([write])
+        return write.future
+
+    def call(self, name, *args):
+        """Queue a write and block until it is committed.
+
+        Inside ``deferred()`` the Future is returned instead, so an awaiting
+        caller does not tie up a thread while the batch fills.
+        """
+        future = self.submit(name, *args)
+        if getattr(self._local, "deferred", False):
+            return future
+        return future.result()
+
+    @contextmanager
+    def deferred(self):
+        self._local.deferred = True
+        try:
+            yield
+        finally:
+            self._local.deferred = False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # Give other writers until the oldest write's deadline to join the batch
+                deadline = self._pending[0].enqueued + self.max_delay
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            results = self._commit(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+            logger.warning(f"Write batch '{self.name}' of {len(batch)} failed, retrying individually: {e}")
+            with self._cond:
+                self._fallbacks += 1
+            for write in batch:
+                self._flush([write])
+            return
+
+        for write, result in zip(batch, results):
+            write.future.set_result(result)
+
+    def _commit(self, batch):
+        database = self.database
+        with database.get_connection() as conn:
+            strict_sqlite = self.durability == "strict" and database.mode == "sqlite"
+            if strict_sqlite:
+                conn.execute("PRAGMA synchronous = FULL")
+            try:
+                with database._transaction(conn):
+                    cursor = database._cursor(conn)
+                    if self.durability == "relaxed" and database.mode == "postgres":
+                        cursor.execute("SET LOCAL synchronous_commit TO OFF")
+                    results = self._apply(cursor, batch)
+            finally:
+                if strict_sqlite:
+                    conn.execute("PRAGMA synchronous = NORMAL")
+
+            with self._cond:
+                self._batches += 1
+                self._writes += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+
+            # Post-commit hooks run in commit order while we still hold the connection
+            return [
+                write.operation.finish(result) if write.operation.finish else result
+                for write, result in zip(batch, results)
+            ]
+
+    @staticmethod
+    def _apply(cursor, batch):
+        results = []
+        i = 0
+        while i < len(batch):
+            operation = batch[i].operation
+            if operation.apply_many is None:
+                results.append(operation.apply(cursor, *batch[i].args))
+                i += 1
+                continue
+
+            # Hand a run of the same operation over in one call
+            j = i
+            while j < len(batch) and batch[j].operation is operation:
+                j += 1
+            results.extend(operation.apply_many(cursor, [write.args for write in batch[i:j]]))
+            i = j
+        return results
+
+    @staticmethod
+    def _fail(write, error):
+        handler = write.operation.on_error
+        if handler is None:
+            write.future.set_exception(error)
+            return
+        try:
+            write.future.set_result(handler(error))
+        except Exception as e:
+            write.future.set_exception(e)
+
+    def stats(self):
+        """Return batch counters and the current queue length."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "batches": self._batches,
+                "writes": self._writes,
+                "avg_batch": self._writes / self._batches if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "fallbacks": self._fallbacks,
+                "queued": len(self._pending),
+            }
+
+    def close(self, timeout=None):
+        """Flush everything queued and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        logger.info(f"Write batcher '{self.name}' flushed and stopped")
@@ -2,7 +2,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from config import Config
-from .database import db
+from .database import db, async_db
+from .circuit import DatabaseUnavailableError
+from .metrics import format_latency_stats
+from .members import MemberIndex
 from bot.cogs.find import FindCog
 from bot.cogs.profile import ProfileCog
 from bot.cogs.feedback import FeedbackCog
@@ -32,6 +35,8 @@ class MaximallyBot(commands.Bot):
         self.logger = logging.getLogger(__name__)
         self.config = Config
         self.start_time = datetime.datetime.utcnow()
+        # Username lookups for commands that take a typed name (e.g. ownership transfer)
+        self.member_index = MemberIndex()
         self.logger.info("Intents configured: guilds=%s, members=%s, message_content=%s",
                         intents.guilds, intents.members, intents.message_content)
         self.logger.info("If you still see a message_content warning, enable 'MESSAGE CONTENT INTENT' in the Discord Developer Portal for this bot.")
@@ -64,10 +69,24 @@ class MaximallyBot(commands.Bot):
             db_status = "✅ Connected"
             try:
                 # Quick database check
-                from .database import db
-                db.get_profile(0)  # This will fail but test connection
+                await async_db.ping()  # Round-trip through the executor and pool
+                pool_stats = db.pool_stats()
+                if pool_stats:
+                    db_status += (
+                        f"\n**Pool:** {pool_stats['in_use']}/{pool_stats['max_size']} in use"
+                        f"\n**Avg wait:** {pool_stats['wait_avg_ms']:.1f} ms"
+                    )
+                cache_stats = db.cache_stats()
+                db_status += f"\n**Profile cache:** {cache_stats['hit_rate']:.0%} hits ({cache_stats['size']} cached)"
+                team_cache_stats = db.team_cache_stats()
+                db_status += f"\n**Team cache:** {team_cache_stats['hit_rate']:.0%} hits ({team_cache_stats['teams']['size']} teams)"
+            except DatabaseUnavailableError:
+                db_status = "❌ PostgreSQL unreachable, failing fast until it recovers"
             except Exception:
                 db_status = "❌ Database connection issue"
+            journal_stats = db.journal_stats()
+            if journal_stats and journal_stats["pending"]:
+                db_status += f"\n**Offline journal:** {journal_stats['pending']} writes waiting to replay"
 
             # Check email system
             email_status = "✅ Configured"
@@ -144,6 +163,30 @@ class MaximallyBot(commands.Bot):
         self.logger.info(f"Connected to {len(self.guilds)} guilds")
         self.logger.info("Bot is ready and operational!")
 
+    async def on_guild_available(self, guild):
+        self.member_index.build(guild)
+
+    async def on_guild_join(self, guild):
+        self.member_index.build(guild)
+
+    async def on_guild_remove(self, guild):
+        self.member_index.drop_guild(guild.id)
+
+    async def on_member_join(self, member):
+        self.member_index.add(member)
+
+    async def on_member_remove(self, member):
+        self.member_index.remove(member)
+
+    async def on_member_update(self, before, after):
+        if before.name != after.name:
+            self.member_index.add(after)
+
+    async def on_user_update(self, before, after):
+        # Username changes arrive as user updates, once for all shared guilds
+        if before.name != after.name:
+            self.member_index.rename_user(after)
+
     async def on_disconnect(self):
         self.logger.warning("Bot disconnected from Discord")
 
@@ -157,4 +200,16 @@ class MaximallyBot(commands.Bot):
         """Clean shutdown of the bot."""
         self.logger.info("Shutting down bot gracefully...")
         await super().close()
+
+        from bot.email.database import email_db, async_email_db
+        # Commit batched writes still waiting for their flush before anything is torn down
+        db.flush_writes()
+        email_db.flush_writes()
+        async_db.shutdown(wait=False)
+        async_email_db.shutdown(wait=False)
+        db.close()
+        email_db.close()
+        # Leave a per-method latency profile in the log for comparing releases
+        self.logger.info(format_latency_stats("profiles", db.latency_stats()))
+        self.logger.info(format_latency_stats("email", email_db.latency_stats()))
         self.logger.info("Bot shutdown complete")
\ No newline at end of file
@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by LRUCache.get() when a key is absent or expired; None is a valid cached value
+MISSING = object()
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU map whose entries expire after ``ttl`` seconds.
+
+    ``None`` can be cached like any other value, which lets callers remember
+    negative lookups (e.g. "this user has no profile") as well. Writers
+    storing fresh values bump a generation; readers filling a miss pass the
+    generation they saw before querying, and their value is dropped if a
+    write landed meanwhile, so a slow read can't replace a newer value.
+
+    An entry found expired moves to a separate, equally bounded stale store
+    that only ``peek`` reads, so stale values can still answer while the
+    database is down without counting toward ``size`` or expiring twice.
+    """
+
+    def __init__(self, max_size, ttl, name="cache"):
+        if max_size < 1:
+            raise ValueError("Cache max_size must be at least 1")
+
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Expired values, kept for peek() during an outage
+        self._stale = OrderedDict()
+        self._generation = 0
+
+        # Counters exposed through stats()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key``, or ``MISSING``."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._stale[key] = value
+                while len(self._stale) > self.max_size:
+                    self._stale.popitem(last=False)
+                self._expirations += 1
+                self._misses += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def peek(self, key):
+        """Return the value for ``key`` even if expired, or ``MISSING``; touches neither order nor counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            return self._stale.get(key, MISSING)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def put(self, key, value, generation=None):
+        """Store ``value`` under ``key``, evicting the least recently used entries if full.
+
+        Without ``generation`` this is a write-through. With it, the value is
+        a read result and is only stored if nothing was written since.
+        """
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation is None:
+                self._generation += 1
+            elif generation != self._generation:
+                return
+            self._stale.pop(key, None)
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+            self._stale.pop(key, None)
+
+    def pop(self, key):
+        """Remove ``key`` and return its value, expired or not (``MISSING`` if absent); counters are untouched."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            stale = self._stale.pop(key, MISSING)
+        return entry[0] if entry is not None else stale
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stale.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "stale": len(self._stale),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+class TeamCache:
+    """In-memory membership index: discord_id -> team_id, team_id -> team snapshot.
+
+    Snapshots are the {"team", "members", "owner_name"} dicts built by
+    Database.get_team_snapshot, so one cached entry answers "which team is
+    this user in", "who owns it" and "who is on it". Users without a team
+    are cached too. Writers call ``invalidate_member``/``invalidate_team``
+    after changing a team; every invalidation bumps a generation, and a
+    snapshot read from the database before it is not stored, so a slow
+    reader can't put back a roster that was just changed.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.members = LRUCache(max_size, ttl, name="team_members")
+        self.teams = LRUCache(max_size, ttl, name="teams")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _count(self, value):
+        with self._lock:
+            if value is MISSING:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def get_snapshot(self, discord_id):
+        """Return the snapshot of ``discord_id``'s team, None if they have none, or MISSING."""
+        team_id = self.members.get(discord_id)
+        if team_id is MISSING or team_id is None:
+            return self._count(team_id)
+        # A member entry can outlive its team's entry; the caller then reloads both
+        return self._count(self.teams.get(team_id))
+
+    def peek_snapshot(self, discord_id):
+        """Like ``get_snapshot`` but ignoring expiry, for serving reads while the database is down."""
+        team_id = self.members.peek(discord_id)
+        if team_id is MISSING or team_id is None:
+            return team_id
+        return self.teams.peek(team_id)
+
+    def get_team(self, team_id):
+        """Return the cached snapshot of team ``team_id``, or MISSING."""
+        return self._count(self.teams.get(team_id))
+
+    def put_snapshot(self, discord_id, snapshot, generation):
+        """Cache ``snapshot`` (None: not in a team) unless a write happened since ``generation``."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            if snapshot is None:
+                self.members.put(discord_id, None)
+                return
+            team_id = snapshot["team"]["id"]
+            self.teams.put(team_id, snapshot)
+            for member in snapshot["members"]:
+                self.members.put(member["discord_id"], team_id)
+
+    def invalidate_member(self, discord_id):
+        """Forget ``discord_id``'s membership and the roster of the team they were in."""
+        with self._lock:
+            self._generation += 1
+            team_id = self.members.pop(discord_id)
+            if team_id is not MISSING and team_id is not None:
+                self._drop_team(team_id)
+
+    def invalidate_team(self, team_id):
+        """Forget team ``team_id`` and every member pointing at it."""
+        with self._lock:
+            self._generation += 1
+            self._drop_team(team_id)
+
+    def _drop_team(self, team_id):
+        snapshot = self.teams.pop(team_id)
+        if snapshot is not MISSING:
+            for member in snapshot["members"]:
+                self.members.invalidate(member["discord_id"])
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.members.clear()
+            self.teams.clear()
+
+    def stats(self):
+        """Return the lookup hit rate alongside both underlying caches' counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            hits, misses = self._hits, self._misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "members": self.members.stats(),
+            "teams": self.teams.stats(),
+        }
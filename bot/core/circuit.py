@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised instead of waiting on a database the circuit breaker knows is down."""
+    pass
+
+
+class CircuitBreaker:
+    """Track the health of a remote database and fail fast while it is down.
+
+    CLOSED: calls go through; ``failure_threshold`` consecutive connection
+    failures open the circuit. OPEN: calls raise DatabaseUnavailableError
+    immediately, and a background thread runs ``probe`` every
+    ``probe_interval`` seconds. HALF_OPEN: a probe is in flight; calls still
+    fail fast. A successful probe closes the circuit and runs the
+    ``on_recover`` callbacks, so service resumes without a restart.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, probe, failure_threshold=None, probe_interval=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_BREAKER_FAILURES
+        self.probe_interval = probe_interval or Config.CIRCUIT_BREAKER_PROBE_SECONDS
+
+        self._probe = probe
+        self._recover_callbacks = []
+        self._cond = threading.Condition()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._prober = None
+
+        self._trips = 0
+        self._rejected = 0
+
+    @property
+    def state(self):
+        return self._state
+
+    def on_recover(self, callback):
+        """Run ``callback()`` on the probe thread each time the circuit closes again."""
+        self._recover_callbacks.append(callback)
+
+    def before_call(self):
+        """Raise DatabaseUnavailableError unless the circuit is closed."""
+        if self._state == self.CLOSED:
+            return
+        with self._cond:
+            if self._state == self.CLOSED:
+                return
+            self._rejected += 1
+            down_for = time.monotonic() - self._opened_at
+        raise DatabaseUnavailableError(
+            f"'{self.name}' database unavailable for {down_for:.0f}s ({self._last_error}); "
+            f"retrying every {self.probe_interval:g}s"
+        )
+
+    def record_success(self):
+        if self._failures:
+            with self._cond:
+                self._failures = 0
+
+    def record_failure(self, error):
+        """Count a connection-level failure, opening the circuit at the threshold."""
+        with self._cond:
+            self._failures += 1
+            self._last_error = error
+            if self._state != self.CLOSED or self._failures < self.failure_threshold:
+                return
+        self.trip(error)
+
+    def trip(self, error):
+        """Open the circuit now and start probing for recovery."""
+        with self._cond:
+            self._last_error = error
+            if self._state != self.CLOSED:
+                return
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trips += 1
+            if self._prober is None:
+                self._prober = threading.Thread(
+                    target=self._probe_loop, name=f"{self.name}-circuit-probe", daemon=True
+                )
+                self._prober.start()
+            self._cond.notify()
+        logger.error(f"Circuit '{self.name}' opened: {error}; failing fast until a probe succeeds")
+
+    def _probe_loop(self):
+        while True:
+            with self._cond:
+                while self._state == self.CLOSED:
+                    self._cond.wait()
+            time.sleep(self.probe_interval)
+            with self._cond:
+                self._state = self.HALF_OPEN
+            try:
+                self._probe()
+            except Exception as e:
+                with self._cond:
+                    self._state = self.OPEN
+                    self._last_error = e
+                logger.warning(f"Circuit '{self.name}' probe failed: {e}")
+                continue
+
+            with self._cond:
+                self._state = self.CLOSED
+                self._failures = 0
+                down_for = time.monotonic() - self._opened_at
+            logger.info(f"Circuit '{self.name}' closed after {down_for:.0f}s; database reachable again")
+            for callback in self._recover_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Circuit '{self.name}' recovery callback failed: {e}")
+
+    def stats(self):
+        """Return the state and trip counters."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+                "rejected": self._rejected,
+                "open_for_s": time.monotonic() - self._opened_at if self._state != self.CLOSED else 0.0,
+                "last_error": str(self._last_error) if self._last_error else None,
+            }
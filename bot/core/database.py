@@ -1,38 +1,326 @@
-import os
+import re
+import json
 import sqlite3
 import psycopg2
 import psycopg2.extras
 import logging
 import secrets
 import threading
+import time
 from contextlib import contextmanager
 from config import Config
+from .pool import PoolTimeoutError, create_postgres_pool, check_postgres
+from .circuit import CircuitBreaker, DatabaseUnavailableError
+from .sqlite_backend import SQLiteBackend
+from .async_database import AsyncDatabase
+from .trigram import TrigramIndex
+from .cache import LRUCache, TeamCache, MISSING
+from .recommender import TeammateRecommender
+from .team_formation import form_teams
+from .sampler import IdSampler
+from .migrations import MigrationRunner, CORE_MIGRATIONS
+from .queries import QueryRegistry
+from .metrics import caller_name
+from .batcher import WriteBatcher
+from .journal import WriteJournal
+from bot.utils.validation import normalize_tags
 
 logger = logging.getLogger(__name__)
 
+
 class Database:
+    # Row keys of the volunteer tables. Prepared statements name their columns: a
+    # plan built on * stops matching once a migration adds a column
+    VOLUNTEER_TASK_FIELDS = ("id", "title", "creator_id", "creator_username", "status", "created_at", "updated_at", "max_volunteers")
+    VOLUNTEER_PARTICIPANT_COLUMNS = ("task_id", "discord_id", "discord_username", "joined_at")
+    VOLUNTEER_TASK_SELECT = ", ".join(f"vt.{column}" for column in VOLUNTEER_TASK_FIELDS)
+    # Volunteer task rows always carry their live participant count
+    VOLUNTEER_TASK_COLUMNS = (
+        f"{VOLUNTEER_TASK_SELECT}, (SELECT COUNT(*) FROM volunteer_participants vp "
+        "WHERE vp.task_id = vt.id) AS participant_count"
+    )
+
+    # Above this many candidates per tag set, scanning profiles by recency beats sorting them
+    SEARCH_SCAN_THRESHOLD = 1000
+
+    # join_volunteer_task outcomes
+    JOIN_JOINED = "joined"
+    JOIN_FULL = "full"
+    JOIN_CLOSED = "closed"
+    JOIN_DUPLICATE = "duplicate"
+    JOIN_NOT_FOUND = "not_found"
+    # Recorded in the offline journal; the real outcome is decided on replay
+    JOIN_QUEUED = "queued"
+
+    # leave_team outcomes
+    LEAVE_LEFT = "left"
+    LEAVE_NOT_IN_TEAM = "not_in_team"
+    LEAVE_QUEUED = "queued"
+
+    # Random 8-hex-digit team codes drawn before giving up on collisions
+    TEAM_CODE_ATTEMPTS = 5
+
+    # Team row keys, as returned by get_team_by_member and find_teams
+    TEAM_COLUMNS = ("id", "name", "code", "owner_id", "created_at", "description", "project_idea", "looking_for")
+    TEAM_MEMBER_COLUMNS = ("team_id", "discord_id", "discord_username", "joined_at")
+
+    # Profile row keys. Queries name them instead of selecting *: on Postgres that would
+    # also drag search_vector into every cached profile
+    PROFILE_COLUMNS = ("discord_id", "discord_username", "name", "skills", "interests", "created_at", "updated_at")
+    PROFILE_SELECT = ", ".join(f"p.{column}" for column in PROFILE_COLUMNS)
+
+    # Full-text column weights: (column, Postgres tsvector label, FTS5 bm25 weight)
+    FULLTEXT_COLUMNS = (
+        ("skills", "A", 3.0),
+        ("interests", "B", 2.0),
+        ("name", "C", 1.0),
+    )
+
+    # Every fixed statement the methods below run, compiled once per dialect by QueryRegistry
+    QUERIES = {
+        "ping": "SELECT 1",
+
+        # Profiles
+        "profile_select": f"SELECT {PROFILE_SELECT} FROM profiles p WHERE p.discord_id = %s",
+        "profile_lock": {
+            "postgres": "SELECT skills, interests FROM profiles WHERE discord_id = %s FOR UPDATE",
+            # The SQLite writer connection is already exclusive
+            "sqlite": "SELECT skills, interests FROM profiles WHERE discord_id = %s",
+        },
+        "profile_upsert": f'''
+            INSERT INTO profiles (discord_id, discord_username, name, skills, interests)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (discord_id) DO UPDATE SET
+                discord_username = EXCLUDED.discord_username,
+                name = EXCLUDED.name,
+                skills = EXCLUDED.skills,
+                interests = EXCLUDED.interests,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING {", ".join(PROFILE_COLUMNS)}
+        ''',
+        "profile_delete": "DELETE FROM profiles WHERE discord_id = %s RETURNING skills, interests",
+        "profile_ids": "SELECT discord_id FROM profiles",
+        "profiles_page": f"SELECT {PROFILE_SELECT} FROM profiles p ORDER BY p.updated_at DESC, p.discord_id DESC LIMIT %s",
+        "profiles_page_after": f'''
+            SELECT {PROFILE_SELECT} FROM profiles p WHERE (p.updated_at, p.discord_id) < (%s, %s)
+            ORDER BY p.updated_at DESC, p.discord_id DESC LIMIT %s
+        ''',
+        "profiles_fulltext": {
+            "postgres": f'''
+                SELECT {PROFILE_SELECT} FROM profiles p, to_tsquery('simple', %s) query
+                WHERE p.search_vector @@ query
+                ORDER BY ts_rank(p.search_vector, query) DESC, p.updated_at DESC
+                LIMIT %s
+            ''',
+            "sqlite": f'''
+                SELECT {PROFILE_SELECT} FROM profiles_fts
+                JOIN profiles p ON p.id = profiles_fts.rowid
+                WHERE profiles_fts MATCH %s
+                ORDER BY bm25(profiles_fts, {", ".join(str(weight) for _, _, weight in FULLTEXT_COLUMNS)}), p.updated_at DESC
+                LIMIT %s
+            ''',
+        },
+
+        # Profile tags
+        "profile_tags_delete": "DELETE FROM profile_tags WHERE discord_id = %s",
+        "profile_tags_insert": "INSERT INTO profile_tags (kind, tag, discord_id) VALUES (%s, %s, %s)",
+        # Tags someone currently has: one row per distinct tag in tag_counts
+        "tag_vocabulary": "SELECT tag FROM tag_counts WHERE kind = %s AND count > 0",
+        "tag_known": "SELECT 1 FROM tag_counts WHERE kind = %s AND tag = %s AND count > 0",
+        # The indexed % operator cuts off at pg_trgm.similarity_threshold, set per pooled connection
+        "trgm_closest_tags": '''
+            SELECT tag, similarity(tag, %s) AS score FROM tag_counts
+            WHERE kind = %s AND count > 0 AND tag %% %s
+            ORDER BY score DESC, tag LIMIT %s
+        ''',
+
+        # Profile stats
+        "count_profiles": "SELECT COUNT(*) AS count FROM profiles",
+        "count_tagged_profiles": "SELECT COUNT(DISTINCT discord_id) AS count FROM profile_tags WHERE kind = %s",
+        "count_tags": "SELECT kind, tag, COUNT(*) AS count FROM profile_tags GROUP BY kind, tag",
+        "profile_stats_select": "SELECT name, value FROM profile_stats",
+        "profile_stats_clear": "DELETE FROM profile_stats",
+        "profile_stats_insert": "INSERT INTO profile_stats (name, value) VALUES (%s, %s)",
+        "profile_stats_add": '''
+            INSERT INTO profile_stats (name, value) VALUES (%s, %s)
+            ON CONFLICT (name) DO UPDATE SET value = profile_stats.value + EXCLUDED.value
+        ''',
+        "tag_counts_select": "SELECT kind, tag, count FROM tag_counts",
+        "tag_counts_clear": "DELETE FROM tag_counts",
+        "tag_counts_insert": "INSERT INTO tag_counts (kind, tag, count) VALUES (%s, %s, %s)",
+        "tag_count_increment": '''
+            INSERT INTO tag_counts (kind, tag, count) VALUES (%s, %s, 1)
+            ON CONFLICT (kind, tag) DO UPDATE SET count = tag_counts.count + 1
+        ''',
+        "tag_count_decrement": "UPDATE tag_counts SET count = count - 1 WHERE kind = %s AND tag = %s RETURNING count",
+        "tag_count_delete": "DELETE FROM tag_counts WHERE kind = %s AND tag = %s AND count <= 0",
+        # Served straight from idx_tag_counts_leaderboard
+        "top_tags": "SELECT tag, count FROM tag_counts WHERE kind = %s ORDER BY count DESC, tag LIMIT %s",
+
+        # Teams
+        # Postgres only: team and owner membership in one statement. in_team reads the
+        # snapshot from before the statement, so it says why no team was created
+        "team_create": '''
+            WITH new_team AS (
+                INSERT INTO teams (name, code, owner_id, description, project_idea, looking_for)
+                SELECT %s, %s, %s, %s, %s, %s
+                WHERE NOT EXISTS (SELECT 1 FROM team_members WHERE discord_id = %s)
+                ON CONFLICT (code) DO NOTHING
+                RETURNING id
+            ), owner AS (
+                INSERT INTO team_members (team_id, discord_id, discord_username)
+                SELECT id, %s, %s FROM new_team
+            )
+            SELECT (SELECT id FROM new_team) AS id,
+                   EXISTS (SELECT 1 FROM team_members WHERE discord_id = %s) AS in_team
+        ''',
+        "team_insert": '''
+            INSERT INTO teams (name, code, owner_id, description, project_idea, looking_for)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (code) DO NOTHING RETURNING id
+        ''',
+        "team_member_exists": "SELECT 1 FROM team_members WHERE discord_id = %s",
+        "team_by_code": f"SELECT {', '.join(TEAM_COLUMNS)} FROM teams WHERE code = %s",
+        # One row per member of the caller's team, owner's profile name alongside
+        "team_snapshot": '''
+            SELECT t.id, t.name, t.code, t.owner_id, t.created_at,
+                   t.description, t.project_idea, t.looking_for,
+                   owner.name AS owner_name,
+                   m.discord_id AS member_id, m.discord_username AS member_username, m.joined_at AS member_joined_at
+            FROM team_members me
+            JOIN teams t ON t.id = me.team_id
+            JOIN team_members m ON m.team_id = t.id
+            LEFT JOIN profiles owner ON owner.discord_id = t.owner_id
+            WHERE me.discord_id = %s
+            ORDER BY m.joined_at, m.discord_id
+        ''',
+        "team_owner_update": "UPDATE teams SET owner_id = %s WHERE id = %s",
+        "team_delete": "DELETE FROM teams WHERE id = %s",
+        "team_member_insert": "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (%s, %s, %s)",
+        "team_member_delete": "DELETE FROM team_members WHERE discord_id = %s",
+        "team_members": f"SELECT {', '.join(TEAM_MEMBER_COLUMNS)} FROM team_members WHERE team_id = %s ORDER BY joined_at",
+        "team_member_count": "SELECT COUNT(*) AS count FROM team_members WHERE team_id = %s",
+        "team_members_delete": "DELETE FROM team_members WHERE team_id = %s",
+        "team_tags_insert": "INSERT INTO team_tags (tag, team_id) VALUES (%s, %s)",
+        "team_tags_delete": "DELETE FROM team_tags WHERE team_id = %s",
+        "profiles_without_team": '''
+            SELECT p.discord_id, p.discord_username, p.name, p.skills, p.interests
+            FROM profiles p
+            WHERE NOT EXISTS (SELECT 1 FROM team_members m WHERE m.discord_id = p.discord_id)
+            ORDER BY p.discord_id
+        ''',
+        # Still eligible for auto-formed teams? Postgres binds the id list as an array, SQLite as JSON
+        "formation_candidates": {
+            "postgres": '''
+                SELECT p.discord_id, p.discord_username,
+                       EXISTS (SELECT 1 FROM team_members m WHERE m.discord_id = p.discord_id) AS in_team
+                FROM profiles p WHERE p.discord_id = ANY(%s)
+            ''',
+            "sqlite": '''
+                SELECT p.discord_id, p.discord_username,
+                       EXISTS (SELECT 1 FROM team_members m WHERE m.discord_id = p.discord_id) AS in_team
+                FROM profiles p WHERE p.discord_id IN (SELECT value FROM json_each(%s))
+            ''',
+        },
+        # Multi-row inserts through QueryRegistry.execute_values
+        "teams_insert_values": "INSERT INTO teams (name, code, owner_id) VALUES %s ON CONFLICT (code) DO NOTHING RETURNING id, code",
+        "team_members_insert_values": "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES %s",
+        "recommender_tags": "SELECT discord_id, kind, tag FROM profile_tags",
+        "recommender_memberships": '''
+            SELECT m.discord_id, m.team_id, sizes.size
+            FROM team_members m
+            JOIN (SELECT team_id, COUNT(*) AS size FROM team_members GROUP BY team_id) sizes
+              ON sizes.team_id = m.team_id
+        ''',
+
+        # Volunteer tasks
+        "volunteer_task_insert": "INSERT INTO volunteer_tasks (title, creator_id, creator_username, max_volunteers) VALUES (%s, %s, %s, %s) RETURNING id",
+        "volunteer_task_by_id": f"SELECT {VOLUNTEER_TASK_COLUMNS} FROM volunteer_tasks vt WHERE vt.id = %s",
+        "volunteer_tasks_all": f"SELECT {VOLUNTEER_TASK_COLUMNS} FROM volunteer_tasks vt ORDER BY vt.created_at DESC",
+        "volunteer_tasks_by_status": f"SELECT {VOLUNTEER_TASK_COLUMNS} FROM volunteer_tasks vt WHERE vt.status = %s ORDER BY vt.created_at DESC",
+        "volunteer_tasks_created_by": f"SELECT {VOLUNTEER_TASK_SELECT} FROM volunteer_tasks vt WHERE vt.creator_id = %s ORDER BY vt.created_at DESC",
+        "volunteer_tasks_joined_by": f'''
+            SELECT {VOLUNTEER_TASK_SELECT} FROM volunteer_tasks vt
+            JOIN volunteer_participants vp ON vt.id = vp.task_id
+            WHERE vp.discord_id = %s ORDER BY vp.joined_at DESC
+        ''',
+        "volunteer_task_status_update": "UPDATE volunteer_tasks SET status = %s WHERE id = %s",
+        "volunteer_task_delete": "DELETE FROM volunteer_tasks WHERE id = %s",
+        "volunteer_participants": f"SELECT {', '.join(VOLUNTEER_PARTICIPANT_COLUMNS)} FROM volunteer_participants WHERE task_id = %s ORDER BY joined_at",
+        "volunteer_participant_exists": "SELECT 1 FROM volunteer_participants WHERE task_id = %s AND discord_id = %s",
+        "volunteer_task_lock": {
+            # Held until commit, so concurrent joins to one task take turns counting
+            "postgres": "SELECT status, max_volunteers FROM volunteer_tasks WHERE id = %s FOR UPDATE",
+            # Joins open the SQLite transaction with BEGIN IMMEDIATE instead
+            "sqlite": "SELECT status, max_volunteers FROM volunteer_tasks WHERE id = %s",
+        },
+        # Inserts nothing when the task is closed, full or already joined
+        "volunteer_participant_insert": '''
+            INSERT INTO volunteer_participants (task_id, discord_id, discord_username)
+            SELECT t.id, %s, %s FROM volunteer_tasks t
+            WHERE t.id = %s AND t.status = 'open'
+            AND (t.max_volunteers IS NULL OR (
+                SELECT COUNT(*) FROM volunteer_participants vp WHERE vp.task_id = t.id
+            ) < t.max_volunteers)
+            ON CONFLICT (task_id, discord_id) DO NOTHING
+        ''',
+        "volunteer_participant_delete": "DELETE FROM volunteer_participants WHERE task_id = %s AND discord_id = %s",
+        "volunteer_participants_delete": "DELETE FROM volunteer_participants WHERE task_id = %s",
+    }
+
     def __init__(self):
         self.lock = threading.Lock()
+        self.pool = None
+        self.sqlite = None
+        self.fulltext_enabled = False
+        self.pg_trgm_enabled = False
+        self.tag_vocabulary = {}
+        self._vocabulary_lock = threading.Lock()
+        self.queries = QueryRegistry("core", self.QUERIES)
+        self.profile_ids = None
+        self._profile_ids_lock = threading.Lock()
+        self.profile_cache = LRUCache(
+            Config.PROFILE_CACHE_SIZE, Config.PROFILE_CACHE_TTL, name="profiles"
+        )
+        self.team_cache = TeamCache(Config.TEAM_CACHE_SIZE, Config.TEAM_CACHE_TTL)
+        self.recommender = TeammateRecommender(self._load_recommender_rows)
         self.database_url = Config.DATABASE_URL
+        self.breaker = None
+        self.journal = None
+        self._setup_pending = False
         if self.database_url:
             self.mode = "postgres"
+            self.breaker = CircuitBreaker("profiles", lambda: check_postgres(self.database_url))
+            self.breaker.on_recover(self._on_postgres_recovered)
+            if Config.OFFLINE_JOURNAL_PATH:
+                self.journal = WriteJournal("profiles", self._replay_journaled)
+                # Registered after setup so replay runs against a migrated schema
+                self.breaker.on_recover(self.journal.start_replay)
         else:
             self.mode = "sqlite"
             self.db_path = Config.DATABASE_PATH
 
-        # Try to setup database, with fallback to SQLite if PostgreSQL fails
         try:
             self.setup_database()
-        except Exception as e:
-            if self.mode == "postgres":
-                logger.warning(f"Initial PostgreSQL setup failed: {str(e)}")
-                logger.info("Attempting fallback to SQLite...")
-                self.mode = "sqlite"
-                self.db_path = Config.DATABASE_PATH
-                self.setup_database()
-                logger.info("Successfully fell back to SQLite database")
-            else:
-                raise
+        except DatabaseUnavailableError as e:
+            # Start anyway: commands fail fast until the breaker sees PostgreSQL again,
+            # then the schema setup runs
+            logger.error(f"PostgreSQL unavailable at startup, deferring setup: {e}")
+            self._setup_pending = True
+            self.breaker.trip(e)
+        else:
+            if self.journal is not None:
+                # Writes journaled before the last shutdown
+                self.journal.start_replay()
+
+        # Optional write-behind batching for the hottest single-row writes
+        self.write_batcher = None
+        if Config.WRITE_BATCH_ENABLED:
+            self.write_batcher = WriteBatcher(self, "core")
+            self.write_batcher.register(
+                "upsert_profile", self._apply_upsert_profile, finish=self._finish_upsert_profile
+            )
+            self.write_batcher.register("join_volunteer_task", self._apply_join_volunteer_task)
 
     def _row_to_dict(self, row):
         """Safely convert database row to dictionary regardless of backend."""
@@ -52,46 +340,196 @@ class Database:
             return {key: row[key] for key in row.keys()}
 
     @contextmanager
-    def get_connection(self):
-        """Return a connection depending on mode (Postgres or SQLite)."""
-        self.lock.acquire()
-        conn = None
-        try:
-            if self.mode == "postgres":
-                try:
-                    conn = psycopg2.connect(self.database_url, sslmode="require")
-                    conn.autocommit = True
-                except Exception as e:
-                    logger.warning(f"PostgreSQL connection failed: {str(e)}")
-                    logger.info("Falling back to SQLite...")
-                    self.mode = "sqlite"
-                    self.db_path = Config.DATABASE_PATH
-                    # ensure data/ folder exists for SQLite
-                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-                    conn = sqlite3.connect(self.db_path)
-                    conn.row_factory = sqlite3.Row
-                    conn.execute("PRAGMA foreign_keys = ON")
-            else:
-                # ensure data/ folder exists for SQLite
-                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA foreign_keys = ON")
+    def get_connection(self, readonly=False):
+        """Return a connection depending on mode (Postgres or SQLite).
 
+        PostgreSQL connections are borrowed from a pool and may be used
+        concurrently from several threads. While the circuit breaker has
+        PostgreSQL marked down this raises DatabaseUnavailableError at once
+        rather than waiting out a connect timeout. On SQLite, writes share one
+        serialized connection and ``readonly`` callers get a WAL reader.
+        """
+        # The method that opened this ``with`` block: generator -> __enter__ -> caller
+        method = caller_name(2)
+        start = time.perf_counter()
+        if self.mode == "postgres":
+            self.breaker.before_call()
+            try:
+                conn = self._postgres_pool().acquire()
+            except PoolTimeoutError:
+                # Pool exhaustion is back-pressure, not an outage
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise DatabaseUnavailableError(f"PostgreSQL connection failed: {e}") from e
+            self.queries.record_wait(method, time.perf_counter() - start)
+
+            try:
+                yield conn
+            except Exception as e:
+                # psycopg2 marks the connection closed when the server went away mid-statement
+                if conn.closed:
+                    self.breaker.record_failure(e)
+                raise
+            finally:
+                self.pool.release(conn)
+            self.breaker.record_success()
+            return
+
+        with self._sqlite_backend().connection(readonly=readonly) as conn:
+            self.queries.record_wait(method, time.perf_counter() - start)
             yield conn
 
-        finally:
-            if conn is not None:
-                conn.close()
-            self.lock.release()
+    def _on_postgres_recovered(self):
+        if self._setup_pending:
+            self.setup_database()
+            self._setup_pending = False
+
+    def _journal(self, op, args, key=None):
+        """Record ``op`` in the offline journal instead of running it, if needed.
+
+        Writes are journaled while the circuit is open and, after recovery,
+        until the journal has drained, so they reach PostgreSQL in order.
+        Returns True if the write was journaled.
+        """
+        if self.journal is None:
+            return False
+        if self.breaker.state == CircuitBreaker.CLOSED and not self.journal.pending:
+            return False
+        self.journal.append(op, args, key)
+        if self.breaker.state == CircuitBreaker.CLOSED:
+            self.journal.start_replay()
+        return True
+
+    def _replay_journaled(self, op, args):
+        """Apply one journaled write; safe to repeat if a replay was interrupted."""
+        try:
+            result = getattr(self, f"_{op}")(*args)
+        except (psycopg2.IntegrityError, sqlite3.IntegrityError) as e:
+            # Already applied before a crash, or overtaken (e.g. the user joined another team)
+            logger.warning(f"Journaled {op}{tuple(args)} conflicts with current data, skipped: {e}")
+            return
+        if op == "join_volunteer_task" and result not in (self.JOIN_JOINED, self.JOIN_DUPLICATE):
+            logger.warning(f"Journaled volunteer join {tuple(args)} was rejected on replay: {result}")
+
+    def journal_stats(self):
+        """Return offline journal counters, or None when there is no journal."""
+        return self.journal.stats() if self.journal is not None else None
+
+    def _postgres_pool(self):
+        if self.pool is None:
+            with self.lock:
+                if self.pool is None:
+                    self.pool = create_postgres_pool(
+                        self.database_url, "profiles",
+                        settings={"pg_trgm.similarity_threshold": Config.FUZZY_MATCH_THRESHOLD}
+                    )
+        return self.pool
+
+    def _sqlite_backend(self):
+        if self.sqlite is None:
+            with self.lock:
+                if self.sqlite is None:
+                    self.sqlite = SQLiteBackend(self.db_path, "profiles")
+        return self.sqlite
+
+    def _cursor(self, conn):
+        """Return a dict-like cursor for Postgres, regular cursor for SQLite."""
+        return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) if self.mode == "postgres" else conn.cursor()
+
+    def _execute(self, cursor, name, params=()):
+        """Run the registered statement ``name`` for the current dialect."""
+        self.queries.execute(cursor, self.mode, name, params, method=caller_name())
+
+    def _executemany(self, cursor, name, seq_of_params):
+        self.queries.executemany(cursor, self.mode, name, seq_of_params, method=caller_name())
+
+    def _execute_dynamic(self, cursor, name, sql, params=()):
+        """Run SQL built per call (variable IN lists and the like), timed under ``name``."""
+        self.queries.execute_dynamic(cursor, self.mode, name, sql, params, method=caller_name())
+
+    def _execute_values(self, cursor, name, rows, fetch=False):
+        """Insert ``rows`` through a ``VALUES %s`` statement in multi-row batches."""
+        return self.queries.execute_values(cursor, self.mode, name, rows, fetch=fetch, method=caller_name())
+
+    @contextmanager
+    def _transaction(self, conn):
+        """Run the enclosed statements as one transaction on either backend."""
+        if self.mode == "postgres":
+            # Pooled connections run in autocommit; group these statements explicitly
+            conn.autocommit = False
+            try:
+                yield
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+        else:
+            try:
+                yield
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def circuit_stats(self):
+        """Return circuit breaker state, or None when not running on PostgreSQL."""
+        return self.breaker.stats() if self.breaker is not None else None
+
+    def pool_stats(self):
+        """Return connection pool counters, or None when not running on PostgreSQL."""
+        return self.pool.stats() if self.pool is not None else None
+
+    def ping(self):
+        """Run a trivial query to prove the database is reachable."""
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "ping")
+            cursor.fetchone()
+        return True
+
+    def latency_stats(self):
+        """Return per-method statement time, connection wait and row histograms (p50/p95/p99/max)."""
+        return self.queries.latency_stats()
+
+    def query_stats(self):
+        """Return per-statement call counts and timings."""
+        return self.queries.stats()
+
+    def cache_stats(self):
+        """Return profile cache hit/miss/eviction counters."""
+        return self.profile_cache.stats()
+
+    def team_cache_stats(self):
+        """Return team cache hit rate and the member/team cache counters."""
+        return self.team_cache.stats()
+
+    def write_batch_stats(self):
+        """Return write batcher counters, or None when batching is off."""
+        return self.write_batcher.stats() if self.write_batcher is not None else None
+
+    def flush_writes(self):
+        """Commit every queued batched write and stop batching; later writes go straight through."""
+        if self.write_batcher is not None:
+            self.write_batcher.close()
+
+    def close(self):
+        """Flush queued writes and release pooled connections on shutdown."""
+        self.flush_writes()
+        if self.journal is not None:
+            self.journal.close()
+        if self.pool is not None:
+            self.pool.close()
+        if self.sqlite is not None:
+            self.sqlite.close()
 
     def setup_database(self):
         """Create tables if they don’t exist."""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor(
-                    cursor_factory=psycopg2.extras.RealDictCursor
-                ) if self.mode == "postgres" else conn.cursor()
+                cursor = self._cursor(conn)
 
                 # Profiles table
                 cursor.execute('''
@@ -152,324 +590,1153 @@ class Database:
                     )
                 ''')
 
+                # Normalized skill/interest tags backing search_profiles
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS profile_tags (
+                        kind TEXT NOT NULL,
+                        tag TEXT NOT NULL,
+                        discord_id TEXT NOT NULL,
+                        PRIMARY KEY (kind, tag, discord_id)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_profile_tags_discord_id ON profile_tags (discord_id)")
+                # Keyset pagination order for browsing and search results
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_updated_at_discord_id ON profiles (updated_at, discord_id)")
+
+                # Incrementally maintained counters behind /profile-stats
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS profile_stats (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tag_counts (
+                        kind TEXT NOT NULL,
+                        tag TEXT NOT NULL,
+                        count INTEGER NOT NULL,
+                        PRIMARY KEY (kind, tag)
+                    )
+                ''')
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_tag_counts_leaderboard ON tag_counts (kind, count DESC, tag)")
+                self._backfill_profile_tags(cursor)
+                self._backfill_profile_stats(cursor)
+                self._setup_fuzzy(cursor)
+
                 if self.mode == "sqlite":
                     conn.commit()
 
+            MigrationRunner("core", CORE_MIGRATIONS).run(self)
+            # After the migrations: on SQLite the index keys on profiles.id, which they add
+            with self.get_connection() as conn:
+                with self._transaction(conn):
+                    self._setup_fulltext(self._cursor(conn))
             logger.info("Database setup complete")
         except Exception as e:
             logger.error(f"Database setup failed: {str(e)}")
+            raise
 
-            # If PostgreSQL fails, try to fall back to SQLite
-            if self.mode == "postgres":
-                logger.warning("PostgreSQL connection failed, falling back to SQLite...")
-                self.mode = "sqlite"
-                self.db_path = Config.DATABASE_PATH
-                try:
-                    self.setup_database()  # Retry with SQLite
-                    logger.info("Successfully fell back to SQLite database")
-                except Exception as fallback_e:
-                    logger.error(f"SQLite fallback also failed: {str(fallback_e)}")
-                    raise fallback_e
+    def _setup_fulltext(self, cursor):
+        """Create the full-text index over profile names, skills and interests."""
+        if self.mode == "postgres":
+            vector = " || ".join(
+                f"setweight(to_tsvector('simple', coalesce({column}, '')), '{label}')"
+                for column, label, _ in self.FULLTEXT_COLUMNS
+            )
+            # A stored generated column is recomputed by Postgres on every write
+            cursor.execute(f"ALTER TABLE profiles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_search_vector ON profiles USING GIN (search_vector)")
+            self.fulltext_enabled = True
+            return
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'profiles_fts'")
+        existed = cursor.fetchone() is not None
+        try:
+            # Rows are keyed by profiles.id, an INTEGER PRIMARY KEY that VACUUM never renumbers
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(
+                    skills, interests, name,
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, full-text search disabled: {e}")
+            return
+
+        # Kept in sync by triggers on profiles
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_insert AFTER INSERT ON profiles BEGIN
+                INSERT INTO profiles_fts (rowid, skills, interests, name)
+                VALUES (new.id, new.skills, new.interests, new.name);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_delete AFTER DELETE ON profiles BEGIN
+                DELETE FROM profiles_fts WHERE rowid = old.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_update AFTER UPDATE OF skills, interests, name ON profiles BEGIN
+                DELETE FROM profiles_fts WHERE rowid = old.id;
+                INSERT INTO profiles_fts (rowid, skills, interests, name)
+                VALUES (new.id, new.skills, new.interests, new.name);
+            END
+        ''')
+        if not existed:
+            cursor.execute(
+                "INSERT INTO profiles_fts (rowid, skills, interests, name) SELECT id, skills, interests, name FROM profiles"
+            )
+            logger.info("Built full-text index for existing profiles")
+        self.fulltext_enabled = True
+
+    def _setup_fuzzy(self, cursor):
+        """Enable pg_trgm for fuzzy tag matching on Postgres; SQLite uses an in-process TrigramIndex."""
+        if self.mode != "postgres":
+            return
+        try:
+            # The index over tag_counts is built by a migration
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            self.pg_trgm_enabled = True
+        except psycopg2.Error as e:
+            logger.warning(f"pg_trgm unavailable, using in-process trigram index: {e}")
+
+    def _backfill_profile_tags(self, cursor):
+        """One-shot fill of profile_tags for profiles created before it existed."""
+        cursor.execute("SELECT 1 FROM profile_tags LIMIT 1")
+        if cursor.fetchone() is not None:
+            return
+
+        cursor.execute("SELECT discord_id, skills, interests FROM profiles")
+        rows = cursor.fetchall()
+        if not rows:
+            return
+
+        for row in rows:
+            self._write_profile_tags(cursor, row["discord_id"], row["skills"], row["interests"])
+        logger.info(f"Backfilled profile tags for {len(rows)} profiles")
+
+    def _write_profile_tags(self, cursor, discord_id, skills, interests):
+        """Replace the tag rows of one profile. Caller owns the transaction."""
+        self._execute(cursor, "profile_tags_delete", (discord_id,))
+
+        rows = [("skill", tag, discord_id) for tag in normalize_tags(skills)]
+        rows += [("interest", tag, discord_id) for tag in normalize_tags(interests)]
+        if rows:
+            self._executemany(cursor, "profile_tags_insert", rows)
+
+    def _get_tag_vocabulary(self, kind):
+        """Load the tags of one kind someone has into a TrigramIndex on first use.
+
+        Writers then keep it in step with tag_counts once they commit
+        (``_apply_vocabulary_changes``), dropping tags whose count reaches zero.
+        """
+        vocabulary = self.tag_vocabulary.get(kind)
+        if vocabulary is not None:
+            return vocabulary
+
+        with self._vocabulary_lock:
+            if kind not in self.tag_vocabulary:
+                with self.get_connection(readonly=True) as conn:
+                    cursor = self._cursor(conn)
+                    self._execute(cursor, "tag_vocabulary", (kind,))
+                    self.tag_vocabulary[kind] = TrigramIndex(row["tag"] for row in cursor.fetchall())
+            return self.tag_vocabulary[kind]
+
+    def _count_profile_stats(self, cursor):
+        """Compute the /profile-stats counters from scratch. Returns (counters, tag_counts)."""
+        self._execute(cursor, "count_profiles")
+        counters = {"total_profiles": cursor.fetchone()["count"]}
+        for kind, name in (("skill", "profiles_with_skills"), ("interest", "profiles_with_interests")):
+            self._execute(cursor, "count_tagged_profiles", (kind,))
+            counters[name] = cursor.fetchone()["count"]
+
+        self._execute(cursor, "count_tags")
+        tag_counts = {(row["kind"], row["tag"]): row["count"] for row in cursor.fetchall()}
+        return counters, tag_counts
+
+    def _store_profile_stats(self, cursor, counters, tag_counts):
+        """Overwrite the stored counters. Caller owns the transaction."""
+        self._execute(cursor, "profile_stats_clear")
+        self._execute(cursor, "tag_counts_clear")
+        self._executemany(cursor, "profile_stats_insert", sorted(counters.items()))
+        if tag_counts:
+            self._executemany(cursor, "tag_counts_insert", [(kind, tag, count) for (kind, tag), count in sorted(tag_counts.items())])
+
+    def _backfill_profile_stats(self, cursor):
+        """One-shot fill of the stats tables for databases created before they existed."""
+        cursor.execute("SELECT 1 FROM profile_stats LIMIT 1")
+        if cursor.fetchone() is not None:
+            return
+        self._store_profile_stats(cursor, *self._count_profile_stats(cursor))
+
+    def _update_profile_stats(self, cursor, old, new):
+        """Apply the counter changes of one profile going from ``old`` to ``new``.
+
+        Both are (skills, interests) tuples, or None when the profile does not
+        exist on that side. Caller owns the transaction. Rows are touched in a
+        fixed order so concurrent writers on Postgres cannot deadlock.
+
+        Returns (kind, tag, present) changes to the tag vocabulary, for
+        ``_apply_vocabulary_changes`` once the transaction has committed.
+        """
+        counter_deltas = {"total_profiles": (new is not None) - (old is not None)}
+        tag_deltas = {}
+        for index, (kind, name) in enumerate((("skill", "profiles_with_skills"), ("interest", "profiles_with_interests"))):
+            old_tags = set(normalize_tags(old[index])) if old is not None else set()
+            new_tags = set(normalize_tags(new[index])) if new is not None else set()
+            counter_deltas[name] = bool(new_tags) - bool(old_tags)
+            for tag in new_tags - old_tags:
+                tag_deltas[(kind, tag)] = 1
+            for tag in old_tags - new_tags:
+                tag_deltas[(kind, tag)] = -1
+
+        for name, delta in sorted(counter_deltas.items()):
+            if delta:
+                self._execute(cursor, "profile_stats_add", (name, delta))
+
+        changes = []
+        for (kind, tag), delta in sorted(tag_deltas.items()):
+            if delta > 0:
+                self._execute(cursor, "tag_count_increment", (kind, tag))
+                changes.append((kind, tag, True))
+                continue
+            self._execute(cursor, "tag_count_decrement", (kind, tag))
+            row = cursor.fetchone()
+            if row is None or row["count"] <= 0:
+                # Nobody has the tag any more
+                if row is not None:
+                    self._execute(cursor, "tag_count_delete", (kind, tag))
+                changes.append((kind, tag, False))
+        return changes
+
+    def _apply_vocabulary_changes(self, changes):
+        """Mirror committed tag_counts changes into the loaded fuzzy-match vocabularies."""
+        for kind, tag, present in changes:
+            vocabulary = self.tag_vocabulary.get(kind)
+            if vocabulary is None:
+                continue
+            if present:
+                vocabulary.add(tag)
             else:
-                raise
+                vocabulary.discard(tag)
+
+    def _closest_tags(self, kind, tag, threshold, limit=3):
+        """Return (tag, similarity) pairs for known tags resembling ``tag``, best first.
+
+        On Postgres the cut-off is the connection's pg_trgm.similarity_threshold
+        (Config.FUZZY_MATCH_THRESHOLD); ``threshold`` applies to the SQLite index.
+        """
+        if self.mode == "postgres" and self.pg_trgm_enabled:
+            with self.get_connection(readonly=True) as conn:
+                cursor = self._cursor(conn)
+                # Exact tags are the common case: one primary key probe, no trigram scan
+                self._execute(cursor, "tag_known", (kind, tag))
+                if cursor.fetchone() is not None:
+                    return [(tag, 1.0)]
+                self._execute(cursor, "trgm_closest_tags", (tag, kind, tag, limit))
+                return [(row["tag"], row["score"]) for row in cursor.fetchall()]
+
+        vocabulary = self._get_tag_vocabulary(kind)
+        if tag in vocabulary:
+            return [(tag, 1.0)]
+        return vocabulary.closest(tag, threshold, limit)
+
+    def _expand_tags(self, kind, tags):
+        """Replace tags nobody uses (usually typos) with the closest known tags."""
+        expanded = []
+        for tag in tags:
+            matches = self._closest_tags(kind, tag, Config.FUZZY_MATCH_THRESHOLD)
+            if not matches or matches[0][0] == tag:
+                candidates = [tag]
+            else:
+                # Keep near-ties ("javscript" -> javascript), drop weaker look-alikes
+                best = matches[0][1]
+                candidates = [match for match, score in matches if score >= best * 0.8]
+                logger.debug(f"Expanded {kind} '{tag}' to {candidates}")
+            expanded.extend(candidate for candidate in candidates if candidate not in expanded)
+        return expanded
 
     # ---------------- PROFILE METHODS ---------------- #
 
     def upsert_profile(self, discord_id, discord_username, name, skills, interests):
-        with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            if self.mode == "postgres":
-                cursor.execute('''
-                    INSERT INTO profiles (discord_id, discord_username, name, skills, interests)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (discord_id) DO UPDATE SET
-                        discord_username = EXCLUDED.discord_username,
-                        name = EXCLUDED.name,
-                        skills = EXCLUDED.skills,
-                        interests = EXCLUDED.interests
-                ''', (discord_id, discord_username, name, skills, interests))
-            else:
-                cursor.execute('''
-                    INSERT INTO profiles (discord_id, discord_username, name, skills, interests)
-                    VALUES (?, ?, ?, ?, ?)
-                    ON CONFLICT(discord_id) DO UPDATE SET
-                        discord_username = excluded.discord_username,
-                        name = excluded.name,
-                        skills = excluded.skills,
-                        interests = excluded.interests
-                ''', (discord_id, discord_username, name, skills, interests))
-                conn.commit()
+        args = (str(discord_id), discord_username, name, skills, interests)
+        if self._journal("upsert_profile", args, key=f"profile:{args[0]}"):
             return True
+        return self._upsert_profile(*args)
+
+    def _upsert_profile(self, *args):
+        if self.write_batcher is not None:
+            return self.write_batcher.call("upsert_profile", *args)
+
+        with self.get_connection() as conn:
+            with self._transaction(conn):
+                result = self._apply_upsert_profile(self._cursor(conn), *args)
+            # Write through while still holding the connection, so cache updates
+            # land in commit order
+            return self._finish_upsert_profile(result)
+
+    def _apply_upsert_profile(self, cursor, discord_id, discord_username, name, skills, interests):
+        # Lock the current row (if any) so the stats delta matches what we replace
+        self._execute(cursor, "profile_lock", (discord_id,))
+        old = cursor.fetchone()
+
+        self._execute(cursor, "profile_upsert", (discord_id, discord_username, name, skills, interests))
+        profile = self._row_to_dict(cursor.fetchall()[0])
+        self._write_profile_tags(cursor, discord_id, skills, interests)
+        vocabulary_changes = self._update_profile_stats(
+            cursor,
+            (old["skills"], old["interests"]) if old is not None else None,
+            (skills, interests)
+        )
+        return profile, vocabulary_changes
+
+    def _finish_upsert_profile(self, result):
+        # Runs after commit: a rolled back upsert must not leave its tags in the vocabulary
+        profile, vocabulary_changes = result
+        self._apply_vocabulary_changes(vocabulary_changes)
+        self.profile_cache.put(profile["discord_id"], profile)
+        # Cached team snapshots carry the owner's display name
+        self._teams_changed(member_id=profile["discord_id"])
+        if self.profile_ids is not None:
+            self.profile_ids.add(profile["discord_id"])
+        return True
 
     def get_profile(self, discord_id):
+        # Discord ids arrive as both str and int; the column and cache key are text
+        discord_id = str(discord_id)
+        if self.journal is not None:
+            pending = self.journal.pending_value(f"profile:{discord_id}")
+            if pending is not None:
+                return self._journaled_profile(*pending[1])
+
+        cached = self.profile_cache.get(discord_id)
+        if cached is not MISSING:
+            return dict(cached) if cached is not None else None
+
+        generation = self.profile_cache.generation
+        try:
+            with self.get_connection(readonly=True) as conn:
+                cursor = self._cursor(conn)
+                self._execute(cursor, "profile_select", (discord_id,))
+                row = cursor.fetchone()
+                profile = self._row_to_dict(row)
+        except DatabaseUnavailableError:
+            # An expired entry beats failing the command; its writes are journaled meanwhile
+            cached = self.profile_cache.peek(discord_id)
+            if cached is MISSING:
+                raise
+            return dict(cached) if cached is not None else None
+
+        # Misses are cached too, so repeated "has a profile?" checks stay off the database
+        self.profile_cache.put(discord_id, profile, generation)
+        return dict(profile) if profile is not None else None
+
+    @staticmethod
+    def _journaled_profile(discord_id, discord_username, name, skills, interests):
+        # Timestamps are unknown until the write is replayed
+        return {
+            "discord_id": discord_id,
+            "discord_username": discord_username,
+            "name": name,
+            "skills": skills,
+            "interests": interests,
+            "created_at": None,
+            "updated_at": None,
+        }
+
+    def delete_profile(self, discord_id):
+        discord_id = str(discord_id)
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "SELECT * FROM profiles WHERE discord_id = %s" if self.mode == "postgres" else "SELECT * FROM profiles WHERE discord_id = ?"
-            cursor.execute(query, (discord_id,))
-            row = cursor.fetchone()
-            return self._row_to_dict(row)
+            with self._transaction(conn):
+                cursor = self._cursor(conn)
+                self._execute(cursor, "profile_tags_delete", (discord_id,))
+                self._execute(cursor, "profile_delete", (discord_id,))
+                old = cursor.fetchone()
+                deleted = old is not None
+                vocabulary_changes = []
+                if deleted:
+                    vocabulary_changes = self._update_profile_stats(cursor, (old["skills"], old["interests"]), None)
+
+            self._apply_vocabulary_changes(vocabulary_changes)
+            self.profile_cache.put(discord_id, None)
+            # Cached team snapshots carry the owner's display name
+            self._teams_changed(member_id=discord_id)
+            if self.profile_ids is not None:
+                self.profile_ids.discard(discord_id)
+            return deleted
+
+    @staticmethod
+    def page_key(profile):
+        """Keyset cursor for ``after=``: the (updated_at, discord_id) of the last row seen."""
+        return (profile["updated_at"], profile["discord_id"])
+
+    def _keyset_filter(self, alias, after):
+        """Return the SQL condition and params restricting rows to those after ``after``."""
+        if after is None:
+            return "", []
+        return f"({alias}.updated_at, {alias}.discord_id) < (%s, %s)", list(after)
+
+    def list_profiles(self, page_size=50, after=None):
+        """Return one page of profiles, most recently updated first."""
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            if after is None:
+                self._execute(cursor, "profiles_page", (page_size,))
+            else:
+                self._execute(cursor, "profiles_page_after", (*after, page_size))
+            rows = cursor.fetchall()
+            return [self._row_to_dict(row) for row in rows]
+
+    def _get_profile_ids(self):
+        """Load every profile id into an IdSampler on first use."""
+        profile_ids = self.profile_ids
+        if profile_ids is not None:
+            return profile_ids
+
+        with self._profile_ids_lock:
+            if self.profile_ids is None:
+                with self.get_connection(readonly=True) as conn:
+                    cursor = self._cursor(conn)
+                    self._execute(cursor, "profile_ids")
+                    self.profile_ids = IdSampler(row["discord_id"] for row in cursor.fetchall())
+            return self.profile_ids
+
+    def get_profiles(self, discord_ids):
+        """Return the profiles for ``discord_ids`` in the same order, skipping unknown ids."""
+        discord_ids = [str(discord_id) for discord_id in discord_ids]
+        profiles = {}
+        missing = []
+        for discord_id in discord_ids:
+            cached = self.profile_cache.get(discord_id)
+            if cached is MISSING:
+                missing.append(discord_id)
+            elif cached is not None:
+                profiles[discord_id] = cached
+
+        if missing:
+            placeholders = ", ".join(["%s"] * len(missing))
+            query = f"SELECT {self.PROFILE_SELECT} FROM profiles p WHERE p.discord_id IN ({placeholders})"
+
+            generation = self.profile_cache.generation
+            with self.get_connection(readonly=True) as conn:
+                cursor = self._cursor(conn)
+                self._execute_dynamic(cursor, "profiles_by_ids", query, tuple(missing))
+                for row in cursor.fetchall():
+                    profile = self._row_to_dict(row)
+                    profiles[profile["discord_id"]] = profile
+                    self.profile_cache.put(profile["discord_id"], profile, generation)
+
+        return [dict(profiles[discord_id]) for discord_id in discord_ids if discord_id in profiles]
+
+    def get_random_profiles(self, count, exclude=None):
+        """Return up to ``count`` distinct random profiles, leaving out ``exclude``.
+
+        Ids are drawn from an in-memory sampler kept current by upsert and
+        delete, so the cost depends on ``count`` and not on the table size.
+        """
+        exclude = str(exclude) if exclude is not None else None
+        profile_ids = self._get_profile_ids()
+        sampled = profile_ids.sample(count, exclude=exclude)
+        profiles = self.get_profiles(sampled)
 
-    def search_profiles(self, skills=None, interests=None, limit=10):
+        if len(profiles) < len(sampled):
+            # Ids deleted behind our back (e.g. by another process); forget them and top up once
+            found = {profile["discord_id"] for profile in profiles}
+            for discord_id in sampled:
+                if discord_id not in found:
+                    profile_ids.discard(discord_id)
+            extra = [
+                discord_id for discord_id in profile_ids.sample(count, exclude=exclude)
+                if discord_id not in found
+            ]
+            profiles += self.get_profiles(extra[:count - len(profiles)])
+        return profiles
+
+    def get_profile_stats(self, top_n=5):
+        """Return the community counters and the ``top_n`` most common skills.
+
+        Reads the incrementally maintained stats tables, so the cost does not
+        grow with the number of profiles.
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+
+            self._execute(cursor, "profile_stats_select")
+            counters = {row["name"]: row["value"] for row in cursor.fetchall()}
+
+            self._execute(cursor, "top_tags", ("skill", top_n))
+            top_skills = [(row["tag"], row["count"]) for row in cursor.fetchall()]
+
+            return {
+                "total_profiles": counters.get("total_profiles", 0),
+                "profiles_with_skills": counters.get("profiles_with_skills", 0),
+                "profiles_with_interests": counters.get("profiles_with_interests", 0),
+                "top_skills": top_skills
+            }
+
+    def reconcile_profile_stats(self):
+        """Recount the stats tables from profiles and fix any drift.
+
+        Returns the number of counters that had to be corrected.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            conditions, params = [], []
+            with self._transaction(conn):
+                cursor = self._cursor(conn)
+                if self.mode == "postgres":
+                    # Hold off concurrent deltas until the recount is stored
+                    cursor.execute("LOCK TABLE profile_stats, tag_counts IN EXCLUSIVE MODE")
 
-            if skills:
-                skills_list = [f"%{skill.strip()}%" for skill in skills.split(",")]
-                conditions.append(" OR ".join(["skills LIKE %s" if self.mode == "postgres" else "skills LIKE ?" for _ in skills_list]))
-                params.extend(skills_list)
+                counters, tag_counts = self._count_profile_stats(cursor)
+                self._execute(cursor, "profile_stats_select")
+                stored_counters = {row["name"]: row["value"] for row in cursor.fetchall()}
+                self._execute(cursor, "tag_counts_select")
+                stored_tags = {(row["kind"], row["tag"]): row["count"] for row in cursor.fetchall()}
 
-            if interests:
-                interests_list = [f"%{interest.strip()}%" for interest in interests.split(",")]
-                conditions.append(" OR ".join(["interests LIKE %s" if self.mode == "postgres" else "interests LIKE ?" for _ in interests_list]))
-                params.extend(interests_list)
+                drift = sum(
+                    1 for name in counters.keys() | stored_counters.keys()
+                    if counters.get(name, 0) != stored_counters.get(name, 0)
+                ) + sum(
+                    1 for key in tag_counts.keys() | stored_tags.keys()
+                    if tag_counts.get(key, 0) != stored_tags.get(key, 0)
+                )
+                if drift:
+                    self._store_profile_stats(cursor, counters, tag_counts)
 
-            if not conditions:
-                return []
+        if drift:
+            logger.warning(f"Profile stats drifted; corrected {drift} counters")
+        return drift
 
-            query = "SELECT * FROM profiles WHERE " + " AND ".join([f"({c})" for c in conditions]) + " ORDER BY updated_at DESC LIMIT %s"
+    def search_profiles(self, skills=None, interests=None, page_size=10, after=None, fuzzy=True):
+        """Find profiles having any of the given skills and any of the given interests.
+
+        Terms are matched against the normalized profile_tags index: tags of the
+        same kind are unioned and the skill and interest sets are intersected.
+        With ``fuzzy``, unknown terms are first swapped for similar known tags.
+        Results are newest first; pass ``after=page_key(last_row)`` for the next page.
+        """
+        tag_sets = [
+            (kind, self._expand_tags(kind, tags) if fuzzy else tags)
+            for kind, tags in (
+                ("skill", normalize_tags(skills)),
+                ("interest", normalize_tags(interests)),
+            ) if tags
+        ]
+        if not tag_sets:
+            return []
+
+        def matches(alias, kind_tags):
+            kind, tags = kind_tags
+            placeholders = ", ".join(["%s"] * len(tags))
+            return (
+                f"EXISTS (SELECT 1 FROM profile_tags t WHERE t.discord_id = {alias}.discord_id "
+                f"AND t.kind = %s AND t.tag IN ({placeholders}))"
+            )
+
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+
+            broad = False
             if self.mode == "sqlite":
-                query = query.replace("%s", "?")
-            params.append(limit)
+                # SQLite keeps no statistics, so pick the plan ourselves from the
+                # (capped) size of each tag set, most selective set first
+                sized = sorted((self._count_tag_matches(cursor, kind, tags), kind, tags) for kind, tags in tag_sets)
+                tag_sets = [(kind, tags) for _, kind, tags in sized]
+                broad = sized[0][0] >= self.SEARCH_SCAN_THRESHOLD
+
+            if broad:
+                # Common tags: walk profiles newest-first and stop after a page of matches
+                conditions = [matches("p", tag_set) for tag_set in tag_sets]
+                keyset, keyset_params = self._keyset_filter("p", after)
+                query = (
+                    f"SELECT {self.PROFILE_SELECT} FROM profiles p WHERE " + " AND ".join(conditions + ([keyset] if keyset else [])) +
+                    " ORDER BY p.updated_at DESC, p.discord_id DESC LIMIT %s"
+                )
+            else:
+                # Selective tags: take candidate ids from the smallest tag set, probe
+                # the others, and sort just the ids before fetching full rows
+                kind, tags = tag_sets[0]
+                conditions = [
+                    "c.discord_id IN (SELECT t.discord_id FROM profile_tags t "
+                    f"WHERE t.kind = %s AND t.tag IN ({', '.join(['%s'] * len(tags))}))"
+                ] + [matches("c", tag_set) for tag_set in tag_sets[1:]]
+                keyset, keyset_params = self._keyset_filter("c", after)
+                query = (
+                    f"SELECT {self.PROFILE_SELECT} FROM profiles p WHERE p.discord_id IN ("
+                    "SELECT c.discord_id FROM profiles c WHERE " + " AND ".join(conditions + ([keyset] if keyset else [])) +
+                    " ORDER BY c.updated_at DESC, c.discord_id DESC LIMIT %s) ORDER BY p.updated_at DESC, p.discord_id DESC"
+                )
+            params = [value for kind, tags in tag_sets for value in [kind] + tags]
+            self._execute_dynamic(cursor, "search_profiles", query, tuple(params + keyset_params + [page_size]))
+            rows = cursor.fetchall()
+            return [self._row_to_dict(row) for row in rows]
+
+    def search_profiles_fulltext(self, skills=None, interests=None, page_size=10):
+        """Relevance-ranked full-text search over skills and interests.
 
-            cursor.execute(query, tuple(params))
+        Within a field, comma separated phrases are alternatives and every word
+        of a phrase must match as a prefix ("react nat" finds "React Native").
+        Results are ordered by bm25 on SQLite and ts_rank on Postgres.
+        """
+        if not self.fulltext_enabled:
+            return self.search_profiles(skills=skills, interests=interests, page_size=page_size)
+
+        labels = {column: label for column, label, _ in self.FULLTEXT_COLUMNS}
+        clauses = []
+        for column, text in (("skills", skills), ("interests", interests)):
+            phrases = [re.findall(r"\w+", phrase.lower()) for phrase in (text or "").split(",")]
+            phrases = [words for words in phrases if words]
+            if not phrases:
+                continue
+            if self.mode == "postgres":
+                clauses.append("(" + " | ".join(
+                    "(" + " & ".join(f"{word}:*{labels[column]}" for word in words) + ")"
+                    for words in phrases
+                ) + ")")
+            else:
+                clauses.append(f"{column} : (" + " OR ".join(
+                    "(" + " AND ".join(f'"{word}"*' for word in words) + ")"
+                    for words in phrases
+                ) + ")")
+
+        if not clauses:
+            return []
+
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            query = " & ".join(clauses) if self.mode == "postgres" else " AND ".join(clauses)
+            self._execute(cursor, "profiles_fulltext", (query, page_size))
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
+    def _count_tag_matches(self, cursor, kind, tags):
+        """Count tag rows matching a set, stopping at SEARCH_SCAN_THRESHOLD."""
+        placeholders = ", ".join(["%s"] * len(tags))
+        self._execute_dynamic(
+            cursor, "count_tag_matches",
+            f"SELECT COUNT(*) AS count FROM (SELECT 1 FROM profile_tags WHERE kind = %s AND tag IN ({placeholders}) LIMIT %s)",
+            (kind, *tags, self.SEARCH_SCAN_THRESHOLD)
+        )
+        return cursor.fetchone()["count"]
+
     # ---------------- TEAM METHODS ---------------- #
 
-    def create_team(self, name, owner_id, owner_username):
+    def create_team(self, name, owner_id, owner_username, description=None, project_idea=None, looking_for=None):
+        """Create a team owned by ``owner_id`` and return (team_id, code).
+
+        Returns None if the owner is already in a team. The membership check,
+        the team, the owner's membership and the tags parsed from
+        ``looking_for`` commit together; the unique index on
+        team_members.discord_id settles concurrent calls.
+        """
+        owner_id = str(owner_id)
+        details = (description or None, project_idea or None, looking_for or None)
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            code = secrets.token_hex(4).upper()
-            try:
-                if self.mode == "postgres":
-                    cursor.execute(
-                        "INSERT INTO teams (name, code, owner_id) VALUES (%s, %s, %s) RETURNING id",
-                        (name, code, owner_id)
-                    )
-                    team_id = cursor.fetchone()["id"]
-                    cursor.execute(
-                        "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (%s, %s, %s)",
-                        (team_id, owner_id, owner_username)
-                    )
-                else:
-                    cursor.execute(
-                        "INSERT INTO teams (name, code, owner_id) VALUES (?, ?, ?)",
-                        (name, code, owner_id)
-                    )
-                    team_id = cursor.lastrowid
-                    cursor.execute(
-                        "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (?, ?, ?)",
-                        (team_id, owner_id, owner_username)
-                    )
-                    conn.commit()
-                return team_id, code
-            except Exception:
-                return self.create_team(name, owner_id, owner_username)
+            for _ in range(self.TEAM_CODE_ATTEMPTS):
+                code = secrets.token_hex(4).upper()
+                try:
+                    with self._transaction(conn):
+                        cursor = self._cursor(conn)
+                        if self.mode == "postgres":
+                            self._execute(cursor, "team_create", (
+                                name, code, owner_id, *details, owner_id, owner_id, owner_username, owner_id
+                            ))
+                            row = cursor.fetchone()
+                            team_id, in_team = row["id"], row["in_team"]
+                        else:
+                            # The SQLite writer connection is exclusive, so check-then-insert is atomic
+                            self._execute(cursor, "team_member_exists", (owner_id,))
+                            in_team = cursor.fetchone() is not None
+                            team_id = None
+                            if not in_team:
+                                self._execute(cursor, "team_insert", (name, code, owner_id, *details))
+                                row = cursor.fetchone()
+                                if row is not None:
+                                    team_id = row["id"]
+                                    self._execute(cursor, "team_member_insert", (team_id, owner_id, owner_username))
+                        if team_id is not None:
+                            self._write_team_tags(cursor, team_id, looking_for)
+                except (psycopg2.IntegrityError, sqlite3.IntegrityError):
+                    # A concurrent call put the owner in a team first
+                    return None
+
+                if in_team:
+                    return None
+                if team_id is not None:
+                    self._teams_changed(member_id=owner_id)
+                    return team_id, code
+                logger.info(f"Team code {code} already taken, drawing another")
+
+        raise RuntimeError(f"Could not find a free team code in {self.TEAM_CODE_ATTEMPTS} attempts")
+
+    def _write_team_tags(self, cursor, team_id, looking_for):
+        """Index the skills a team is looking for. Caller owns the transaction."""
+        tags = normalize_tags(looking_for)
+        if tags:
+            self._executemany(cursor, "team_tags_insert", [(tag, team_id) for tag in tags])
 
     def add_team_member(self, team_id, discord_id, discord_username):
+        # Not journaled: /join-team first looks the team up by code, which fails fast during an outage
+        discord_id = str(discord_id)
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (%s, %s, %s)" if self.mode == "postgres" else "INSERT INTO team_members (team_id, discord_id, discord_username) VALUES (?, ?, ?)"
-            cursor.execute(query, (team_id, discord_id, discord_username))
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_member_insert", (team_id, discord_id, discord_username))
             if self.mode == "sqlite":
                 conn.commit()
+        self._teams_changed(team_id=team_id, member_id=discord_id)
 
     def remove_team_member(self, discord_id):
+        discord_id = str(discord_id)
+        if self._journal("remove_team_member", (discord_id,), key=f"member:{discord_id}"):
+            return True
+        return self._remove_team_member(discord_id)
+
+    def _remove_team_member(self, discord_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "DELETE FROM team_members WHERE discord_id = %s" if self.mode == "postgres" else "DELETE FROM team_members WHERE discord_id = ?"
-            cursor.execute(query, (discord_id,))
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_member_delete", (discord_id,))
             if self.mode == "sqlite":
                 conn.commit()
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+        self._teams_changed(member_id=discord_id)
+        return removed
+
+    def leave_team(self, discord_id, team_id):
+        """Take ``discord_id`` out of team ``team_id`` and delete the team if that emptied it.
+
+        Returns LEAVE_LEFT, LEAVE_NOT_IN_TEAM, or LEAVE_QUEUED when PostgreSQL
+        is down: the leave and the cleanup are then journaled as one write.
+        """
+        args = (str(discord_id), team_id)
+        if self._journal("leave_team", args, key=f"member:{args[0]}"):
+            return self.LEAVE_QUEUED
+        return self._leave_team(*args)
+
+    def _leave_team(self, discord_id, team_id):
+        removed = self._remove_team_member(discord_id)
+        self.delete_team_if_empty(team_id)
+        return self.LEAVE_LEFT if removed else self.LEAVE_NOT_IN_TEAM
 
     def get_team_by_code(self, code):
-        with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "SELECT * FROM teams WHERE code = %s" if self.mode == "postgres" else "SELECT * FROM teams WHERE code = ?"
-            cursor.execute(query, (code,))
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_by_code", (code,))
             row = cursor.fetchone()
             return self._row_to_dict(row)
 
     def get_team_by_member(self, discord_id):
+        """Return the team row for ``discord_id`` with their ``joined_at``, or None."""
+        discord_id = str(discord_id)
+        snapshot = self.get_team_snapshot(discord_id)
+        if snapshot is None:
+            return None
+        team = snapshot["team"]
+        team["joined_at"] = next(
+            (member["joined_at"] for member in snapshot["members"] if member["discord_id"] == discord_id), None
+        )
+        return team
+
+    def get_team_snapshot(self, discord_id):
+        """Return the team ``discord_id`` belongs to, its members and its owner's display name.
+
+        One query in place of get_team_by_member, get_team_members and
+        get_profile(owner). Returns {"team", "members", "owner_name"} with
+        members in join order, or None if the user isn't in a team.
+        """
+        discord_id = str(discord_id)
+        if self._journaled_leave(discord_id):
+            return None
+        cached = self.team_cache.get_snapshot(discord_id)
+        if cached is not MISSING:
+            return self._copy_snapshot(cached)
+
+        generation = self.team_cache.generation
+        try:
+            with self.get_connection(readonly=True) as conn:
+                cursor = self._cursor(conn)
+                self._execute(cursor, "team_snapshot", (discord_id,))
+                rows = [self._row_to_dict(row) for row in cursor.fetchall()]
+        except DatabaseUnavailableError:
+            # Serve the last known roster so a leave can still be journaled
+            cached = self.team_cache.peek_snapshot(discord_id)
+            if cached is MISSING:
+                raise
+            return self._copy_snapshot(cached)
+
+        if not rows:
+            self.team_cache.put_snapshot(discord_id, None, generation)
+            return None
+        first = rows[0]
+        team = {key: first[key] for key in self.TEAM_COLUMNS}
+        members = [
+            {
+                "team_id": team["id"],
+                "discord_id": row["member_id"],
+                "discord_username": row["member_username"],
+                "joined_at": row["member_joined_at"],
+            }
+            for row in rows
+        ]
+        snapshot = {"team": team, "members": members, "owner_name": first["owner_name"] or team["owner_id"]}
+        self.team_cache.put_snapshot(discord_id, snapshot, generation)
+        return self._copy_snapshot(snapshot)
+
+    @staticmethod
+    def _copy_snapshot(snapshot):
+        # Callers may edit what they get back; the cached snapshot must stay intact
+        if snapshot is None:
+            return None
+        return {
+            "team": dict(snapshot["team"]),
+            "members": [dict(member) for member in snapshot["members"]],
+            "owner_name": snapshot["owner_name"],
+        }
+
+    def _journaled_leave(self, discord_id):
+        # A leave still waiting in the journal wins over what PostgreSQL says
+        if self.journal is None:
+            return False
+        pending = self.journal.pending_value(f"member:{discord_id}")
+        return pending is not None and pending[0] in ("remove_team_member", "leave_team")
+
+    def auto_form_teams(self, team_size):
+        """Plan teams of at most ``team_size`` for every profile without a team. Writes nothing.
+
+        Teams are balanced for skill coverage by ``form_teams``. Returns
+        {"unassigned", "teams" (lists of profile dicts), "unplaced" (profiles
+        left over, e.g. a single teamless user), "score"}. Pass the teams as
+        discord_id lists to ``create_formed_teams`` to save exactly this plan.
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "profiles_without_team")
+            people = [
+                {
+                    "discord_id": row["discord_id"],
+                    "discord_username": row["discord_username"],
+                    "name": row["name"],
+                    "skills": normalize_tags(row["skills"]),
+                    "interests": normalize_tags(row["interests"]),
+                }
+                for row in cursor.fetchall()
+            ]
+
+        teams, score = form_teams(people, team_size)
+        placed = {i for team in teams for i in team}
+        return {
+            "unassigned": len(people),
+            "teams": [[people[i] for i in team] for team in teams],
+            "unplaced": [person for i, person in enumerate(people) if i not in placed],
+            "score": score,
+        }
+
+    def create_formed_teams(self, teams, name_prefix="Team"):
+        """Create ``teams`` (lists of discord_ids, owner first) in one transaction.
+
+        Every user must still have a profile and no team; otherwise nothing is
+        written and RuntimeError says how many changed. Returns the created
+        team rows ({"id", "name", "code", "owner_id"}) in the order given.
+        """
+        member_ids = [discord_id for team in teams for discord_id in team]
+        if not member_ids:
+            return []
+
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = '''
-                SELECT t.*, tm.joined_at
-                FROM teams t
-                JOIN team_members tm ON t.id = tm.team_id
-                WHERE tm.discord_id = %s
-            ''' if self.mode == "postgres" else '''
-                SELECT t.*, tm.joined_at
-                FROM teams t
-                JOIN team_members tm ON t.id = tm.team_id
-                WHERE tm.discord_id = ?
-            '''
-            cursor.execute(query, (discord_id,))
-            row = cursor.fetchone()
-            return self._row_to_dict(row)
+            try:
+                with self._transaction(conn):
+                    cursor = self._cursor(conn)
+                    self._execute(cursor, "formation_candidates", (
+                        member_ids if self.mode == "postgres" else json.dumps(member_ids),
+                    ))
+                    usernames = {}
+                    for row in cursor.fetchall():
+                        if not row["in_team"]:
+                            usernames[row["discord_id"]] = row["discord_username"]
+                    changed = len(set(member_ids) - usernames.keys())
+                    if changed:
+                        raise RuntimeError(
+                            f"{changed} of the previewed users joined a team or deleted their profile; nothing was written"
+                        )
+                    created = self._insert_teams(cursor, name_prefix, teams, usernames)
+            except (psycopg2.IntegrityError, sqlite3.IntegrityError) as e:
+                raise RuntimeError("A user joined a team while teams were being created; nothing was written") from e
+
+        # Thousands of users just left the "not in a team" state
+        self.team_cache.clear()
+        self.recommender.mark_dirty()
+        logger.info(f"Auto-formed {len(created)} teams with {len(member_ids)} members")
+        return created
+
+    def _insert_teams(self, cursor, name_prefix, teams, usernames):
+        """Insert teams and their members with multi-row statements. Caller owns the transaction."""
+        created = {}
+        # number -> members, for teams still waiting for a free code
+        pending = dict(enumerate(teams, 1))
+        for _ in range(self.TEAM_CODE_ATTEMPTS):
+            codes = {}
+            for number in pending:
+                code = secrets.token_hex(4).upper()
+                while code in codes:
+                    code = secrets.token_hex(4).upper()
+                codes[code] = number
+            rows = [(f"{name_prefix} {number}", code, pending[number][0]) for code, number in codes.items()]
+            for row in self._execute_values(cursor, "teams_insert_values", rows, fetch=True):
+                number = codes[row["code"]]
+                created[number] = {
+                    "id": row["id"], "name": f"{name_prefix} {number}", "code": row["code"], "owner_id": pending.pop(number)[0]
+                }
+            if not pending:
+                break
+            logger.info(f"{len(pending)} team codes already taken, drawing others")
+        else:
+            raise RuntimeError(f"Could not find free team codes in {self.TEAM_CODE_ATTEMPTS} attempts")
+
+        member_rows = [
+            (created[number]["id"], discord_id, usernames[discord_id])
+            for number, members in enumerate(teams, 1) for discord_id in members
+        ]
+        self._execute_values(cursor, "team_members_insert_values", member_rows)
+        return [created[number] for number in range(1, len(teams) + 1)]
+
+    def _teams_changed(self, team_id=None, member_id=None):
+        """Drop cached team state after a write to teams, memberships or an owner's profile."""
+        if member_id is not None:
+            self.team_cache.invalidate_member(member_id)
+        if team_id is not None:
+            self.team_cache.invalidate_team(team_id)
+        self.recommender.mark_dirty()
 
     def get_team_members(self, team_id):
-        with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "SELECT * FROM team_members WHERE team_id = %s ORDER BY joined_at" if self.mode == "postgres" else "SELECT * FROM team_members WHERE team_id = ? ORDER BY joined_at"
-            cursor.execute(query, (team_id,))
+        cached = self.team_cache.get_team(team_id)
+        if cached is not MISSING:
+            return [dict(member) for member in cached["members"]]
+
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_members", (team_id,))
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
     def delete_team_if_empty(self, team_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "SELECT COUNT(*) FROM team_members WHERE team_id = %s" if self.mode == "postgres" else "SELECT COUNT(*) FROM team_members WHERE team_id = ?"
-            cursor.execute(query, (team_id,))
-            count = cursor.fetchone()[0] if self.mode == "sqlite" else cursor.fetchone()["count"]
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_member_count", (team_id,))
+            count = cursor.fetchone()["count"]
 
             if count == 0:
-                query = "DELETE FROM teams WHERE id = %s" if self.mode == "postgres" else "DELETE FROM teams WHERE id = ?"
-                cursor.execute(query, (team_id,))
+                self._execute(cursor, "team_tags_delete", (team_id,))
+                self._execute(cursor, "team_delete", (team_id,))
                 if self.mode == "sqlite":
                     conn.commit()
+                self._teams_changed(team_id=team_id)
                 return True
             return False
 
     def delete_team(self, team_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            q1 = "DELETE FROM team_members WHERE team_id = %s" if self.mode == "postgres" else "DELETE FROM team_members WHERE team_id = ?"
-            q2 = "DELETE FROM teams WHERE id = %s" if self.mode == "postgres" else "DELETE FROM teams WHERE id = ?"
-            cursor.execute(q1, (team_id,))
-            cursor.execute(q2, (team_id,))
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_members_delete", (team_id,))
+            self._execute(cursor, "team_tags_delete", (team_id,))
+            self._execute(cursor, "team_delete", (team_id,))
             if self.mode == "sqlite":
                 conn.commit()
+        self._teams_changed(team_id=team_id)
 
     def transfer_team_ownership(self, team_id, new_owner_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "UPDATE teams SET owner_id = %s WHERE id = %s" if self.mode == "postgres" else "UPDATE teams SET owner_id = ? WHERE id = ?"
-            cursor.execute(query, (new_owner_id, team_id))
+            cursor = self._cursor(conn)
+            self._execute(cursor, "team_owner_update", (new_owner_id, team_id))
             if self.mode == "sqlite":
                 conn.commit()
+        self._teams_changed(team_id=team_id)
+
+    @staticmethod
+    def team_page_key(team):
+        """Keyset cursor for find_teams ``after=``: the (matches, id) of the last team seen."""
+        return (team["matches"], team["id"])
+
+    def find_teams(self, skills, page_size=10, after=None):
+        """Find open teams looking for any of ``skills``, most matching needs first.
+
+        Comma separated skills are normalized like profile tags and looked up in
+        the team_tags index, so only teams needing at least one of them are
+        counted. Teams with Config.TEAM_MAX_SIZE members are left out. Each
+        team carries ``matches`` (needs matched) and ``size``; ties go to the
+        newest team. Pass ``after=team_page_key(last_row)`` for the next page.
+        """
+        tags = normalize_tags(skills)
+        if not tags:
+            return []
+
+        columns = ", ".join(f"t.{column}" for column in self.TEAM_COLUMNS)
+        keyset = "AND (n.matches, t.id) < (%s, %s) " if after is not None else ""
+        query = (
+            f"SELECT {columns}, n.matches, n.size FROM ("
+            "SELECT tt.team_id, COUNT(*) AS matches, "
+            "(SELECT COUNT(*) FROM team_members m WHERE m.team_id = tt.team_id) AS size "
+            f"FROM team_tags tt WHERE tt.tag IN ({', '.join(['%s'] * len(tags))}) GROUP BY tt.team_id"
+            ") n JOIN teams t ON t.id = n.team_id "
+            f"WHERE n.size < %s {keyset}"
+            "ORDER BY n.matches DESC, t.id DESC LIMIT %s"
+        )
+        params = [*tags, Config.TEAM_MAX_SIZE, *(after or ()), page_size]
+
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute_dynamic(cursor, "find_teams", query, tuple(params))
+            teams = [self._row_to_dict(row) for row in cursor.fetchall()]
+
+        wanted = set(tags)
+        for team in teams:
+            team["matched"] = [tag for tag in normalize_tags(team["looking_for"]) if tag in wanted]
+        return teams
+
+    # ---------------- RECOMMENDATION METHODS ---------------- #
+
+    def _load_recommender_rows(self):
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "recommender_tags")
+            tag_rows = cursor.fetchall()
+            self._execute(cursor, "recommender_memberships")
+            membership_rows = cursor.fetchall()
+        return tag_rows, membership_rows
+
+    def recommend_teammates(self, discord_id, limit=5):
+        """Return profiles that complement ``discord_id``'s skills and share their interests.
+
+        Best first, each profile with ``score``, ``complement``,
+        ``interest_similarity`` and ``brings`` (skills the user lacks) added.
+        Returns None if the user has no profile.
+        """
+        profile = self.get_profile(discord_id)
+        if profile is None:
+            return None
+        matches = self.recommender.recommend(
+            profile["discord_id"], normalize_tags(profile["skills"]), normalize_tags(profile["interests"]), limit
+        )
+        profiles = {p["discord_id"]: p for p in self.get_profiles([m["discord_id"] for m in matches])}
+        return [
+            {**profiles[match["discord_id"]], **match}
+            for match in matches if match["discord_id"] in profiles
+        ]
+
+    def recommender_stats(self):
+        """Return the teammate index size and age."""
+        return self.recommender.stats()
 
     # ---------------- VOLUNTEER METHODS ---------------- #
 
-    def create_volunteer_task(self, title, creator_id, creator_username):
+    def create_volunteer_task(self, title, creator_id, creator_username, max_volunteers=None):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            if self.mode == "postgres":
-                cursor.execute(
-                    "INSERT INTO volunteer_tasks (title, creator_id, creator_username) VALUES (%s, %s, %s) RETURNING id",
-                    (title, creator_id, creator_username)
-                )
-                task_id = cursor.fetchone()["id"]
-            else:
-                cursor.execute(
-                    "INSERT INTO volunteer_tasks (title, creator_id, creator_username) VALUES (?, ?, ?)",
-                    (title, creator_id, creator_username)
-                )
-                task_id = cursor.lastrowid
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_task_insert", (title, creator_id, creator_username, max_volunteers))
+            task_id = cursor.fetchone()["id"]
+            if self.mode == "sqlite":
                 conn.commit()
             return task_id
 
     def get_volunteer_task_by_id(self, task_id):
-        with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "SELECT * FROM volunteer_tasks WHERE id = %s" if self.mode == "postgres" else "SELECT * FROM volunteer_tasks WHERE id = ?"
-            cursor.execute(query, (task_id,))
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_task_by_id", (task_id,))
             row = cursor.fetchone()
             return self._row_to_dict(row)
 
     def get_all_volunteer_tasks(self):
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_tasks_all")
+            rows = cursor.fetchall()
+            return [self._row_to_dict(row) for row in rows]
+
+    def get_volunteer_tasks_by_status(self, status):
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_tasks_by_status", (status,))
+            rows = cursor.fetchall()
+            return [self._row_to_dict(row) for row in rows]
+
+    def set_volunteer_task_status(self, task_id, status):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            cursor.execute("SELECT * FROM volunteer_tasks ORDER BY created_at DESC")
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_task_status_update", (status, task_id))
+            if self.mode == "sqlite":
+                conn.commit()
+            return cursor.rowcount > 0
+
+    def get_volunteer_participants(self, task_id):
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_participants", (task_id,))
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
+    def is_volunteer_participant(self, task_id, discord_id):
+        if self.journal is not None and self.journal.pending_value(f"volunteer:{task_id}:{discord_id}"):
+            return True
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_participant_exists", (task_id, discord_id))
+            return cursor.fetchone() is not None
+
     def join_volunteer_task(self, task_id, discord_id, discord_username):
+        """Add a volunteer if the task is open and under its cap.
+
+        Returns one of the JOIN_* outcomes: "joined", "full", "closed",
+        "duplicate" or "not_found"; "queued" while PostgreSQL is down and the
+        join waits in the offline journal.
+        """
+        args = (task_id, str(discord_id), discord_username)
+        if self._journal("join_volunteer_task", args, key=f"volunteer:{task_id}:{args[1]}"):
+            return self.JOIN_QUEUED
+        return self._join_volunteer_task(*args)
+
+    def _join_volunteer_task(self, task_id, discord_id, discord_username):
+        if self.write_batcher is not None:
+            return self.write_batcher.call("join_volunteer_task", task_id, discord_id, discord_username)
+
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            try:
-                # Check if task exists and is open
-                task = self.get_volunteer_task_by_id(task_id)
-                if not task or task["status"] != "open":
-                    return False
+            with self._transaction(conn):
+                return self._apply_join_volunteer_task(self._cursor(conn), task_id, discord_id, discord_username)
 
-                query = "INSERT INTO volunteer_participants (task_id, discord_id, discord_username) VALUES (%s, %s, %s)" if self.mode == "postgres" else "INSERT INTO volunteer_participants (task_id, discord_id, discord_username) VALUES (?, ?, ?)"
-                cursor.execute(query, (task_id, discord_id, discord_username))
-                if self.mode == "sqlite":
-                    conn.commit()
-                return True
-            except Exception:
-                return False
+    def _apply_join_volunteer_task(self, cursor, task_id, discord_id, discord_username):
+        if self.mode == "sqlite" and not cursor.connection.in_transaction:
+            # Take the write lock before counting, not at the INSERT
+            cursor.execute("BEGIN IMMEDIATE")
+
+        self._execute(cursor, "volunteer_task_lock", (task_id,))
+        task = cursor.fetchone()
+        if task is None:
+            return self.JOIN_NOT_FOUND
+        if task["status"] != "open":
+            return self.JOIN_CLOSED
+
+        self._execute(cursor, "volunteer_participant_insert", (discord_id, discord_username, task_id))
+        if cursor.rowcount == 1:
+            return self.JOIN_JOINED
+
+        self._execute(cursor, "volunteer_participant_exists", (task_id, discord_id))
+        return self.JOIN_DUPLICATE if cursor.fetchone() is not None else self.JOIN_FULL
 
     def leave_volunteer_task(self, task_id, discord_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
-            query = "DELETE FROM volunteer_participants WHERE task_id = %s AND discord_id = %s" if self.mode == "postgres" else "DELETE FROM volunteer_participants WHERE task_id = ? AND discord_id = ?"
-            cursor.execute(query, (task_id, discord_id))
+            cursor = self._cursor(conn)
+            self._execute(cursor, "volunteer_participant_delete", (task_id, discord_id))
             if self.mode == "sqlite":
                 conn.commit()
             return cursor.rowcount > 0
 
     def get_user_volunteer_status(self, discord_id):
-        with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
+        with self.get_connection(readonly=True) as conn:
+            cursor = self._cursor(conn)
 
             # Get tasks created by user
-            created_query = "SELECT * FROM volunteer_tasks WHERE creator_id = %s ORDER BY created_at DESC" if self.mode == "postgres" else "SELECT * FROM volunteer_tasks WHERE creator_id = ? ORDER BY created_at DESC"
-            cursor.execute(created_query, (discord_id,))
+            self._execute(cursor, "volunteer_tasks_created_by", (discord_id,))
             created_rows = cursor.fetchall()
             created = [self._row_to_dict(row) for row in created_rows]
 
             # Get tasks joined by user
-            joined_query = '''
-                SELECT vt.* FROM volunteer_tasks vt
-                JOIN volunteer_participants vp ON vt.id = vp.task_id
-                WHERE vp.discord_id = %s ORDER BY vp.joined_at DESC
-            ''' if self.mode == "postgres" else '''
-                SELECT vt.* FROM volunteer_tasks vt
-                JOIN volunteer_participants vp ON vt.id = vp.task_id
-                WHERE vp.discord_id = ? ORDER BY vp.joined_at DESC
-            '''
-            cursor.execute(joined_query, (discord_id,))
+            self._execute(cursor, "volunteer_tasks_joined_by", (discord_id,))
             joined_rows = cursor.fetchall()
             joined = [self._row_to_dict(row) for row in joined_rows]
 
@@ -477,21 +1744,17 @@ class Database:
 
     def remove_volunteer_task(self, task_id):
         with self.get_connection() as conn:
-            cursor = conn.cursor(
-                cursor_factory=psycopg2.extras.RealDictCursor
-            ) if self.mode == "postgres" else conn.cursor()
+            cursor = self._cursor(conn)
             # Remove participants first
-            q1 = "DELETE FROM volunteer_participants WHERE task_id = %s" if self.mode == "postgres" else "DELETE FROM volunteer_participants WHERE task_id = ?"
-            cursor.execute(q1, (task_id,))
+            self._execute(cursor, "volunteer_participants_delete", (task_id,))
 
             # Remove task
-            q2 = "DELETE FROM volunteer_tasks WHERE id = %s" if self.mode == "postgres" else "DELETE FROM volunteer_tasks WHERE id = ?"
-            cursor.execute(q2, (task_id,))
+            self._execute(cursor, "volunteer_task_delete", (task_id,))
 
             if self.mode == "sqlite":
                 conn.commit()
 
             return cursor.rowcount > 0
 
-
 db = Database()
+async_db = AsyncDatabase(db, max_workers=Config.DATABASE_EXECUTOR_WORKERS, name="profiles")
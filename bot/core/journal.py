@@ -0,0 +1,231 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from config import Config
+from .circuit import DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class WriteJournal:
+    """Append-only local log of writes made while PostgreSQL is unreachable.
+
+    ``append`` returns once the entry is fsynced. Concurrent appends share a
+    commit: the first caller to find no flush running writes everything
+    queued so far in one transaction, and the rest wait for it (group commit).
+
+    ``start_replay`` drains the journal in append order on a background
+    thread through ``apply(op, args)``; entries are removed as they land.
+    Writes stay journaled while entries remain, so a live write can never
+    overtake an older offline one. Each entry may carry a ``key``; until it is
+    replayed, ``pending_value(key)`` returns the latest ``(op, args)`` for that
+    key so reads can merge it in.
+    """
+
+    REPLAY_CHUNK = 100
+
+    def __init__(self, stream, apply, path=None):
+        self.stream = stream
+        self.path = path or Config.OFFLINE_JOURNAL_PATH
+        self._apply = apply
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=Config.DATABASE_POOL_TIMEOUT, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        # The journal exists to survive a crash; every group commit is fully synced
+        self._conn.execute("PRAGMA synchronous = FULL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                stream TEXT NOT NULL,
+                op TEXT NOT NULL,
+                args TEXT NOT NULL,
+                key TEXT,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_stream_seq ON journal (stream, seq)")
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._flushing = False
+        self._next_ticket = 1
+        self._durable = 0
+        self._failed = {}
+        self._pending = 0
+        # key -> [entries not yet replayed, latest (op, args)]
+        self._overlay = {}
+        self._replaying = False
+
+        self._appended = 0
+        self._commits = 0
+        self._replayed = 0
+        self._dropped = 0
+
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT op, args, key FROM journal WHERE stream = ? ORDER BY seq", (stream,)
+            ).fetchall()
+        for op, args, key in rows:
+            self._pending += 1
+            if key is not None:
+                self._remember(key, op, json.loads(args))
+        if rows:
+            logger.warning(f"Journal '{stream}' has {len(rows)} writes left from a previous run")
+
+    @property
+    def pending(self):
+        """Number of journaled writes not yet replayed."""
+        return self._pending
+
+    def pending_value(self, key):
+        """Latest journaled ``(op, args)`` for ``key``, or None if nothing for it is pending."""
+        with self._cond:
+            entry = self._overlay.get(key)
+            return entry[1] if entry is not None else None
+
+    def _remember(self, key, op, args):
+        entry = self._overlay.setdefault(key, [0, None])
+        entry[0] += 1
+        entry[1] = (op, args)
+
+    def _forget(self, key):
+        entry = self._overlay.get(key)
+        if entry is not None:
+            entry[0] -= 1
+            if entry[0] <= 0:
+                del self._overlay[key]
+
+    # ---------------- APPEND ---------------- #
+
+    def append(self, op, args, key=None):
+        """Durably record a write; blocks until its group commit is on disk."""
+        row = (self.stream, op, json.dumps(list(args)), key, time.time())
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._queue.append(row)
+            self._pending += 1
+            if key is not None:
+                self._remember(key, op, list(args))
+
+            while self._durable < ticket:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+
+                # Lead a commit for everything queued so far
+                batch, self._queue = self._queue, []
+                upto = self._next_ticket - 1
+                self._flushing = True
+                self._cond.release()
+                error = None
+                try:
+                    with self._db_lock:
+                        with self._conn:
+                            self._conn.executemany(
+                                "INSERT INTO journal (stream, op, args, key, created_at) VALUES (?, ?, ?, ?, ?)",
+                                batch
+                            )
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                if error is not None:
+                    for failed_ticket in range(upto - len(batch) + 1, upto + 1):
+                        self._failed[failed_ticket] = error
+                    self._pending -= len(batch)
+                    for failed_row in batch:
+                        if failed_row[3] is not None:
+                            self._forget(failed_row[3])
+                else:
+                    self._appended += len(batch)
+                    self._commits += 1
+                self._durable = upto
+                self._flushing = False
+                self._cond.notify_all()
+
+            error = self._failed.pop(ticket, None)
+        if error is not None:
+            raise error
+
+    # ---------------- REPLAY ---------------- #
+
+    def start_replay(self):
+        """Replay pending writes on a background thread, if any and not already running."""
+        with self._cond:
+            if self._replaying or self._pending == 0:
+                return
+            self._replaying = True
+        threading.Thread(target=self._replay_loop, name=f"{self.stream}-journal-replay", daemon=True).start()
+
+    def _replay_loop(self):
+        logger.info(f"Replaying {self._pending} journaled '{self.stream}' writes")
+        try:
+            while True:
+                with self._db_lock:
+                    rows = self._conn.execute(
+                        "SELECT seq, op, args, key FROM journal WHERE stream = ? ORDER BY seq LIMIT ?",
+                        (self.stream, self.REPLAY_CHUNK)
+                    ).fetchall()
+
+                if not rows:
+                    with self._cond:
+                        if self._pending == 0:
+                            logger.info(f"Journal '{self.stream}' drained")
+                            return
+                    # An append is between taking its ticket and committing
+                    time.sleep(0.01)
+                    continue
+
+                for seq, op, args, key in rows:
+                    try:
+                        self._apply(op, json.loads(args))
+                    except DatabaseUnavailableError as e:
+                        # Down again; the next recovery restarts the replay from here
+                        logger.warning(f"Journal '{self.stream}' replay paused: {e}")
+                        return
+                    except Exception as e:
+                        # A write that can no longer apply (e.g. its team is gone) must not block the rest
+                        logger.error(f"Dropping journaled '{self.stream}' write #{seq} {op}: {e}")
+                        with self._cond:
+                            self._dropped += 1
+                    else:
+                        with self._cond:
+                            self._replayed += 1
+
+                    with self._db_lock:
+                        with self._conn:
+                            self._conn.execute("DELETE FROM journal WHERE seq = ?", (seq,))
+                    with self._cond:
+                        self._pending -= 1
+                        if key is not None:
+                            self._forget(key)
+        finally:
+            with self._cond:
+                self._replaying = False
+
+    def stats(self):
+        """Return pending, appended, replayed and dropped counts."""
+        with self._cond:
+            return {
+                "stream": self.stream,
+                "pending": self._pending,
+                "appended": self._appended,
+                "commits": self._commits,
+                "avg_group": self._appended / self._commits if self._commits else 0.0,
+                "replayed": self._replayed,
+                "dropped": self._dropped,
+                "replaying": self._replaying,
+            }
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
@@ -0,0 +1,84 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemberIndex:
+    """Lowercase username -> member ids, per guild, kept current from gateway events.
+
+    Built once per guild when it becomes available, then patched on member
+    join, leave and update events, so resolving a typed username never scans
+    ``guild.members``. Usernames are unique on Discord, but legacy accounts
+    can still share one, so each name maps to a set of ids. Only touched
+    from the event loop, so it needs no locking.
+    """
+
+    def __init__(self):
+        # guild_id -> {lowercase name: {member_id, ...}}
+        self._names = {}
+        # member_id -> {guild_id: lowercase name}
+        self._members = {}
+
+    def __len__(self):
+        return len(self._members)
+
+    def build(self, guild):
+        """(Re)index every cached member of ``guild``."""
+        self.drop_guild(guild.id)
+        self._names[guild.id] = {}
+        for member in guild.members:
+            self.add(member)
+        logger.info(f"Indexed {len(guild.members)} members of guild {guild.id}")
+
+    def drop_guild(self, guild_id):
+        for ids in self._names.pop(guild_id, {}).values():
+            for member_id in ids:
+                guilds = self._members.get(member_id)
+                if guilds is not None:
+                    guilds.pop(guild_id, None)
+                    if not guilds:
+                        del self._members[member_id]
+
+    def add(self, member):
+        """Index ``member`` under its current username, replacing any older one."""
+        self._set(member.guild.id, member.id, member.name.lower())
+
+    def remove(self, member):
+        self._unset(member.guild.id, member.id)
+
+    def rename_user(self, user):
+        """Re-index ``user`` under its new username in every guild it is in."""
+        name = user.name.lower()
+        for guild_id in list(self._members.get(user.id, ())):
+            self._set(guild_id, user.id, name)
+
+    def lookup(self, guild_id, name):
+        """Ids of members of ``guild_id`` whose username is ``name`` (case-insensitive)."""
+        return frozenset(self._names.get(guild_id, {}).get(name.lower(), ()))
+
+    def _set(self, guild_id, member_id, name):
+        guilds = self._members.setdefault(member_id, {})
+        old = guilds.get(guild_id)
+        if old == name:
+            return
+        if old is not None:
+            self._unset(guild_id, member_id)
+            guilds = self._members.setdefault(member_id, {})
+        guilds[guild_id] = name
+        self._names.setdefault(guild_id, {}).setdefault(name, set()).add(member_id)
+
+    def _unset(self, guild_id, member_id):
+        guilds = self._members.get(member_id)
+        if guilds is None:
+            return
+        name = guilds.pop(guild_id, None)
+        if not guilds:
+            del self._members[member_id]
+        if name is None:
+            return
+        names = self._names.get(guild_id, {})
+        ids = names.get(name)
+        if ids is not None:
+            ids.discard(member_id)
+            if not ids:
+                del names[name]
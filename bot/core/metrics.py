@@ -0,0 +1,136 @@
+import sys
+
+
+def caller_name(depth=1):
+    """Name of the method ``depth`` frames above the one calling this.
+
+    Private helpers and comprehensions are skipped in favour of the public
+    method of the same module that called them, so a statement run by
+    ``_write_profile_tags`` is reported under ``upsert_profile``.
+    """
+    frame = sys._getframe(depth + 1)
+    filename = frame.f_code.co_filename
+    while frame.f_code.co_name.startswith(("_", "<")):
+        parent = frame.f_back
+        if parent is None or parent.f_code.co_filename != filename:
+            break
+        frame = parent
+    return frame.f_code.co_name
+
+
+def redact(params):
+    """Describe query parameters by type and size only, never by value."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {_redact_value(value)}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(_redact_value(value) for value in params) + ")"
+
+
+def _redact_value(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class LatencyHistogram:
+    """Log-linear histogram of non-negative integers, HDR-style.
+
+    Values below 2**SUB_BUCKET_BITS are counted exactly; above that every
+    power of two is split into 2**(SUB_BUCKET_BITS - 1) buckets, so any
+    recorded value is reported within ~1.6% regardless of magnitude while
+    memory stays proportional to the number of distinct buckets hit.
+    Not thread-safe; callers hold their own lock.
+    """
+
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    HALF = SUB_BUCKETS >> 1
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value):
+        if value < self.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - self.SUB_BUCKET_BITS
+        return self.HALF * shift + (value >> shift)
+
+    def _highest_equivalent(self, index):
+        if index < self.SUB_BUCKETS:
+            return index
+        shift = index // self.HALF - 1
+        top = index - self.HALF * shift
+        return ((top + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """Smallest bucket value with at least ``q`` percent of recordings at or below it."""
+        if not self.count:
+            return 0
+        target = max(1, -(-self.count * q // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def summary(self, scale=1.0):
+        """Return count, mean, p50/p95/p99 and max, each value multiplied by ``scale``."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count * scale if self.count else 0.0,
+            "p50": self.percentile(50) * scale,
+            "p95": self.percentile(95) * scale,
+            "p99": self.percentile(99) * scale,
+            "max": self.max * scale,
+        }
+
+
+class MethodMetrics:
+    """Statement time, connection wait and row counts for one database method."""
+
+    def __init__(self):
+        self.execute_us = LatencyHistogram()
+        self.wait_us = LatencyHistogram()
+        self.rows = LatencyHistogram()
+
+    def summary(self):
+        return {
+            "statements": self.execute_us.count,
+            "execute_ms": self.execute_us.summary(0.001),
+            "wait_ms": self.wait_us.summary(0.001),
+            "rows": self.rows.summary(),
+        }
+
+
+def format_latency_stats(name, stats):
+    """Render ``latency_stats()`` output as a fixed-width table, slowest p99 first."""
+    lines = [
+        f"Latency by method for '{name}' (ms):",
+        f"  {'method':<32} {'calls':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        f" {'wait p99':>9} {'rows p99':>9}",
+    ]
+    ordered = sorted(stats.items(), key=lambda item: item[1]["execute_ms"]["p99"], reverse=True)
+    for method, summary in ordered:
+        execute = summary["execute_ms"]
+        lines.append(
+            f"  {method:<32} {summary['statements']:>7} {execute['p50']:>8.2f} {execute['p95']:>8.2f}"
+            f" {execute['p99']:>8.2f} {execute['max']:>8.2f} {summary['wait_ms']['p99']:>9.2f}"
+            f" {summary['rows']['p99']:>9.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,308 @@
+import logging
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """One schema change, applied at most once per database.
+
+    ``apply(cursor, mode)`` must be idempotent: a crash between applying and
+    recording the version simply re-runs it on the next start. Migrations with
+    ``transactional=False`` run in autocommit on Postgres, which
+    ``CREATE INDEX CONCURRENTLY`` requires.
+    """
+
+    def __init__(self, version, name, apply, transactional=True):
+        self.version = version
+        self.name = name
+        self.apply = apply
+        self.transactional = transactional
+
+
+def _index_builder(index, table, columns, unique=False, using=None):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    method = f" USING {using}" if using else ""
+
+    def apply(cursor, mode):
+        if mode == "postgres":
+            # A failed concurrent build leaves an invalid index that IF NOT EXISTS would keep
+            cursor.execute(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = %s AND NOT i.indisvalid",
+                (index,)
+            )
+            if cursor.fetchone() is not None:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+            cursor.execute(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {index} ON {table}{method} ({columns})")
+        else:
+            cursor.execute(f"CREATE {kind} IF NOT EXISTS {index} ON {table} ({columns})")
+
+    return apply
+
+
+def create_index(version, index, table, columns, unique=False):
+    """Migration that builds an index without blocking writes on Postgres."""
+    return Migration(version, f"index {index}", _index_builder(index, table, columns, unique), transactional=False)
+
+
+def add_column(version, table, column, definition):
+    """Migration that adds a nullable column; on Postgres this is a catalog-only change."""
+    def apply(cursor, mode):
+        if mode == "postgres":
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {definition}")
+            return
+        cursor.execute(f"PRAGMA table_info({table})")
+        if all(row[1] != column for row in cursor.fetchall()):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    return Migration(version, f"column {table}.{column}", apply)
+
+
+def drop_index(version, index):
+    """Migration that drops an index without blocking writes on Postgres."""
+    def apply(cursor, mode):
+        concurrently = " CONCURRENTLY" if mode == "postgres" else ""
+        cursor.execute(f"DROP INDEX{concurrently} IF EXISTS {index}")
+
+    return Migration(version, f"drop index {index}", apply, transactional=False)
+
+
+class MigrationRunner:
+    """Apply pending migrations in version order and record them in schema_version."""
+
+    def __init__(self, name, migrations):
+        versions = [migration.version for migration in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError(f"Migrations for '{name}' must have unique, increasing versions")
+
+        self.name = name
+        self.migrations = migrations
+        # Postgres advisory lock key, so two bot processes never migrate at once
+        self.lock_key = zlib.crc32(f"migrations:{name}".encode())
+
+    def run(self, database):
+        """Bring ``database`` up to date. Returns the number of migrations applied."""
+        with database.get_connection() as conn:
+            mode = database.mode
+            cursor = conn.cursor()
+            # Keyed by schema as well: the core and email runners may share one database
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    schema TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (schema, version)
+                )
+            ''')
+            if mode == "sqlite":
+                conn.commit()
+            else:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (self.lock_key,))
+
+            try:
+                cursor.execute(self._sql("SELECT version FROM schema_version WHERE schema = %s", mode), (self.name,))
+                applied = {row[0] for row in cursor.fetchall()}
+                pending = [m for m in self.migrations if m.version not in applied]
+                for migration in pending:
+                    self._apply(conn, mode, migration)
+            finally:
+                if mode == "postgres":
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (self.lock_key,))
+
+        if pending:
+            logger.info(f"Schema '{self.name}' migrated to version {pending[-1].version}")
+        return len(pending)
+
+    @staticmethod
+    def _sql(sql, mode):
+        return sql.replace("%s", "?") if mode == "sqlite" else sql
+
+    def _apply(self, conn, mode, migration):
+        record = self._sql(
+            "INSERT INTO schema_version (schema, version, name, duration_ms) VALUES (%s, %s, %s, %s)", mode
+        )
+
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            if mode == "sqlite":
+                # SQLite DDL is transactional and there is no online index build to protect
+                cursor.execute("BEGIN IMMEDIATE")
+                # Another process may have applied it while we waited for the write lock
+                cursor.execute(
+                    "SELECT 1 FROM schema_version WHERE schema = ? AND version = ?", (self.name, migration.version)
+                )
+                if cursor.fetchone() is not None:
+                    conn.commit()
+                    return
+                migration.apply(cursor, mode)
+                duration_ms = (time.perf_counter() - start) * 1000
+                cursor.execute(record, (self.name, migration.version, migration.name, duration_ms))
+                conn.commit()
+            elif migration.transactional:
+                conn.autocommit = False
+                try:
+                    migration.apply(cursor, mode)
+                    duration_ms = (time.perf_counter() - start) * 1000
+                    cursor.execute(record, (self.name, migration.version, migration.name, duration_ms))
+                    conn.commit()
+                finally:
+                    conn.autocommit = True
+            else:
+                migration.apply(cursor, mode)
+                duration_ms = (time.perf_counter() - start) * 1000
+                cursor.execute(record, (self.name, migration.version, migration.name, duration_ms))
+        except Exception as e:
+            if mode == "sqlite" or migration.transactional:
+                conn.rollback()
+            logger.error(f"Migration {self.name}#{migration.version} ({migration.name}) failed: {e}")
+            raise
+
+        logger.info(f"Applied migration {self.name}#{migration.version} ({migration.name}) in {duration_ms:.1f}ms")
+
+
+def _sqlite_integer_primary_key(table, columns):
+    """Rebuild a SQLite table whose ``id SERIAL PRIMARY KEY`` never got values.
+
+    SQLite only auto-assigns ids to INTEGER PRIMARY KEY columns, so these rows
+    have a NULL id; their rowid is what the rest of the schema refers to
+    (it came from ``cursor.lastrowid``), so it becomes the new id.
+    """
+    def apply(cursor, mode):
+        if mode != "sqlite":
+            return
+        cursor.execute(f"PRAGMA table_info({table})")
+        id_type = next((row[2] for row in cursor.fetchall() if row[1] == "id"), "")
+        if id_type.upper() == "INTEGER":
+            return
+
+        column_names = ", ".join(name for name, _ in columns)
+        column_defs = ",\n".join(f"{name} {definition}" for name, definition in columns)
+        cursor.execute(f"CREATE TABLE {table}_rebuild (\nid INTEGER PRIMARY KEY AUTOINCREMENT,\n{column_defs}\n)")
+        cursor.execute(f"INSERT INTO {table}_rebuild (id, {column_names}) SELECT rowid, {column_names} FROM {table}")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+
+    return apply
+
+
+def _sqlite_profiles_integer_id(cursor, mode):
+    """Give SQLite profiles an ``id INTEGER PRIMARY KEY`` for the full-text index to key on.
+
+    Keyed by its text discord_id, the table's implicit rowid may be
+    renumbered by VACUUM; an INTEGER PRIMARY KEY column never is.
+    """
+    _sqlite_integer_primary_key("profiles", [
+        ("discord_id", "TEXT UNIQUE NOT NULL"),
+        ("discord_username", "TEXT NOT NULL"),
+        ("name", "TEXT NOT NULL"),
+        ("skills", "TEXT"),
+        ("interests", "TEXT"),
+        ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ])(cursor, mode)
+    if mode == "sqlite":
+        # Dropped along with the old table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_updated_at_discord_id ON profiles (updated_at, discord_id)")
+
+
+def _tag_trigram_index(cursor, mode):
+    """Trigram index over the tag vocabulary, for fuzzy tag matching with pg_trgm."""
+    if mode != "postgres":
+        # SQLite matches against an in-process TrigramIndex
+        return
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if cursor.fetchone() is None:
+        logger.warning("pg_trgm is not installed, skipping idx_tag_counts_tag_trgm")
+        return
+    _index_builder("idx_tag_counts_tag_trgm", "tag_counts", "tag gin_trgm_ops", using="GIN")(cursor, mode)
+
+
+def _unique_team_membership(cursor, mode):
+    """Keep each user's earliest team membership, then enforce one team per user.
+
+    Racing /create-team and /join-team calls could leave a user in two teams.
+    The cleanup runs right before the build, in the same migration, so a
+    build that fails on a duplicate inserted meanwhile retries both next start.
+    """
+    cursor.execute('''
+        DELETE FROM team_members WHERE EXISTS (
+            SELECT 1 FROM team_members older
+            WHERE older.discord_id = team_members.discord_id
+            AND (older.joined_at < team_members.joined_at
+                 OR (older.joined_at = team_members.joined_at AND older.team_id < team_members.team_id))
+        )
+    ''')
+    if cursor.rowcount > 0:
+        logger.warning(f"Removed {cursor.rowcount} duplicate team memberships")
+    _index_builder("idx_team_members_discord_id_unique", "team_members", "discord_id", unique=True)(cursor, mode)
+
+
+def _team_tags_table(cursor, mode):
+    """Normalized skill tags from each team's "looking for" text, backing find_teams."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS team_tags (
+            tag TEXT NOT NULL,
+            team_id INTEGER NOT NULL,
+            PRIMARY KEY (tag, team_id)
+        )
+    ''')
+
+
+# ---------------- MIGRATIONS ---------------- #
+
+CORE_MIGRATIONS = [
+    Migration(1, "sqlite teams integer id", _sqlite_integer_primary_key("teams", [
+        ("name", "TEXT NOT NULL"),
+        ("code", "TEXT UNIQUE NOT NULL"),
+        ("owner_id", "TEXT NOT NULL"),
+        ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ])),
+    Migration(2, "sqlite volunteer_tasks integer id", _sqlite_integer_primary_key("volunteer_tasks", [
+        ("title", "TEXT NOT NULL"),
+        ("creator_id", "TEXT NOT NULL"),
+        ("creator_username", "TEXT NOT NULL"),
+        ("status", "TEXT DEFAULT 'open'"),
+        ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ])),
+    # get_team_by_member / remove_team_member
+    create_index(3, "idx_team_members_discord_id", "team_members", "discord_id"),
+    # Tasks a user joined, newest first
+    create_index(4, "idx_volunteer_participants_discord_id", "volunteer_participants", "discord_id, joined_at"),
+    # Tasks a user created, newest first
+    create_index(5, "idx_volunteer_tasks_creator_id", "volunteer_tasks", "creator_id, created_at"),
+    # Status-filtered task list, newest first
+    create_index(6, "idx_volunteer_tasks_status_created_at", "volunteer_tasks", "status, created_at"),
+    # Unfiltered task list, newest first
+    create_index(7, "idx_volunteer_tasks_created_at", "volunteer_tasks", "created_at"),
+    # One team per user, so create_team and add_team_member can't race a user into two teams
+    Migration(8, "unique team membership", _unique_team_membership, transactional=False),
+    # Covered by the unique index above
+    drop_index(9, "idx_team_members_discord_id"),
+    # Optional volunteer cap, NULL meaning unlimited
+    add_column(10, "volunteer_tasks", "max_volunteers", "INTEGER"),
+    # Details collected by the team creation modal
+    add_column(11, "teams", "description", "TEXT"),
+    add_column(12, "teams", "project_idea", "TEXT"),
+    add_column(13, "teams", "looking_for", "TEXT"),
+    # Teams by needed skill; the primary key serves the tag lookup
+    Migration(14, "team tags", _team_tags_table),
+    # Clearing a deleted team's tags
+    create_index(15, "idx_team_tags_team_id", "team_tags", "team_id"),
+    # Stable row key for the SQLite full-text index
+    Migration(16, "sqlite profiles integer id", _sqlite_profiles_integer_id),
+    # Fuzzy tag matching over the distinct vocabulary; needs the extension setup_database installs
+    Migration(17, "index idx_tag_counts_tag_trgm", _tag_trigram_index, transactional=False),
+]
+
+EMAIL_MIGRATIONS = [
+    # get_email_logs ordering and cleanup_old_logs range delete
+    create_index(1, "idx_email_logs_sent_at", "email_logs", "sent_at"),
+    create_index(2, "idx_email_logs_status_sent_at", "email_logs", "status, sent_at"),
+    create_index(3, "idx_email_logs_sent_by_sent_at", "email_logs", "sent_by, sent_at"),
+]
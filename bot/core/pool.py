@@ -0,0 +1,314 @@
+import logging
+import threading
+import time
+import psycopg2
+import psycopg2.extensions
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the checkout timeout."""
+    pass
+
+
+class _PoolEntry:
+    """Bookkeeping for a single pooled connection."""
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable DB-API connections.
+
+    Connections are created lazily up to ``max_size`` and handed out LIFO so the
+    hottest connections stay warm. Idle connections older than ``idle_timeout``
+    (or alive longer than ``max_lifetime``) are recycled, and connections that
+    sat idle for more than ``health_check_interval`` seconds are validated with
+    ``health_check`` before being handed out.
+    """
+
+    def __init__(self, connect, name="db", min_size=1, max_size=10,
+                 idle_timeout=300.0, max_lifetime=3600.0, checkout_timeout=10.0,
+                 health_check=None, health_check_interval=30.0, reset=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        self._connect = connect
+        self._health_check = health_check
+        self._reset = reset
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._health_check_failures = 0
+
+        for _ in range(min_size):
+            entry = self._open()
+            with self._cond:
+                self._size += 1
+                self._idle.append(entry)
+
+        self._reaper = threading.Thread(
+            target=self._reap_loop, name=f"{name}-pool-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    # ---------------- CHECKOUT / CHECKIN ---------------- #
+
+    def acquire(self):
+        """Check a connection out of the pool, blocking up to ``checkout_timeout``."""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+
+        while True:
+            entry, must_open = None, False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"Connection pool '{self.name}' is closed")
+
+                    now = time.monotonic()
+                    while self._idle:
+                        candidate = self._idle.pop()
+                        if self._is_expired(candidate, now):
+                            self._discard_locked(candidate)
+                            continue
+                        entry = candidate
+                        break
+
+                    if entry is not None:
+                        break
+
+                    if self._size < self.max_size:
+                        # Reserve the slot now; the (slow) connect happens outside the lock
+                        self._size += 1
+                        must_open = True
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.checkout_timeout:.1f}s waiting for a "
+                            f"'{self.name}' connection ({self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+
+            if must_open:
+                try:
+                    entry = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(entry):
+                with self._cond:
+                    self._discard_locked(entry)
+                    self._health_check_failures += 1
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return entry.conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, closing it if it is broken or ``discard`` is set."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            logger.warning(f"Connection returned to pool '{self.name}' that it does not own")
+            return
+
+        if not discard and self._reset is not None:
+            try:
+                self._reset(conn)
+            except Exception as e:
+                logger.warning(f"Resetting pooled connection failed, discarding it: {e}")
+                discard = True
+
+        if getattr(conn, "closed", False):
+            discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._discard_locked(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager wrapper around acquire()/release()."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # ---------------- MAINTENANCE ---------------- #
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._discard_locked(self._idle.pop())
+            self._cond.notify_all()
+
+    def stats(self):
+        """Return a snapshot of pool utilisation and wait-time counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "size": self._size,
+                "idle": idle,
+                "in_use": len(self._in_use),
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "wait_total_ms": self._wait_total * 1000,
+                "wait_avg_ms": (self._wait_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "health_check_failures": self._health_check_failures,
+            }
+
+    def _open(self):
+        conn = self._connect()
+        with self._cond:
+            self._created += 1
+        return _PoolEntry(conn)
+
+    def _is_expired(self, entry, now):
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return True
+        # Only trim idle connections above the minimum pool size
+        if self.idle_timeout and now - entry.last_used > self.idle_timeout:
+            return self._size > self.min_size
+        return False
+
+    def _is_healthy(self, entry):
+        if getattr(entry.conn, "closed", False):
+            return False
+        if self._health_check is None:
+            return True
+        if time.monotonic() - entry.last_used < self.health_check_interval:
+            return True
+        try:
+            self._health_check(entry.conn)
+            return True
+        except Exception as e:
+            logger.warning(f"Health check failed for pooled '{self.name}' connection: {e}")
+            return False
+
+    def _discard_locked(self, entry):
+        """Close a connection and free its slot. Caller must hold the condition lock."""
+        self._size -= 1
+        self._recycled += 1
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+
+    def _reap_loop(self):
+        interval = max(1.0, min(self.idle_timeout or 60.0, self.max_lifetime or 60.0) / 2)
+        while True:
+            time.sleep(interval)
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                keep = deque()
+                while self._idle:
+                    entry = self._idle.popleft()
+                    if self._is_expired(entry, now):
+                        self._discard_locked(entry)
+                    else:
+                        keep.append(entry)
+                self._idle = keep
+
+
+def create_postgres_pool(database_url, name, settings=None):
+    """Build a connection pool for a PostgreSQL database using the shared pool settings.
+
+    ``settings`` are session parameters applied once to each new connection.
+    """
+    def connect():
+        conn = psycopg2.connect(
+            database_url, sslmode="require", connect_timeout=Config.DATABASE_CONNECT_TIMEOUT
+        )
+        conn.autocommit = True
+        if settings:
+            with conn.cursor() as cursor:
+                for key, value in settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, false)", (key, str(value)))
+        return conn
+
+    def health_check(conn):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    def reset(conn):
+        # Roll back anything a failed caller left open so the next borrower starts clean
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        if not conn.autocommit:
+            conn.autocommit = True
+
+    return ConnectionPool(
+        connect,
+        name=name,
+        min_size=Config.DATABASE_POOL_MIN_SIZE,
+        max_size=Config.DATABASE_POOL_MAX_SIZE,
+        idle_timeout=Config.DATABASE_POOL_IDLE_TIMEOUT,
+        max_lifetime=Config.DATABASE_POOL_MAX_LIFETIME,
+        checkout_timeout=Config.DATABASE_POOL_TIMEOUT,
+        health_check=health_check,
+        health_check_interval=Config.DATABASE_POOL_HEALTH_CHECK_INTERVAL,
+        reset=reset,
+    )
+
+
+def check_postgres(database_url):
+    """Open a throwaway connection and run SELECT 1; raises if the server is unreachable."""
+    conn = psycopg2.connect(database_url, sslmode="require", connect_timeout=Config.DATABASE_CONNECT_TIMEOUT)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        conn.close()
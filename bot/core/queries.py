@@ -0,0 +1,273 @@
+import re
+import logging
+import threading
+import time
+import weakref
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+from config import Config
+from .metrics import MethodMetrics, caller_name, redact
+
+logger = logging.getLogger(__name__)
+
+# "%%" is a literal percent sign (e.g. pg_trgm's % operator), "%s" a parameter
+PLACEHOLDER_PATTERN = re.compile(r"%%|%s")
+
+
+def to_sqlite(sql):
+    """Rewrite a ``%s`` style statement for sqlite3's ``?`` placeholders."""
+    return PLACEHOLDER_PATTERN.sub(lambda m: "%" if m.group() == "%%" else "?", sql)
+
+
+def to_numbered(sql):
+    """Rewrite a ``%s`` style statement with ``$1, $2, ...`` as PREPARE expects. Returns (sql, count)."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group() == "%%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    return PLACEHOLDER_PATTERN.sub(replace, sql), count
+
+
+class Statement:
+    """One named statement compiled for every dialect.
+
+    ``sql`` is either one ``%s`` style string shared by both dialects or a
+    {"postgres": ..., "sqlite": ...} dict where their syntax differs.
+    """
+
+    def __init__(self, registry, name, sql):
+        if isinstance(sql, dict):
+            postgres, sqlite = sql["postgres"], sql["sqlite"]
+        else:
+            postgres = sqlite = sql
+
+        self.name = name
+        self.postgres = postgres
+        self.sqlite = to_sqlite(sqlite)
+
+        # Server-side prepared form: PREPARE once per connection, then EXECUTE
+        self.prepared_name = f"{registry}_{name}"
+        numbered, params = to_numbered(postgres)
+        self.prepare_sql = f"PREPARE {self.prepared_name} AS {numbered}"
+        self.execute_sql = (
+            f"EXECUTE {self.prepared_name} ({', '.join(['%s'] * params)})"
+            if params else f"EXECUTE {self.prepared_name}"
+        )
+
+
+class QueryRegistry:
+    """Named SQL statements compiled once per dialect, with per-statement timing.
+
+    Statements are written once with ``%s`` placeholders. On SQLite they run as
+    ``?`` statements, which sqlite3 keeps in its per-connection statement
+    cache. On Postgres they are PREPAREd on each pooled connection the first
+    time they are used there, so later calls skip parsing and planning.
+
+    Every run is also recorded against the database method that issued it
+    (execution time, rows affected or returned, and connection wait reported
+    through ``record_wait``) in histograms read by ``latency_stats``.
+    Statements or waits slower than ``Config.SLOW_QUERY_MS`` are logged with
+    their parameters redacted.
+    """
+
+    def __init__(self, name, statements, prepare=None):
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            raise ValueError(f"Query registry name must be a lowercase identifier, got {name!r}")
+
+        self.name = name
+        self.prepare = Config.DATABASE_PREPARED_STATEMENTS if prepare is None else prepare
+        self.statements = {key: Statement(name, key, sql) for key, sql in statements.items()}
+
+        self._lock = threading.Lock()
+        # Names PREPAREd on each live Postgres connection
+        self._prepared = weakref.WeakKeyDictionary()
+        # name -> [calls, total seconds, max seconds]
+        self._timings = {}
+        # method -> MethodMetrics
+        self._methods = {}
+        self.slow_threshold = Config.SLOW_QUERY_MS / 1000
+
+    def __contains__(self, name):
+        return name in self.statements
+
+    def sql(self, name, mode):
+        """Return the text of statement ``name`` for ``mode``."""
+        statement = self.statements[name]
+        return statement.postgres if mode == "postgres" else statement.sqlite
+
+    def execute(self, cursor, mode, name, params=(), method=None):
+        """Run statement ``name`` on ``cursor``, attributed to ``method`` (default: the caller)."""
+        method = method or caller_name()
+        statement = self.statements[name]
+        rows = None
+        start = time.perf_counter()
+        try:
+            if mode != "postgres":
+                cursor.execute(statement.sqlite, params)
+            elif self.prepare:
+                self._run_prepared(cursor, statement, lambda: cursor.execute(statement.execute_sql, params))
+            else:
+                cursor.execute(statement.postgres, params)
+            rows = cursor.rowcount
+        except Exception:
+            if mode == "postgres":
+                # The statement may have been lost with a failed transaction; re-check next time
+                self._forget(cursor.connection)
+            raise
+        finally:
+            self._record(name, time.perf_counter() - start, method, rows, params)
+
+    def executemany(self, cursor, mode, name, seq_of_params, method=None):
+        """Run statement ``name`` once per parameter tuple."""
+        method = method or caller_name()
+        statement = self.statements[name]
+        rows = None
+        start = time.perf_counter()
+        try:
+            if mode != "postgres":
+                cursor.executemany(statement.sqlite, seq_of_params)
+            elif self.prepare:
+                self._run_prepared(cursor, statement, lambda: cursor.executemany(statement.execute_sql, seq_of_params))
+            else:
+                cursor.executemany(statement.postgres, seq_of_params)
+            rows = cursor.rowcount
+        except Exception:
+            if mode == "postgres":
+                self._forget(cursor.connection)
+            raise
+        finally:
+            self._record(name, time.perf_counter() - start, method, rows, None)
+
+    def execute_values(self, cursor, mode, name, rows, fetch=False, page_size=500, method=None):
+        """Insert ``rows`` through statement ``name`` as multi-row VALUES, ``page_size`` rows per round trip.
+
+        The statement has a single ``VALUES %s`` placeholder. With ``fetch``
+        the rows of its RETURNING clause are returned, in no particular order.
+        """
+        method = method or caller_name()
+        sql = self.statements[name].postgres
+        results = []
+        start = time.perf_counter()
+        try:
+            if mode == "postgres":
+                results = psycopg2.extras.execute_values(cursor, sql, rows, page_size=page_size, fetch=fetch) or []
+            else:
+                prefix, suffix = sql.split("%s")
+                for i in range(0, len(rows), page_size):
+                    page = rows[i:i + page_size]
+                    values = ", ".join("(" + ", ".join(["?"] * len(row)) + ")" for row in page)
+                    cursor.execute(prefix + values + suffix, [value for row in page for value in row])
+                    if fetch:
+                        results += cursor.fetchall()
+        except Exception:
+            if mode == "postgres":
+                self._forget(cursor.connection)
+            raise
+        finally:
+            self._record(name, time.perf_counter() - start, method, len(rows), None)
+        return results
+
+    def execute_dynamic(self, cursor, mode, name, sql, params=(), method=None):
+        """Run ad-hoc ``%s`` style SQL whose shape varies per call, timed under ``name``."""
+        method = method or caller_name()
+        rows = None
+        start = time.perf_counter()
+        try:
+            cursor.execute(to_sqlite(sql) if mode != "postgres" else sql, params)
+            rows = cursor.rowcount
+        finally:
+            self._record(name, time.perf_counter() - start, method, rows, params)
+
+    def _ensure_prepared(self, cursor, statement):
+        conn = cursor.connection
+        with self._lock:
+            prepared = self._prepared.setdefault(conn, set())
+            if statement.name in prepared:
+                return
+
+        # A rolled back transaction or a schema change can leave a stale or
+        # missing statement behind, so check the server before preparing
+        cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (statement.prepared_name,))
+        if cursor.fetchone() is not None:
+            cursor.execute(f"DEALLOCATE {statement.prepared_name}")
+        cursor.execute(statement.prepare_sql)
+        with self._lock:
+            self._prepared.setdefault(conn, set()).add(statement.name)
+
+    def _run_prepared(self, cursor, statement, run):
+        """Call ``run`` once ``statement`` is prepared, re-preparing and retrying once if its plan went stale."""
+        self._ensure_prepared(cursor, statement)
+        try:
+            run()
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type": another process changed a
+            # table under the plan. Only retry when no transaction was aborted with it
+            if cursor.connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                raise
+            logger.info(f"Re-preparing {self.name}.{statement.name} after a schema change")
+            self._forget(cursor.connection)
+            self._ensure_prepared(cursor, statement)
+            run()
+
+    def _forget(self, conn):
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def _metrics(self, method):
+        metrics = self._methods.get(method)
+        if metrics is None:
+            metrics = self._methods[method] = MethodMetrics()
+        return metrics
+
+    def _record(self, name, elapsed, method, rows, params):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, elapsed, elapsed]
+            else:
+                timing[0] += 1
+                timing[1] += elapsed
+                timing[2] = max(timing[2], elapsed)
+
+            metrics = self._metrics(method)
+            metrics.execute_us.record(elapsed * 1_000_000)
+            # SQLite reports -1 for SELECTs; only count what the driver knows
+            if rows is not None and rows >= 0:
+                metrics.rows.record(rows)
+
+        if self.slow_threshold and elapsed >= self.slow_threshold:
+            logger.warning(
+                f"Slow query {self.name}.{name} in {method}: {elapsed * 1000:.1f}ms, "
+                f"rows={rows if rows is not None and rows >= 0 else '?'}, params={redact(params)}"
+            )
+
+    def record_wait(self, method, elapsed):
+        """Record time ``method`` spent waiting for a connection (pool or SQLite writer lock)."""
+        with self._lock:
+            self._metrics(method).wait_us.record(elapsed * 1_000_000)
+        if self.slow_threshold and elapsed >= self.slow_threshold:
+            logger.warning(f"Slow connection wait in {self.name}.{method}: {elapsed * 1000:.1f}ms")
+
+    def stats(self):
+        """Return {name: {calls, avg_ms, max_ms, total_ms}} for every statement run so far."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": calls,
+                    "avg_ms": total / calls * 1000,
+                    "max_ms": worst * 1000,
+                    "total_ms": total * 1000,
+                }
+                for name, (calls, total, worst) in self._timings.items()
+            }
+
+    def latency_stats(self):
+        """Return {method: {statements, execute_ms, wait_ms, rows}} with p50/p95/p99/max each."""
+        with self._lock:
+            return {method: metrics.summary() for method, metrics in self._methods.items()}
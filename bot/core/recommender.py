@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class RecommenderIndex:
+    """Immutable snapshot of every tagged profile as sparse skill and interest vectors."""
+
+    def __init__(self, tag_rows, membership_rows):
+        self.ids = sorted({row["discord_id"] for row in tag_rows})
+        self.position = {discord_id: i for i, discord_id in enumerate(self.ids)}
+        self.vocabulary = {"skill": {}, "interest": {}}
+        entries = {"skill": ([], []), "interest": ([], [])}
+        for row in tag_rows:
+            vocabulary = self.vocabulary.get(row["kind"])
+            if vocabulary is None:
+                continue
+            column = vocabulary.setdefault(row["tag"], len(vocabulary))
+            entries[row["kind"]][0].append(self.position[row["discord_id"]])
+            entries[row["kind"]][1].append(column)
+
+        size = len(self.ids)
+        self.skills = self._matrix(entries["skill"], size, len(self.vocabulary["skill"]))
+        self.interests = self._matrix(entries["interest"], size, len(self.vocabulary["interest"]))
+        self.skill_counts = np.diff(self.skills.indptr).astype(np.float64)
+        self.interest_counts = np.diff(self.interests.indptr).astype(np.float64)
+        self.skill_names = sorted(self.vocabulary["skill"], key=self.vocabulary["skill"].get)
+
+        # -1: not in a team
+        self.team_ids = np.full(size, -1, dtype=np.int64)
+        self.team_sizes = np.zeros(size, dtype=np.int64)
+        for row in membership_rows:
+            i = self.position.get(row["discord_id"])
+            if i is not None:
+                self.team_ids[i] = row["team_id"]
+                self.team_sizes[i] = row["size"]
+
+    @staticmethod
+    def _matrix(entries, rows, columns):
+        matrix = sparse.csr_matrix(
+            (np.ones(len(entries[0])), entries), shape=(rows, columns)
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    def __len__(self):
+        return len(self.ids)
+
+    def columns(self, kind, tags):
+        """Vocabulary columns for ``tags``; tags nobody else has are dropped."""
+        vocabulary = self.vocabulary[kind]
+        return sorted({vocabulary[tag] for tag in tags if tag in vocabulary})
+
+
+class TeammateRecommender:
+    """Suggest teammates whose skills complement a user's and whose interests overlap.
+
+    For user u and candidate c, over their skill sets S and interest sets I:
+
+        complement = |S_c - S_u| / |S_c ∪ S_u|         what only c brings
+        interests  = |I_c ∩ I_u| / sqrt(|I_c| |I_u|)   cosine similarity
+        score      = SKILL_WEIGHT * complement + INTEREST_WEIGHT * interests
+
+    A clone of u scores zero on complement, so it ranks below someone who
+    shares u's interests and fills their gaps. Every candidate is scored at
+    once with one sparse mat-vec per matrix; u, u's teammates and members
+    of full teams (Config.TEAM_MAX_SIZE) are masked out before the top-k.
+
+    ``load()`` returns (tag rows, membership rows). The index is built on
+    first use; after ``mark_dirty`` it is rebuilt on a background thread at
+    most every Config.RECOMMENDER_REFRESH_SECONDS, and queries keep using
+    the previous index meanwhile.
+    """
+
+    SKILL_WEIGHT = 0.6
+    INTEREST_WEIGHT = 0.4
+
+    def __init__(self, load, refresh_interval=None):
+        self._load = load
+        self.refresh_interval = (
+            Config.RECOMMENDER_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self._index = None
+        self._built_at = 0.0
+        self._dirty = False
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    def mark_dirty(self):
+        """Note that profiles or teams changed; the next query schedules a rebuild."""
+        self._dirty = True
+
+    def _build(self):
+        # Clear first so writes landing during the load mark the new index stale again
+        self._dirty = False
+        start = time.perf_counter()
+        tag_rows, membership_rows = self._load()
+        index = RecommenderIndex(tag_rows, membership_rows)
+        self._index = index
+        self._built_at = time.monotonic()
+        logger.info(f"Teammate index built: {len(index)} profiles in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+    def _rebuild_in_background(self):
+        try:
+            self._build()
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Teammate index rebuild failed: {e}")
+        finally:
+            self._rebuilding = False
+
+    def current(self):
+        """Return the current index, building it on first use and refreshing it when stale."""
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    return self._build()
+                return self._index
+
+        if self._dirty and time.monotonic() - self._built_at >= self.refresh_interval:
+            with self._lock:
+                if not self._rebuilding:
+                    self._rebuilding = True
+                    threading.Thread(
+                        target=self._rebuild_in_background, name="teammate-index", daemon=True
+                    ).start()
+        return index
+
+    def recommend(self, discord_id, skills, interests, limit=5):
+        """Return up to ``limit`` candidates, best first.
+
+        ``skills``/``interests`` are the user's normalized tags. Each result
+        is {"discord_id", "score", "complement", "interest_similarity",
+        "brings"}, where ``brings`` lists the candidate's skills the user
+        lacks.
+        """
+        index = self.current()
+        if not len(index) or limit < 1:
+            return []
+
+        skill_columns = index.columns("skill", skills)
+        interest_columns = index.columns("interest", interests)
+        user_skills = np.zeros(index.skills.shape[1])
+        user_skills[skill_columns] = 1.0
+        user_interests = np.zeros(index.interests.shape[1])
+        user_interests[interest_columns] = 1.0
+
+        # Count tags the user has outside the index too, so the union isn't understated
+        skill_total = float(len(skills))
+        overlap = index.skills @ user_skills
+        union = index.skill_counts + skill_total - overlap
+        complement = np.divide(
+            index.skill_counts - overlap, union, out=np.zeros_like(union), where=union > 0
+        )
+
+        shared = index.interests @ user_interests
+        norms = np.sqrt(index.interest_counts * float(len(interests)))
+        interest_similarity = np.divide(shared, norms, out=np.zeros_like(norms), where=norms > 0)
+
+        scores = self.SKILL_WEIGHT * complement + self.INTEREST_WEIGHT * interest_similarity
+        scores[index.team_sizes >= Config.TEAM_MAX_SIZE] = -np.inf
+        me = index.position.get(str(discord_id))
+        if me is not None:
+            scores[me] = -np.inf
+            if index.team_ids[me] >= 0:
+                scores[index.team_ids == index.team_ids[me]] = -np.inf
+
+        # Partial selection of the k best, then order just those
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+
+        user_skill_set = set(skill_columns)
+        results = []
+        for i in top:
+            if not scores[i] > 0:
+                break
+            row = index.skills.indices[index.skills.indptr[i]:index.skills.indptr[i + 1]]
+            results.append({
+                "discord_id": index.ids[i],
+                "score": float(scores[i]),
+                "complement": float(complement[i]),
+                "interest_similarity": float(interest_similarity[i]),
+                "brings": [index.skill_names[column] for column in row if column not in user_skill_set],
+            })
+        return results
+
+    def stats(self):
+        index = self._index
+        return {
+            "profiles": len(index) if index is not None else 0,
+            "skills": len(index.vocabulary["skill"]) if index is not None else 0,
+            "interests": len(index.vocabulary["interest"]) if index is not None else 0,
+            "age_s": time.monotonic() - self._built_at if index is not None else None,
+            "stale": self._dirty,
+        }
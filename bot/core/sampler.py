@@ -0,0 +1,49 @@
+import random
+import threading
+
+
+class IdSampler:
+    """Thread-safe set of ids that supports O(1) add, remove and uniform sampling.
+
+    Ids live in a dense list with a position map beside it. Removal swaps the
+    last id into the freed slot, so the list never has holes and sampling
+    never needs to scan or retry.
+    """
+
+    def __init__(self, ids=()):
+        self._lock = threading.Lock()
+        self._ids = []
+        self._positions = {}
+        for id_ in ids:
+            self.add(id_)
+
+    def __contains__(self, id_):
+        return id_ in self._positions
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, id_):
+        with self._lock:
+            if id_ in self._positions:
+                return
+            self._positions[id_] = len(self._ids)
+            self._ids.append(id_)
+
+    def discard(self, id_):
+        with self._lock:
+            position = self._positions.pop(id_, None)
+            if position is None:
+                return
+            last = self._ids.pop()
+            if position < len(self._ids):
+                self._ids[position] = last
+                self._positions[last] = position
+
+    def sample(self, count, exclude=None):
+        """Return up to ``count`` distinct ids chosen uniformly at random, never ``exclude``."""
+        with self._lock:
+            # Draw one spare in case the excluded id comes up
+            picked = random.sample(self._ids, min(count + 1, len(self._ids)))
+        picked = [id_ for id_ in picked if id_ != exclude]
+        return picked[:count]
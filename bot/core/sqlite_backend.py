@@ -0,0 +1,113 @@
+import os
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from .pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteBackend:
+    """Long-lived SQLite connections in WAL mode.
+
+    All writes go through one serialized writer connection, while reads borrow
+    from a small pool of reader connections. With WAL, readers see the last
+    committed snapshot and never wait for a writer that is mid-transaction, so
+    searches keep running while a profile upsert commits.
+    """
+
+    def __init__(self, db_path, name="db", readers=None):
+        self.db_path = db_path
+        self.name = name
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Re-entrant so a write method can call another write helper on the same thread
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode = WAL")
+
+        self._write_count = 0
+        self._write_wait_total = 0.0
+        self._write_wait_max = 0.0
+
+        self._readers = ConnectionPool(
+            lambda: self._connect(readonly=True),
+            name=f"{name}-sqlite-read",
+            min_size=0,
+            max_size=readers or Config.SQLITE_READER_CONNECTIONS,
+            idle_timeout=0,
+            max_lifetime=0,
+            checkout_timeout=Config.DATABASE_POOL_TIMEOUT,
+            reset=self._end_transaction,
+        )
+        logger.info(f"SQLite backend '{name}' opened {db_path} in WAL mode")
+
+    def _connect(self, readonly=False):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=Config.DATABASE_POOL_TIMEOUT,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{int(Config.SQLITE_CACHE_SIZE_KB)}")
+        conn.execute(f"PRAGMA mmap_size = {int(Config.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            # Guard against a write slipping through a reader connection
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @staticmethod
+    def _end_transaction(conn):
+        if conn.in_transaction:
+            conn.rollback()
+
+    @contextmanager
+    def connection(self, readonly=False):
+        """Yield the writer connection, or a pooled reader when ``readonly`` is set."""
+        if readonly:
+            with self._readers.connection() as conn:
+                yield conn
+            return
+
+        start = time.monotonic()
+        with self._write_lock:
+            waited = time.monotonic() - start
+            self._write_count += 1
+            self._write_wait_total += waited
+            self._write_wait_max = max(self._write_wait_max, waited)
+            try:
+                yield self._writer
+            finally:
+                # Don't leak a half-finished transaction to the next writer
+                self._end_transaction(self._writer)
+
+    def stats(self):
+        """Return writer wait counters alongside the reader pool snapshot."""
+        with self._write_lock:
+            writes = self._write_count
+            wait_total = self._write_wait_total
+            wait_max = self._write_wait_max
+        return {
+            "writes": writes,
+            "write_wait_avg_ms": (wait_total / writes * 1000) if writes else 0.0,
+            "write_wait_max_ms": wait_max * 1000,
+            "readers": self._readers.stats(),
+        }
+
+    def close(self):
+        """Close the reader pool and the writer connection."""
+        self._readers.close()
+        with self._write_lock:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
@@ -0,0 +1,117 @@
+import math
+import random
+import numpy as np
+
+
+def team_sizes(count, team_size):
+    """Split ``count`` people into as few teams of at most ``team_size`` as possible, sizes within one.
+
+    One person can't form a team, so a count below two yields none; callers
+    report that person as not placed.
+    """
+    if count < 2:
+        return []
+    teams = math.ceil(count / team_size)
+    base, extra = divmod(count, teams)
+    return [base + 1] * extra + [base] * (teams - extra)
+
+
+def _tag_columns(people, key):
+    vocabulary = {}
+    columns = [
+        np.array(sorted({vocabulary.setdefault(tag, len(vocabulary)) for tag in person[key]}), dtype=np.int64)
+        for person in people
+    ]
+    return columns, len(vocabulary)
+
+
+def score_assignment(people, teams):
+    """Summarize how well ``teams`` (lists of indexes into ``people``) spread skills and share interests.
+
+    ``coverage`` is the mean number of distinct skills per team,
+    ``redundancy`` the share of member skills another teammate already has,
+    and ``shared_interest_rate`` the share of teams where at least two
+    members have an interest in common.
+    """
+    if not teams:
+        return {"teams": 0, "coverage": 0.0, "min_coverage": 0, "redundancy": 0.0, "shared_interest_rate": 0.0}
+
+    coverages, redundant, slots, shared = [], 0, 0, 0
+    for team in teams:
+        skills = [tag for i in team for tag in people[i]["skills"]]
+        distinct = len(set(skills))
+        coverages.append(distinct)
+        redundant += len(skills) - distinct
+        slots += len(skills)
+        interests = [tag for i in team for tag in people[i]["interests"]]
+        shared += len(interests) > len(set(interests))
+    return {
+        "teams": len(teams),
+        "coverage": sum(coverages) / len(teams),
+        "min_coverage": min(coverages),
+        "redundancy": redundant / slots if slots else 0.0,
+        "shared_interest_rate": shared / len(teams),
+    }
+
+
+def form_teams(people, team_size, seed=0):
+    """Partition ``people`` into teams that each cover as many distinct skills as possible.
+
+    ``people`` are dicts with ``skills`` and ``interests`` tag lists. Greedy
+    assignment: people holding the rarest skills are placed first, each into
+    the open team where their skills add the most uncovered, rarity-weighted
+    coverage, plus a smaller bonus for interests the team already has. Ties
+    go to the emptier team, which keeps fill even. Every step is one
+    vectorized pass over all teams, so 10k people take about a second.
+
+    Returns (teams, score): teams as lists of indexes into ``people``, and
+    ``score_assignment`` of the result with a ``baseline`` of the same
+    metrics for a random partition of equal sizes.
+    """
+    sizes = team_sizes(len(people), team_size)
+    if not sizes:
+        return [], score_assignment(people, [])
+
+    skill_columns, skill_count = _tag_columns(people, "skills")
+    interest_columns, interest_count = _tag_columns(people, "interests")
+
+    # Rarity weight per skill: a skill only a few people have is worth spreading
+    frequency = np.zeros(skill_count)
+    for columns in skill_columns:
+        frequency[columns] += 1
+    rarity = np.log1p(len(people) / np.maximum(frequency, 1))
+    weight = np.array([rarity[columns].sum() for columns in skill_columns])
+
+    capacity = np.array(sizes)
+    members = np.zeros(len(sizes), dtype=np.int64)
+    covered = np.zeros((len(sizes), skill_count), dtype=bool)
+    interested = np.zeros((len(sizes), interest_count), dtype=bool)
+    teams = [[] for _ in sizes]
+
+    # Rarest, broadest profiles first; the random tiebreak avoids bias from registration order
+    order = list(range(len(people)))
+    random.Random(seed).shuffle(order)
+    order.sort(key=lambda i: -weight[i])
+    for i in order:
+        skills, interests = skill_columns[i], interest_columns[i]
+        gain = (~covered[:, skills]) @ rarity[skills] if len(skills) else np.zeros(len(sizes))
+        if len(interests):
+            gain = gain + 0.25 * interested[:, interests].any(axis=1)
+        gain = gain - 1e-3 * members
+        gain[members >= capacity] = -np.inf
+
+        team = int(np.argmax(gain))
+        teams[team].append(i)
+        members[team] += 1
+        covered[team, skills] = True
+        interested[team, interests] = True
+
+    score = score_assignment(people, teams)
+    shuffled = list(range(len(people)))
+    random.Random(seed).shuffle(shuffled)
+    baseline, start = [], 0
+    for size in sizes:
+        baseline.append(shuffled[start:start + size])
+        start += size
+    score["baseline"] = score_assignment(people, baseline)
+    return teams, score
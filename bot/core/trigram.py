@@ -0,0 +1,88 @@
+import re
+import threading
+from collections import Counter, defaultdict
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(text):
+    """Return the pg_trgm style trigram set of ``text``.
+
+    Each word is lowercased and padded with two leading spaces and one
+    trailing space, so "go" yields {"  g", " go", "go "}.
+    """
+    grams = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets, as pg_trgm's similarity()."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TrigramIndex:
+    """Thread-safe in-memory trigram index over a vocabulary of short strings.
+
+    Lookups only touch the posting lists of the query's own trigrams, so their
+    cost depends on the term and the vocabulary, never on how many profiles
+    use each word.
+    """
+
+    def __init__(self, words=()):
+        self._lock = threading.Lock()
+        self._grams = {}
+        self._postings = defaultdict(set)
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, word):
+        return word in self._grams
+
+    def __len__(self):
+        return len(self._grams)
+
+    def add(self, word):
+        with self._lock:
+            if word in self._grams:
+                return
+            grams = trigrams(word)
+            self._grams[word] = grams
+            for gram in grams:
+                self._postings[gram].add(word)
+
+    def discard(self, word):
+        with self._lock:
+            grams = self._grams.pop(word, None)
+            if grams is None:
+                return
+            for gram in grams:
+                self._postings[gram].discard(word)
+                if not self._postings[gram]:
+                    del self._postings[gram]
+
+    def closest(self, term, threshold=0.3, limit=3):
+        """Return up to ``limit`` (word, score) pairs at or above ``threshold``, best first."""
+        query = trigrams(term)
+        if not query:
+            return []
+
+        with self._lock:
+            shared = Counter()
+            for gram in query:
+                shared.update(self._postings.get(gram, ()))
+
+            scored = []
+            for word, overlap in shared.items():
+                score = overlap / (len(query) + len(self._grams[word]) - overlap)
+                if score >= threshold:
+                    scored.append((word, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
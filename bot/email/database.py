@@ -1,67 +1,240 @@
-import os
 import sqlite3
 import psycopg2
 import psycopg2.extras
 import logging
 import threading
+import time
 from contextlib import contextmanager
 from config import Config
 from typing import Optional, List, Dict, Any
+from bot.core.pool import PoolTimeoutError, create_postgres_pool, check_postgres
+from bot.core.circuit import CircuitBreaker, DatabaseUnavailableError
+from bot.core.sqlite_backend import SQLiteBackend
+from bot.core.async_database import AsyncDatabase
+from bot.core.migrations import MigrationRunner, EMAIL_MIGRATIONS
+from bot.core.queries import QueryRegistry
+from bot.core.metrics import caller_name
+from bot.core.batcher import WriteBatcher
+from bot.core.journal import WriteJournal
 
 logger = logging.getLogger(__name__)
 
 class EmailDatabase:
+    # Row keys. Prepared statements name their columns: a plan built on * stops
+    # matching once a migration adds a column
+    TEMPLATE_COLUMNS = ", ".join(("id", "category", "name", "subject", "body", "tone", "placeholders", "created_at", "updated_at"))
+    LOG_COLUMNS = ", ".join((
+        "id", "template_id", "template_name", "recipient_email_hash",
+        "recipient_name", "status", "error_message", "sent_at", "sent_by",
+    ))
+
+    # Every fixed statement the methods below run, compiled once per dialect by QueryRegistry
+    QUERIES = {
+        # Templates
+        "template_insert": '''
+            INSERT INTO email_templates
+            (id, category, name, subject, body, tone, placeholders)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ''',
+        "template_by_id": f"SELECT {TEMPLATE_COLUMNS} FROM email_templates WHERE id = %s",
+        "template_by_name": f"SELECT {TEMPLATE_COLUMNS} FROM email_templates WHERE category = %s AND name = %s",
+        "templates_by_category": f"SELECT {TEMPLATE_COLUMNS} FROM email_templates WHERE category = %s ORDER BY name",
+        "templates_all": f"SELECT {TEMPLATE_COLUMNS} FROM email_templates ORDER BY category, name",
+        "template_delete": "DELETE FROM email_templates WHERE id = %s",
+
+        # Logs
+        "log_insert": '''
+            INSERT INTO email_logs
+            (id, template_id, template_name, recipient_email_hash,
+             recipient_name, status, error_message, sent_by)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''',
+        "logs": f"SELECT {LOG_COLUMNS} FROM email_logs ORDER BY sent_at DESC LIMIT %s OFFSET %s",
+        "logs_by_status": f"SELECT {LOG_COLUMNS} FROM email_logs WHERE status = %s ORDER BY sent_at DESC LIMIT %s OFFSET %s",
+        "logs_by_sender": f"SELECT {LOG_COLUMNS} FROM email_logs WHERE sent_by = %s ORDER BY sent_at DESC LIMIT %s OFFSET %s",
+        "logs_by_status_and_sender": f"SELECT {LOG_COLUMNS} FROM email_logs WHERE status = %s AND sent_by = %s ORDER BY sent_at DESC LIMIT %s OFFSET %s",
+        "logs_count": "SELECT COUNT(*) as count FROM email_logs",
+        "logs_count_sent": "SELECT COUNT(*) as count FROM email_logs WHERE status = 'sent'",
+        "popular_templates": '''
+            SELECT template_name, COUNT(*) as usage_count
+            FROM email_logs
+            GROUP BY template_name
+            ORDER BY usage_count DESC
+            LIMIT %s
+        ''',
+        "logs_count_recent": {
+            "postgres": "SELECT COUNT(*) as count FROM email_logs WHERE sent_at >= (CURRENT_TIMESTAMP - INTERVAL '7 days')",
+            "sqlite": "SELECT COUNT(*) as count FROM email_logs WHERE sent_at >= datetime('now', '-7 days')",
+        },
+        "logs_delete_older_than": {
+            "postgres": "DELETE FROM email_logs WHERE sent_at < (CURRENT_TIMESTAMP - %s * INTERVAL '1 day')",
+            "sqlite": "DELETE FROM email_logs WHERE sent_at < datetime('now', '-' || %s || ' days')",
+        },
+    }
+
     def __init__(self):
         self.lock = threading.Lock()
+        self.queries = QueryRegistry("email", self.QUERIES)
+        self.pool = None
+        self.sqlite = None
         self.database_url = Config.EMAIL_DATABASE_URL
         self.db_path = Config.EMAIL_DATABASE_PATH
 
+        self.breaker = None
+        self.journal = None
+        self._setup_pending = False
         if self.database_url:
             self.mode = "postgres"
+            self.breaker = CircuitBreaker("email", lambda: check_postgres(self.database_url))
+            self.breaker.on_recover(self._on_postgres_recovered)
+            if Config.OFFLINE_JOURNAL_PATH:
+                self.journal = WriteJournal("email", self._replay_journaled)
+                self.breaker.on_recover(self.journal.start_replay)
         else:
             self.mode = "sqlite"
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        self.setup_database()
+        try:
+            self.setup_database()
+        except DatabaseUnavailableError as e:
+            logger.error(f"Email PostgreSQL unavailable at startup, deferring setup: {e}")
+            self._setup_pending = True
+            self.breaker.trip(e)
+        else:
+            if self.journal is not None:
+                self.journal.start_replay()
+
+        # Optional write-behind batching: one transaction and one executemany per burst of logs
+        self.write_batcher = None
+        if Config.WRITE_BATCH_ENABLED:
+            self.write_batcher = WriteBatcher(self, "email")
+            self.write_batcher.register(
+                "log_email", apply_many=self._apply_log_emails, on_error=self._log_failed
+            )
 
     @contextmanager
-    def get_connection(self):
-        self.lock.acquire()
-        conn = None
-        try:
-            if self.mode == "postgres":
-                try:
-                    conn = psycopg2.connect(self.database_url, sslmode="require")
-                    conn.autocommit = True
-                except Exception as e:
-                    logger.warning(f"PostgreSQL connection failed: {str(e)}")
-                    logger.info("Falling back to SQLite...")
-                    self.mode = "sqlite"
-                    # ensure data/ folder exists for SQLite
-                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-                    conn = sqlite3.connect(self.db_path)
-                    conn.row_factory = sqlite3.Row
-                    conn.execute("PRAGMA foreign_keys = ON")
-            else:
-                # ensure data/ folder exists for SQLite
-                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA foreign_keys = ON")
+    def get_connection(self, readonly=False):
+        # The method that opened this ``with`` block: generator -> __enter__ -> caller
+        method = caller_name(2)
+        start = time.perf_counter()
+        if self.mode == "postgres":
+            self.breaker.before_call()
+            try:
+                conn = self._postgres_pool().acquire()
+            except PoolTimeoutError:
+                raise
+            except Exception as e:
+                self.breaker.record_failure(e)
+                raise DatabaseUnavailableError(f"PostgreSQL connection failed: {e}") from e
+            self.queries.record_wait(method, time.perf_counter() - start)
+
+            try:
+                yield conn
+            except Exception as e:
+                if conn.closed:
+                    self.breaker.record_failure(e)
+                raise
+            finally:
+                self.pool.release(conn)
+            self.breaker.record_success()
+            return
+
+        with self._sqlite_backend().connection(readonly=readonly) as conn:
+            self.queries.record_wait(method, time.perf_counter() - start)
             yield conn
-        finally:
-            if conn is not None:
-                conn.close()
-            self.lock.release()
+
+    def _on_postgres_recovered(self):
+        if self._setup_pending:
+            self.setup_database()
+            self._setup_pending = False
+
+    def _postgres_pool(self):
+        if self.pool is None:
+            with self.lock:
+                if self.pool is None:
+                    self.pool = create_postgres_pool(self.database_url, "email")
+        return self.pool
+
+    def _sqlite_backend(self):
+        if self.sqlite is None:
+            with self.lock:
+                if self.sqlite is None:
+                    self.sqlite = SQLiteBackend(self.db_path, "email")
+        return self.sqlite
+
+    def circuit_stats(self):
+        """Return circuit breaker state, or None when not running on PostgreSQL."""
+        return self.breaker.stats() if self.breaker is not None else None
+
+    def pool_stats(self):
+        """Return connection pool counters, or None when not running on PostgreSQL."""
+        return self.pool.stats() if self.pool is not None else None
+
+    def write_batch_stats(self):
+        """Return write batcher counters, or None when batching is off."""
+        return self.write_batcher.stats() if self.write_batcher is not None else None
+
+    def flush_writes(self):
+        """Commit every queued batched write and stop batching; later writes go straight through."""
+        if self.write_batcher is not None:
+            self.write_batcher.close()
+
+    def journal_stats(self):
+        """Return offline journal counters, or None when there is no journal."""
+        return self.journal.stats() if self.journal is not None else None
+
+    def close(self):
+        """Flush queued writes and release pooled connections on shutdown."""
+        self.flush_writes()
+        if self.journal is not None:
+            self.journal.close()
+        if self.pool is not None:
+            self.pool.close()
+        if self.sqlite is not None:
+            self.sqlite.close()
 
     def _cursor(self, conn):
         """Return a dict-like cursor for Postgres, regular cursor for SQLite."""
         return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) if self.mode == "postgres" else conn.cursor()
 
+    def _execute(self, cursor, name, params=()):
+        """Run the registered statement ``name`` for the current dialect."""
+        self.queries.execute(cursor, self.mode, name, params, method=caller_name())
+
+    def _executemany(self, cursor, name, seq_of_params):
+        self.queries.executemany(cursor, self.mode, name, seq_of_params, method=caller_name())
+
+    @contextmanager
+    def _transaction(self, conn):
+        """Run the enclosed statements as one transaction on either backend."""
+        if self.mode == "postgres":
+            conn.autocommit = False
+            try:
+                yield
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+        else:
+            try:
+                yield
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def latency_stats(self):
+        """Return per-method statement time, connection wait and row histograms (p50/p95/p99/max)."""
+        return self.queries.latency_stats()
+
+    def query_stats(self):
+        """Return per-statement call counts and timings."""
+        return self.queries.stats()
+
     def setup_database(self):
         try:
             with self.get_connection() as conn:
-                # Check mode after potential fallback in get_connection
                 is_postgres = self.mode == "postgres"
                 cursor = conn.cursor(
                     cursor_factory=psycopg2.extras.RealDictCursor
@@ -141,6 +314,7 @@ class EmailDatabase:
                 if not is_postgres:
                     conn.commit()
 
+            MigrationRunner("email", EMAIL_MIGRATIONS).run(self)
             logger.info(f"Email Assistant database setup complete (using {'PostgreSQL' if is_postgres else 'SQLite'})")
         except Exception as e:
             logger.error(f"Email Assistant database setup failed: {str(e)}")
@@ -151,16 +325,10 @@ class EmailDatabase:
     def create_template(self, template_id: str, category: str, name: str,
                         subject: str, body: str, tone: str = 'formal',
                         placeholders: str = '[]') -> bool:
-        query = '''
-            INSERT INTO email_templates
-            (id, category, name, subject, body, tone, placeholders)
-            VALUES ({}, {}, {}, {}, {}, {}, {})
-        '''.format(*(["%s"]*7 if self.mode == "postgres" else ["?"]*7))
-
         try:
             with self.get_connection() as conn:
                 cursor = self._cursor(conn)
-                cursor.execute(query, (template_id, category, name, subject, body, tone, placeholders))
+                self._execute(cursor, "template_insert", (template_id, category, name, subject, body, tone, placeholders))
                 if self.mode == "sqlite":
                     conn.commit()
                 return True
@@ -189,34 +357,30 @@ class EmailDatabase:
             return {key: row[key] for key in row.keys()}
 
     def get_template(self, template_id: str):
-        query = "SELECT * FROM email_templates WHERE id = %s" if self.mode == "postgres" else "SELECT * FROM email_templates WHERE id = ?"
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
-            cursor.execute(query, (template_id,))
+            self._execute(cursor, "template_by_id", (template_id,))
             row = cursor.fetchone()
             return self._row_to_dict(row)
 
     def get_template_by_name(self, category: str, name: str):
-        query = "SELECT * FROM email_templates WHERE category = %s AND name = %s" if self.mode == "postgres" else "SELECT * FROM email_templates WHERE category = ? AND name = ?"
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
-            cursor.execute(query, (category, name))
+            self._execute(cursor, "template_by_name", (category, name))
             row = cursor.fetchone()
             return self._row_to_dict(row)
 
     def get_templates_by_category(self, category: str):
-        query = "SELECT * FROM email_templates WHERE category = %s ORDER BY name" if self.mode == "postgres" else "SELECT * FROM email_templates WHERE category = ? ORDER BY name"
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
-            cursor.execute(query, (category,))
+            self._execute(cursor, "templates_by_category", (category,))
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
     def get_all_templates(self):
-        query = "SELECT * FROM email_templates ORDER BY category, name"
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
-            cursor.execute(query)
+            self._execute(cursor, "templates_all")
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
@@ -227,16 +391,17 @@ class EmailDatabase:
         values = []
         for k, v in updates.items():
             if k in ["category", "name", "subject", "body", "tone", "placeholders"]:
-                keys.append(f"{k} = {'%s' if self.mode == 'postgres' else '?'}")
+                keys.append(f"{k} = %s")
                 values.append(v)
         if not keys:
             return False
-        query = f"UPDATE email_templates SET {', '.join(keys)} WHERE id = {'%s' if self.mode == 'postgres' else '?'}"
+        # The SET list depends on which fields changed, so this one is built per call
+        query = f"UPDATE email_templates SET {', '.join(keys)} WHERE id = %s"
         values.append(template_id)
         try:
             with self.get_connection() as conn:
                 cursor = self._cursor(conn)
-                cursor.execute(query, tuple(values))
+                self.queries.execute_dynamic(cursor, self.mode, "template_update", query, tuple(values))
                 if self.mode == "sqlite":
                     conn.commit()
                 return cursor.rowcount > 0
@@ -245,11 +410,10 @@ class EmailDatabase:
             return False
 
     def delete_template(self, template_id: str) -> bool:
-        query = "DELETE FROM email_templates WHERE id = %s" if self.mode == "postgres" else "DELETE FROM email_templates WHERE id = ?"
         try:
             with self.get_connection() as conn:
                 cursor = self._cursor(conn)
-                cursor.execute(query, (template_id,))
+                self._execute(cursor, "template_delete", (template_id,))
                 if self.mode == "sqlite":
                     conn.commit()
                 return cursor.rowcount > 0
@@ -262,82 +426,95 @@ class EmailDatabase:
     def log_email(self, log_id: str, template_id: Optional[str], template_name: str,
                   recipient_email_hash: str, recipient_name: str, status: str,
                   sent_by: int, error_message: Optional[str] = None) -> bool:
-        query = '''
-            INSERT INTO email_logs
-            (id, template_id, template_name, recipient_email_hash,
-             recipient_name, status, error_message, sent_by)
-            VALUES ({}, {}, {}, {}, {}, {}, {}, {})
-        '''.format(*(["%s"]*8 if self.mode == "postgres" else ["?"]*8))
+        row = (
+            log_id, template_id, template_name, recipient_email_hash,
+            recipient_name, status, error_message, sent_by
+        )
+        # While PostgreSQL is down (or older logs are still replaying) keep the log locally
+        if self.journal is not None and (
+            self.breaker.state != CircuitBreaker.CLOSED or self.journal.pending
+        ):
+            try:
+                self.journal.append("log_email", row)
+            except Exception as e:
+                return self._log_failed(e)
+            if self.breaker.state == CircuitBreaker.CLOSED:
+                self.journal.start_replay()
+            return True
+
+        if self.write_batcher is not None:
+            return self.write_batcher.call("log_email", row)
 
         try:
             with self.get_connection() as conn:
-                cursor = self._cursor(conn)
-                cursor.execute(query, (
-                    log_id, template_id, template_name, recipient_email_hash,
-                    recipient_name, status, error_message, sent_by
-                ))
-                if self.mode == "sqlite":
-                    conn.commit()
-                return True
+                with self._transaction(conn):
+                    return self._apply_log_emails(self._cursor(conn), [(row,)])[0]
         except Exception as e:
-            logger.error(f"Failed to log email: {str(e)}")
-            return False
+            return self._log_failed(e)
+
+    def _apply_log_emails(self, cursor, calls):
+        self._executemany(cursor, "log_insert", [row for (row,) in calls])
+        return [True] * len(calls)
+
+    def _replay_journaled(self, op, args):
+        """Insert one journaled email log; a log_id already present means it landed before."""
+        row, = args
+        try:
+            with self.get_connection() as conn:
+                with self._transaction(conn):
+                    self._apply_log_emails(self._cursor(conn), [(tuple(row),)])
+        except (psycopg2.IntegrityError, sqlite3.IntegrityError):
+            logger.info(f"Journaled email log {row[0]} already stored, skipped")
+
+    @staticmethod
+    def _log_failed(error):
+        logger.error(f"Failed to log email: {str(error)}")
+        return False
 
     def get_email_logs(self, limit: int = 100, offset: int = 0,
                        status_filter: Optional[str] = None,
                        sent_by_filter: Optional[int] = None):
-        query = "SELECT * FROM email_logs WHERE 1=1"
         params = []
-        if status_filter:
-            query += f" AND status = {'%s' if self.mode == 'postgres' else '?'}"
-            params.append(status_filter)
-        if sent_by_filter:
-            query += f" AND sent_by = {'%s' if self.mode == 'postgres' else '?'}"
-            params.append(sent_by_filter)
-        query += " ORDER BY sent_at DESC LIMIT {} OFFSET {}".format(
-            "%s" if self.mode == "postgres" else "?", "%s" if self.mode == "postgres" else "?"
-        )
+        if status_filter and sent_by_filter:
+            name = "logs_by_status_and_sender"
+            params = [status_filter, sent_by_filter]
+        elif status_filter:
+            name = "logs_by_status"
+            params = [status_filter]
+        elif sent_by_filter:
+            name = "logs_by_sender"
+            params = [sent_by_filter]
+        else:
+            name = "logs"
         params.extend([limit, offset])
 
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
-            cursor.execute(query, tuple(params))
+            self._execute(cursor, name, tuple(params))
             rows = cursor.fetchall()
             return [self._row_to_dict(row) for row in rows]
 
     def get_email_stats(self) -> Dict[str, Any]:
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = self._cursor(conn)
 
             # Get total emails
-            cursor.execute("SELECT COUNT(*) as count FROM email_logs")
+            self._execute(cursor, "logs_count")
             total_row = cursor.fetchone()
             total = self._row_to_dict(total_row)["count"]
 
             # Get successful emails
-            cursor.execute("SELECT COUNT(*) as count FROM email_logs WHERE status = 'sent'")
+            self._execute(cursor, "logs_count_sent")
             sent_row = cursor.fetchone()
             sent = self._row_to_dict(sent_row)["count"]
 
             # Get popular templates
-            cursor.execute('''
-                SELECT template_name, COUNT(*) as usage_count
-                FROM email_logs
-                GROUP BY template_name
-                ORDER BY usage_count DESC
-                LIMIT {}
-            '''.format("%s" if self.mode == "postgres" else "?"), (5,))
+            self._execute(cursor, "popular_templates", (5,))
             popular_rows = cursor.fetchall()
             popular = [self._row_to_dict(row) for row in popular_rows]
 
             # Get recent activity
-            cursor.execute('''
-                SELECT COUNT(*) as count FROM email_logs
-                WHERE sent_at >= (CURRENT_TIMESTAMP - INTERVAL '7 days')
-            ''' if self.mode == "postgres" else '''
-                SELECT COUNT(*) as count FROM email_logs
-                WHERE sent_at >= datetime('now', '-7 days')
-            ''')
+            self._execute(cursor, "logs_count_recent")
             recent_row = cursor.fetchone()
             recent = self._row_to_dict(recent_row)["count"]
 
@@ -350,16 +527,10 @@ class EmailDatabase:
             }
 
     def cleanup_old_logs(self, days_to_keep: int = 90) -> int:
-        query = (
-            f"DELETE FROM email_logs WHERE sent_at < (CURRENT_TIMESTAMP - INTERVAL '{days_to_keep} days')"
-            if self.mode == "postgres" else
-            "DELETE FROM email_logs WHERE sent_at < datetime('now', ?)"
-        )
-        params = () if self.mode == "postgres" else (f"-{days_to_keep} days",)
         try:
             with self.get_connection() as conn:
                 cursor = self._cursor(conn)
-                cursor.execute(query, params)
+                self._execute(cursor, "logs_delete_older_than", (int(days_to_keep),))
                 if self.mode == "sqlite":
                     conn.commit()
                 return cursor.rowcount
@@ -369,3 +540,4 @@ class EmailDatabase:
 
 
 email_db = EmailDatabase()
+async_email_db = AsyncDatabase(email_db, max_workers=Config.DATABASE_EXECUTOR_WORKERS, name="email")
@@ -9,8 +9,8 @@ class EmailLogger:
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        from .database import email_db
-        self.db = email_db
+        from .database import async_email_db
+        self.db = async_email_db
         
     def hash_email(self, email: str) -> str:
         return hashlib.sha256(email.encode()).hexdigest()
@@ -24,7 +24,7 @@ class EmailLogger:
             import uuid
             log_id = str(uuid.uuid4())
 
-            success = self.db.log_email(
+            success = await self.db.log_email(
                 log_id=log_id,
                 template_id=template_id,
                 template_name=template_name,
@@ -64,7 +64,7 @@ class EmailLogger:
             status_filter = filters.get('status') if filters else None
             sent_by_filter = filters.get('sent_by') if filters else None
 
-            rows = self.db.get_email_logs(
+            rows = await self.db.get_email_logs(
                 limit=limit,
                 offset=offset,
                 status_filter=status_filter,
@@ -80,7 +80,7 @@ class EmailLogger:
     async def get_stats(self) -> Dict[str, Any]:
         """Generate sending statistics."""
         try:
-            return self.db.get_email_stats()
+            return await self.db.get_email_stats()
         except Exception as e:
             self.logger.error(f"Failed to get email stats: {str(e)}")
             return {
@@ -3,7 +3,7 @@ import logging
 import uuid
 from typing import List, Optional, Dict, Any, Tuple
 from .models import Template, TemplateCategory, TemplateTone
-from .database import email_db
+from .database import email_db, async_email_db
 from .all_templates import get_complete_template_collection
 
 class TemplateManager:
@@ -11,11 +11,12 @@ class TemplateManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.db = email_db
+        self.async_db = async_email_db
         
     async def get_template(self, category: str, template_name: str) -> Optional[Template]:
        """Retrieve specific template by category and name."""
        try:
-           row = self.db.get_template_by_name(category, template_name)
+           row = await self.async_db.get_template_by_name(category, template_name)
            if row:
                return Template.from_dict(self.db._row_to_dict(row))
            return None
@@ -26,7 +27,7 @@ class TemplateManager:
     async def get_template_by_id(self, template_id: str) -> Optional[Template]:
        """Retrieve specific template by ID."""
        try:
-           row = self.db.get_template(template_id)
+           row = await self.async_db.get_template(template_id)
            if row:
                return Template.from_dict(self.db._row_to_dict(row))
            return None
@@ -37,7 +38,7 @@ class TemplateManager:
     async def get_available_templates(self, category: str) -> List[Template]:
        """List templates by category."""
        try:
-           rows = self.db.get_templates_by_category(category)
+           rows = await self.async_db.get_templates_by_category(category)
            return [Template.from_dict(self.db._row_to_dict(row)) for row in rows]
        except Exception as e:
            self.logger.error(f"Failed to get templates for category {category}: {str(e)}")
@@ -46,7 +47,7 @@ class TemplateManager:
     async def get_all_templates(self) -> List[Template]:
        """Get all templates."""
        try:
-           rows = self.db.get_all_templates()
+           rows = await self.async_db.get_all_templates()
            return [Template.from_dict(self.db._row_to_dict(row)) for row in rows]
        except Exception as e:
            self.logger.error(f"Failed to get all templates: {str(e)}")
@@ -74,7 +75,7 @@ class TemplateManager:
         try:
             template = Template.create_new(category, name, subject, body, tone)
             
-            success = self.db.create_template(
+            success = await self.async_db.create_template(
                 template.id,
                 template.category,
                 template.name,
@@ -118,7 +119,7 @@ class TemplateManager:
             if 'subject' in updates or 'body' in updates:
                 updates['placeholders'] = temp_template.to_dict()['placeholders']
             
-            success = self.db.update_template(template_id, updates)
+            success = await self.async_db.update_template(template_id, updates)
             
             if success:
                 self.logger.info(f"Updated template: {template_id}")
@@ -134,7 +135,7 @@ class TemplateManager:
     async def delete_template(self, template_id: str) -> bool:
         """Delete template by ID."""
         try:
-            success = self.db.delete_template(template_id)
+            success = await self.async_db.delete_template(template_id)
             if success:
                 self.logger.info(f"Deleted template: {template_id}")
             else:
@@ -155,7 +156,7 @@ class TemplateManager:
             
             cloned = original.clone(new_name, new_tone)
             
-            success = self.db.create_template(
+            success = await self.async_db.create_template(
                 cloned.id,
                 cloned.category,
                 cloned.name,
@@ -300,7 +301,7 @@ class TemplateManager:
         """Seed the database with default templates if not already present."""
         try:
             # Check if templates are already seeded by counting existing templates
-            existing_count = len(self.db.get_all_templates())
+            existing_count = len(await self.async_db.get_all_templates())
 
             if existing_count > 0:
                 self.logger.info(f"Templates already seeded: {existing_count} templates found")
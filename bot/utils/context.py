@@ -0,0 +1,56 @@
+import discord
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+
+class InteractionContext:
+    """Rows looked up while handling one interaction, each fetched at most once.
+
+    Validation decorators and command bodies share one instance through
+    ``get_context(interaction)``, so a command guarded by
+    ``@validate_team_membership`` reads the team the decorator already loaded.
+    """
+
+    def __init__(self, interaction: discord.Interaction):
+        self.discord_id = str(interaction.user.id)
+        self._values: Dict[str, Any] = {}
+
+    async def _memo(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if key not in self._values:
+            self._values[key] = await fetch()
+        return self._values[key]
+
+    async def profile(self) -> Optional[Dict[str, Any]]:
+        """The caller's profile, or None."""
+        from bot.core.database import async_db
+        return await self._memo("profile", lambda: async_db.get_profile(self.discord_id))
+
+    async def team_snapshot(self) -> Optional[Dict[str, Any]]:
+        """The caller's team, members and owner name (see Database.get_team_snapshot), or None."""
+        from bot.core.database import async_db
+        return await self._memo("team_snapshot", lambda: async_db.get_team_snapshot(self.discord_id))
+
+    async def team(self) -> Optional[Dict[str, Any]]:
+        """The caller's team row, or None."""
+        snapshot = await self.team_snapshot()
+        return snapshot["team"] if snapshot else None
+
+    async def team_members(self) -> Optional[List[Dict[str, Any]]]:
+        """Members of the caller's team in join order, or None."""
+        snapshot = await self.team_snapshot()
+        return snapshot["members"] if snapshot else None
+
+    def invalidate(self, *keys: str) -> None:
+        """Forget memoized rows after the handler changes them; no keys forgets everything."""
+        if not keys:
+            self._values.clear()
+        # team and team_members are views over the team snapshot
+        for key in keys:
+            self._values.pop("team_snapshot" if key in ("team", "team_members") else key, None)
+
+
+def get_context(interaction: discord.Interaction) -> InteractionContext:
+    """Return the context for ``interaction``, creating it on first use."""
+    context = interaction.extras.get("context")
+    if context is None:
+        context = interaction.extras["context"] = InteractionContext(interaction)
+    return context
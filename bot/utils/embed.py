@@ -1,6 +1,6 @@
 import discord
 from config import Config
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 
 # Enhanced color scheme for better visual hierarchy
 class BotColors:
@@ -117,6 +117,52 @@ def search_results_embed(results: List[Dict[str, Any]]) -> discord.Embed:
     
     return embed
 
+def teammate_recommendations_embed(results: List[Dict[str, Any]]) -> discord.Embed:
+    """Create an embed of recommended teammates and what each would add."""
+    embed = create_embed(
+        "🤝 Recommended Teammates",
+        f"**{len(results)}** people whose skills complement yours and who share your interests:",
+        BotColors.INFO
+    )
+
+    for i, match in enumerate(results[:10], 1):
+        brings = ", ".join(match['brings'][:5]) or "Similar skills"
+        interests = match.get('interests') or 'No interests listed'
+        interests = (interests[:50] + '...') if len(interests) > 50 else interests
+
+        embed.add_field(
+            name=f"{i}. {match['name']} (@{match['discord_username']}) • {match['score']:.0%} match",
+            value=f"**➕ Brings:** {brings}\n**❤️ Interests:** {interests}",
+            inline=False
+        )
+
+    return embed
+
+def team_search_results_embed(teams: List[Dict[str, Any]], skills: str, page_num: int = 1) -> discord.Embed:
+    """Create an embed of open teams looking for the searched skills."""
+    embed = create_embed(
+        f"🔎 Teams Looking For: {skills[:50]}",
+        f"Page {page_num} • open teams ranked by how many of your skills they need",
+        BotColors.INFO
+    )
+
+    for team in teams:
+        looking_for = team.get('looking_for') or 'Not specified'
+        looking_for = (looking_for[:80] + '...') if len(looking_for) > 80 else looking_for
+        value = f"**✅ Needs you for:** {', '.join(team['matched']) or 'Related skills'}\n**🔍 Looking for:** {looking_for}"
+        if team.get('description'):
+            description = team['description']
+            value += f"\n**📝 About:** {(description[:100] + '...') if len(description) > 100 else description}"
+        value += f"\n**🔑 Join with:** `/join-team code:{team['code']}`"
+
+        embed.add_field(
+            name=f"{team['name']} • {team['size']} member{'s' if team['size'] != 1 else ''} • {team['matches']} match{'es' if team['matches'] != 1 else ''}",
+            value=value,
+            inline=False
+        )
+
+    return embed
+
 def base_embed(title: str, description: str = None, color: discord.Color = BotColors.PRIMARY) -> discord.Embed:
     """Create a basic embed with consistent styling."""
     return create_embed(title, description, color)
@@ -159,21 +205,14 @@ def volunteer_task_embed(task: Dict[str, Any]) -> discord.Embed:
         inline=True
     )
 
-    # Get participants count with better error handling
-    try:
-        from bot.core.database import db
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            query = "SELECT COUNT(*) FROM volunteer_participants WHERE task_id = %s" if db.mode == "postgres" else "SELECT COUNT(*) FROM volunteer_participants WHERE task_id = ?"
-            cursor.execute(query, (task["id"],))
-            count_result = cursor.fetchone()
-            participants = count_result[0] if db.mode == "sqlite" else count_result["count"]
-    except Exception:
-        participants = 0
+    # Participant count is selected alongside the task row
+    participants = task.get("participant_count") or 0
+    max_volunteers = task.get("max_volunteers")
+    capacity = f"{participants} / {max_volunteers}" if max_volunteers else participants
 
     embed.add_field(
         name="👥 Participants",
-        value=f"```{participants} volunteers```",
+        value=f"```{capacity} volunteers```",
         inline=True
     )
 
@@ -221,6 +260,13 @@ def team_info_embed(team_info: Dict[str, Any]) -> discord.Embed:
         BotColors.PRIMARY
     )
     
+    if team_info.get('description'):
+        embed.add_field(name="📝 Description", value=team_info['description'], inline=False)
+    if team_info.get('project_idea'):
+        embed.add_field(name="💡 Project Idea", value=team_info['project_idea'], inline=False)
+    if team_info.get('looking_for'):
+        embed.add_field(name="🔍 Looking For", value=team_info['looking_for'], inline=False)
+    
     members = team_info.get('members', [])
     if members:
         # Format members list with better styling
@@ -250,6 +296,55 @@ def team_info_embed(team_info: Dict[str, Any]) -> discord.Embed:
     
     return embed
 
+def team_formation_embed(result: Dict[str, Any], dry_run: bool) -> discord.Embed:
+    """Create an embed summarizing an auto team formation run and how it scored."""
+    score, baseline = result['score'], result['score'].get('baseline', {})
+    placed = sum(len(team) for team in result['teams'])
+    if dry_run:
+        embed = create_embed(
+            "🧩 Team Formation Preview",
+            f"**{placed}** of **{result['unassigned']}** unassigned members would form **{len(result['teams'])}** teams. Nothing has been saved.",
+            BotColors.INFO
+        )
+    else:
+        embed = create_embed(
+            "🧩 Teams Formed",
+            f"Placed **{placed}** members into **{len(result['created'])}** new teams.",
+            BotColors.SUCCESS
+        )
+
+    if result['teams']:
+        embed.add_field(
+            name="📊 Assignment Score",
+            value=(
+                f"**Skills per team:** {score['coverage']:.1f} avg, {score['min_coverage']} min "
+                f"(random split: {baseline.get('coverage', 0):.1f})\n"
+                f"**Overlapping skills:** {score['redundancy']:.0%} (random split: {baseline.get('redundancy', 0):.0%})\n"
+                f"**Teams sharing an interest:** {score['shared_interest_rate']:.0%} "
+                f"(random split: {baseline.get('shared_interest_rate', 0):.0%})"
+            ),
+            inline=False
+        )
+
+        names = [team['name'] for team in result.get('created', [])] or [f"Team {i}" for i in range(1, len(result['teams']) + 1)]
+        for name, members in list(zip(names, result['teams']))[:5]:
+            skills = sorted({tag for member in members for tag in member['skills']})
+            value = ", ".join(member['discord_username'] for member in members)
+            value += f"\n**🛠️ Skills:** {', '.join(skills[:8]) or 'None listed'}"
+            embed.add_field(name=name, value=value[:1024], inline=False)
+
+        if len(result['teams']) > 5:
+            embed.set_footer(text=f"Showing 5 of {len(result['teams'])} teams • Maximally : The global hackathon league")
+
+    if result.get('unplaced'):
+        embed.add_field(
+            name="⏳ Not Placed",
+            value=", ".join(member['discord_username'] for member in result['unplaced'])[:1024],
+            inline=False
+        )
+
+    return embed
+
 def confirmation_embed(title: str, description: str, warning_text: str = None) -> discord.Embed:
     """Create a confirmation embed for destructive actions."""
     embed = create_embed(
@@ -359,4 +454,69 @@ class PaginationView(discord.ui.View):
         if self.current_page < self.max_pages - 1:
             self.current_page += 1
             self.update_buttons()
-            await interaction.response.edit_message(embed=self.embeds[self.current_page], view=self)
\ No newline at end of file
+            await interaction.response.edit_message(embed=self.embeds[self.current_page], view=self)
+
+
+class KeysetPaginationView(discord.ui.View):
+    """Pagination view that fetches one page at a time from a keyset cursor.
+
+    ``fetch_page(after, size)`` is awaited for every page and
+    ``render_page(rows, page_number)`` turns its rows into an embed, so only the
+    page on screen is ever held in memory.
+    """
+    
+    def __init__(self, fetch_page: Callable[[Optional[tuple], int], Awaitable[List[Dict[str, Any]]]],
+                 render_page: Callable[[List[Dict[str, Any]], int], discord.Embed],
+                 page_size: int = 5, key: Callable[[Dict[str, Any]], tuple] = None, timeout: int = 300):
+        super().__init__(timeout=timeout)
+        self.fetch_page = fetch_page
+        self.render_page = render_page
+        self.page_size = page_size
+        self.key = key or (lambda row: (row["updated_at"], row["discord_id"]))
+        
+        # cursors[i] is the ``after`` value that loads page i
+        self.cursors = [None]
+        self.current_page = 0
+        self.has_next = False
+        self.rows = []
+    
+    async def load(self, page: int = 0) -> discord.Embed:
+        """Fetch ``page`` and return its embed; ``self.rows`` is empty when there is nothing to show."""
+        # One extra row tells us whether a next page exists without counting
+        rows = await self.fetch_page(self.cursors[page], self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[:self.page_size]
+        self.current_page = page
+        
+        if self.has_next and len(self.cursors) == page + 1:
+            self.cursors.append(self.key(self.rows[-1]))
+        
+        self.update_buttons()
+        return self.render_page(self.rows, page + 1)
+    
+    @property
+    def single_page(self) -> bool:
+        return self.current_page == 0 and not self.has_next
+    
+    def update_buttons(self):
+        """Update button states based on current page."""
+        self.previous_button.disabled = self.current_page == 0
+        self.next_button.disabled = not self.has_next
+        self.page_counter.label = f"Page {self.current_page + 1}"
+    
+    @discord.ui.button(label="◀️ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.current_page > 0:
+            embed = await self.load(self.current_page - 1)
+            await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="Page 1", style=discord.ButtonStyle.primary, disabled=True)
+    async def page_counter(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # This button is just for display
+        await interaction.response.defer()
+    
+    @discord.ui.button(label="▶️ Next", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.has_next:
+            embed = await self.load(self.current_page + 1)
+            await interaction.response.edit_message(embed=embed, view=self)
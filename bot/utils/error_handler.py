@@ -3,6 +3,8 @@ import logging
 from typing import Optional, Callable, Any
 from functools import wraps
 from .embed import error_embed, warning_embed, info_embed
+from .context import get_context
+from bot.core.circuit import DatabaseUnavailableError
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +121,13 @@ async def handle_error(
             embed=embed,
             ephemeral=error.ephemeral
         )
+    elif isinstance(error, DatabaseUnavailableError):
+        embed = error_embed(
+            "Database Unavailable",
+            "The database is temporarily unreachable.",
+            help_text="This is usually brief. Please try again in a minute."
+        )
+        await safe_send_response(interaction, embed=embed)
     elif isinstance(error, discord.app_commands.errors.MissingPermissions):
         embed = error_embed(
             "Missing Permissions",
@@ -179,10 +188,7 @@ def validate_profile_exists(func: Callable) -> Callable:
     """Decorator to check if user has a profile before executing command."""
     @wraps(func)
     async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
-        from bot.core.database import db
-        
-        profile = db.get_profile(str(interaction.user.id))
-        if not profile:
+        if not await get_context(interaction).profile():
             raise ProfileNotFoundError()
         
         return await func(self, interaction, *args, **kwargs)
@@ -192,10 +198,7 @@ def validate_team_membership(func: Callable) -> Callable:
     """Decorator to check if user is in a team before executing command."""
     @wraps(func)
     async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
-        from bot.core.database import db
-        
-        team = db.get_team_by_member(str(interaction.user.id))
-        if not team:
+        if not await get_context(interaction).team():
             raise TeamNotFoundError("You're not currently in a team.")
         
         return await func(self, interaction, *args, **kwargs)
@@ -205,9 +208,7 @@ def validate_team_ownership(func: Callable) -> Callable:
     """Decorator to check if user owns their team before executing command."""
     @wraps(func)
     async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
-        from bot.core.database import db
-        
-        team = db.get_team_by_member(str(interaction.user.id))
+        team = await get_context(interaction).team()
         if not team:
             raise TeamNotFoundError("You're not currently in a team.")
         
@@ -290,7 +291,7 @@ __all__ = [
     'BotError', 'ValidationError', 'ProfileNotFoundError', 'TeamNotFoundError',
     'PermissionError', 'DatabaseError', 'safe_send_response', 'handle_error',
     'error_handler', 'defer_response', 'validate_profile_exists',
-    'validate_team_membership', 'validate_team_ownership', 'send_success_message',
+    'validate_team_membership', 'validate_team_ownership', 'get_context', 'send_success_message',
     'send_info_message', 'send_warning_message', 'cooldown', 'rate_limiter'
 ]
 
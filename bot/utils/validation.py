@@ -89,4 +89,19 @@ def sanitize_input(text, max_length=1000):
     # Remove null bytes and other control characters
     text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
 
-    return text
\ No newline at end of file
+    return text
+
+
+def normalize_tags(text):
+    """Split comma separated skills/interests into unique, lowercase tags."""
+    if not text:
+        return []
+
+    tags = []
+    for part in text.split(","):
+        # Collapse internal whitespace so "Machine  Learning" matches "machine learning"
+        tag = " ".join(part.lower().split())
+        if tag and tag not in tags:
+            tags.append(tag)
+
+    return tags
@@ -16,6 +16,60 @@ class Config:
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
     DATABASE_PATH: str = os.getenv("DATABASE_PATH", "data/profiles.db")
 
+    # PostgreSQL connection pool (shared settings for the main and email databases)
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "1"))
+    DATABASE_POOL_MAX_SIZE: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "10"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+    DATABASE_POOL_IDLE_TIMEOUT: float = float(os.getenv("DATABASE_POOL_IDLE_TIMEOUT", "300"))
+    DATABASE_POOL_MAX_LIFETIME: float = float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "3600"))
+    DATABASE_POOL_HEALTH_CHECK_INTERVAL: float = float(os.getenv("DATABASE_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+    # Worker threads that run blocking database calls off the event loop
+    DATABASE_EXECUTOR_WORKERS: int = int(os.getenv("DATABASE_EXECUTOR_WORKERS", os.getenv("DATABASE_POOL_MAX_SIZE", "10")))
+
+    # SQLite backend (WAL mode, one writer plus pooled readers)
+    SQLITE_READER_CONNECTIONS: int = int(os.getenv("SQLITE_READER_CONNECTIONS", "4"))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "64"))
+
+    # Minimum trigram similarity for a misspelled search term to match a known tag
+    FUZZY_MATCH_THRESHOLD: float = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.25"))
+
+    # Seconds to wait for a new PostgreSQL connection before counting it as failed
+    DATABASE_CONNECT_TIMEOUT: int = int(os.getenv("DATABASE_CONNECT_TIMEOUT", "5"))
+    # Consecutive connection failures that open the circuit, and seconds between recovery probes
+    CIRCUIT_BREAKER_FAILURES: int = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "3"))
+    CIRCUIT_BREAKER_PROBE_SECONDS: float = float(os.getenv("CIRCUIT_BREAKER_PROBE_SECONDS", "5"))
+    # Local journal for writes made while PostgreSQL is down, replayed on recovery; empty disables it
+    OFFLINE_JOURNAL_PATH: str = os.getenv("OFFLINE_JOURNAL_PATH", "data/offline_journal.db")
+
+    # Statements or connection waits slower than this are logged (parameters redacted); 0 disables
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "250"))
+
+    # Server-side prepared statements on PostgreSQL; turn off behind a transaction-mode pgbouncer
+    DATABASE_PREPARED_STATEMENTS: bool = os.getenv("DATABASE_PREPARED_STATEMENTS", "true").lower() == "true"
+
+    # Write-behind batching of profile upserts, volunteer joins and email logs
+    WRITE_BATCH_ENABLED: bool = os.getenv("WRITE_BATCH_ENABLED", "false").lower() == "true"
+    WRITE_BATCH_MAX_SIZE: int = int(os.getenv("WRITE_BATCH_MAX_SIZE", "100"))
+    WRITE_BATCH_MAX_DELAY_MS: float = float(os.getenv("WRITE_BATCH_MAX_DELAY_MS", "5"))
+    WRITE_BATCH_DURABILITY: str = os.getenv("WRITE_BATCH_DURABILITY", "strict").lower()
+
+    # In-process profile cache
+    PROFILE_CACHE_SIZE: int = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    PROFILE_CACHE_TTL: float = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+    # Teams (with their rosters) and member -> team lookups kept in memory
+    TEAM_CACHE_SIZE: int = int(os.getenv("TEAM_CACHE_SIZE", "5000"))
+    TEAM_CACHE_TTL: float = float(os.getenv("TEAM_CACHE_TTL", "300"))
+
+    # Members at which a team counts as full (no longer recommended or offered as open)
+    TEAM_MAX_SIZE: int = int(os.getenv("TEAM_MAX_SIZE", "4"))
+    # Minimum seconds between rebuilds of the teammate recommendation index after changes
+    RECOMMENDER_REFRESH_SECONDS: float = float(os.getenv("RECOMMENDER_REFRESH_SECONDS", "30"))
+
+    # How often the /profile-stats counters are recounted to correct drift
+    PROFILE_STATS_RECONCILE_MINUTES: float = float(os.getenv("PROFILE_STATS_RECONCILE_MINUTES", "60"))
+
     # Email Configuration
     RESEND_API_KEY: Optional[str] = os.getenv("RESEND_API_KEY")
     EMAIL_FROM_ADDRESS: str = os.getenv("EMAIL_FROM_ADDRESS", "contact@maximally.in")
@@ -61,6 +115,42 @@ class Config:
         if self.EMAIL_DATABASE_URL and not self._is_valid_database_url(self.EMAIL_DATABASE_URL):
             raise ValueError("EMAIL_DATABASE_URL format is invalid")
 
+        # Validate connection pool sizing
+        if self.DATABASE_POOL_MAX_SIZE < 1:
+            raise ValueError("DATABASE_POOL_MAX_SIZE must be at least 1")
+        if not 0 <= self.DATABASE_POOL_MIN_SIZE <= self.DATABASE_POOL_MAX_SIZE:
+            raise ValueError("DATABASE_POOL_MIN_SIZE must be between 0 and DATABASE_POOL_MAX_SIZE")
+        if self.DATABASE_POOL_TIMEOUT <= 0:
+            raise ValueError("DATABASE_POOL_TIMEOUT must be positive")
+        if self.DATABASE_EXECUTOR_WORKERS < 1:
+            raise ValueError("DATABASE_EXECUTOR_WORKERS must be at least 1")
+        if self.DATABASE_CONNECT_TIMEOUT < 1:
+            raise ValueError("DATABASE_CONNECT_TIMEOUT must be at least 1 second")
+        if self.CIRCUIT_BREAKER_FAILURES < 1 or self.CIRCUIT_BREAKER_PROBE_SECONDS <= 0:
+            raise ValueError("CIRCUIT_BREAKER_FAILURES and CIRCUIT_BREAKER_PROBE_SECONDS must be positive")
+        if self.SQLITE_READER_CONNECTIONS < 1:
+            raise ValueError("SQLITE_READER_CONNECTIONS must be at least 1")
+        if self.SQLITE_CACHE_SIZE_KB < 0 or self.SQLITE_MMAP_SIZE_MB < 0:
+            raise ValueError("SQLITE_CACHE_SIZE_KB and SQLITE_MMAP_SIZE_MB cannot be negative")
+        if self.SLOW_QUERY_MS < 0:
+            raise ValueError("SLOW_QUERY_MS cannot be negative")
+        if not 0 < self.FUZZY_MATCH_THRESHOLD <= 1:
+            raise ValueError("FUZZY_MATCH_THRESHOLD must be between 0 and 1")
+        if self.WRITE_BATCH_MAX_SIZE < 1 or self.WRITE_BATCH_MAX_DELAY_MS < 0:
+            raise ValueError("WRITE_BATCH_MAX_SIZE must be at least 1 and WRITE_BATCH_MAX_DELAY_MS cannot be negative")
+        if self.WRITE_BATCH_DURABILITY not in ("strict", "relaxed"):
+            raise ValueError("WRITE_BATCH_DURABILITY must be 'strict' or 'relaxed'")
+        if self.PROFILE_CACHE_SIZE < 1 or self.PROFILE_CACHE_TTL <= 0:
+            raise ValueError("PROFILE_CACHE_SIZE and PROFILE_CACHE_TTL must be positive")
+        if self.TEAM_CACHE_SIZE < 1 or self.TEAM_CACHE_TTL <= 0:
+            raise ValueError("TEAM_CACHE_SIZE and TEAM_CACHE_TTL must be positive")
+        if self.TEAM_MAX_SIZE < 2:
+            raise ValueError("TEAM_MAX_SIZE must be at least 2")
+        if self.RECOMMENDER_REFRESH_SECONDS < 0:
+            raise ValueError("RECOMMENDER_REFRESH_SECONDS cannot be negative")
+        if self.PROFILE_STATS_RECONCILE_MINUTES <= 0:
+            raise ValueError("PROFILE_STATS_RECONCILE_MINUTES must be positive")
+
         # Validate email
         if not self._is_valid_email(self.EMAIL_FROM_ADDRESS):
             raise ValueError("EMAIL_FROM_ADDRESS must be a valid email address")
@@ -70,6 +160,8 @@ class Config:
             raise ValueError("DATABASE_PATH contains unsafe characters")
         if not self._is_safe_path(self.EMAIL_DATABASE_PATH):
             raise ValueError("EMAIL_DATABASE_PATH contains unsafe characters")
+        if self.OFFLINE_JOURNAL_PATH and not self._is_safe_path(self.OFFLINE_JOURNAL_PATH):
+            raise ValueError("OFFLINE_JOURNAL_PATH contains unsafe characters")
 
     def _is_valid_url(self, url: str) -> bool:
         """Validate URL format."""
@@ -0,0 +1,34 @@
+import contextlib
+import os
+import shutil
+
+SCRATCH_DIR = "data/tests"
+
+# The database modules build their singletons at import: point them at scratch
+# SQLite files before anything imports config
+os.environ["DATABASE_URL"] = ""
+os.environ["EMAIL_DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = f"{SCRATCH_DIR}/profiles.db"
+os.environ["EMAIL_DATABASE_PATH"] = f"{SCRATCH_DIR}/email.db"
+
+import pytest  # noqa: E402
+from config import Config  # noqa: E402
+from bot.core.database import Database  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def scratch_dir():
+    yield
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+    # Only removed when the tests created it
+    with contextlib.suppress(OSError):
+        os.rmdir(os.path.dirname(SCRATCH_DIR))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh SQLite-backed Database in its own file."""
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "profiles.db"))
+    database = Database()
+    yield database
+    database.close()
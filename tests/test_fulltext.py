@@ -0,0 +1,62 @@
+import sqlite3
+
+from config import Config
+from bot.core.database import Database
+
+
+def ids(profiles):
+    return sorted(profile["discord_id"] for profile in profiles)
+
+
+def test_search_survives_vacuum_and_non_numeric_ids(database):
+    database.upsert_profile("111", "one", "One", "python, react", "ai")
+    database.upsert_profile("abc", "two", "Two", "rust", "games")
+    database.upsert_profile("", "three", "Three", "react native", "ai")
+    database.upsert_profile("222", "four", "Four", "go", "ai")
+
+    assert ids(database.search_profiles_fulltext(skills="react")) == ["", "111"]
+    assert ids(database.search_profiles_fulltext(skills="rust")) == ["abc"]
+
+    database.delete_profile("111")
+    with database.get_connection() as conn:
+        conn.execute("VACUUM")
+
+    assert ids(database.search_profiles_fulltext(skills="react")) == [""]
+    database.upsert_profile("abc", "two", "Two", "react", "games")
+    assert ids(database.search_profiles_fulltext(skills="react")) == ["", "abc"]
+    assert database.search_profiles_fulltext(skills="rust") == []
+
+
+def test_results_carry_only_profile_columns(database):
+    database.upsert_profile("1", "one", "One", "python", "ai")
+    profile, = database.search_profiles_fulltext(skills="python")
+    assert tuple(profile) == Database.PROFILE_COLUMNS
+
+
+def test_profiles_from_before_the_index_are_searchable(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute('''
+            CREATE TABLE profiles (
+                discord_id TEXT PRIMARY KEY,
+                discord_username TEXT NOT NULL,
+                name TEXT NOT NULL,
+                skills TEXT,
+                interests TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("INSERT INTO profiles (discord_id, discord_username, name, skills, interests) "
+                     "VALUES ('9', 'nine', 'Nine', 'python', 'ai')")
+    conn.close()
+
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(path))
+    database = Database()
+    try:
+        assert ids(database.search_profiles_fulltext(skills="python")) == ["9"]
+        database.upsert_profile("10", "ten", "Ten", "python", "ai")
+        assert ids(database.search_profiles_fulltext(skills="python")) == ["10", "9"]
+        assert database.get_profile("9")["name"] == "Nine"
+    finally:
+        database.close()
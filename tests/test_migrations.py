@@ -0,0 +1,70 @@
+import pytest
+
+from bot.core.migrations import Migration, MigrationRunner
+from bot.core.sqlite_backend import SQLiteBackend
+
+
+class SQLiteTarget:
+    """The slice of a Database that MigrationRunner uses."""
+
+    mode = "sqlite"
+
+    def __init__(self, path):
+        self.backend = SQLiteBackend(path, "migrations-test")
+
+    def get_connection(self):
+        return self.backend.connection()
+
+    def query(self, sql, params=()):
+        with self.backend.connection(readonly=True) as conn:
+            return [tuple(row) for row in conn.execute(sql, params).fetchall()]
+
+
+@pytest.fixture
+def target(tmp_path):
+    target = SQLiteTarget(str(tmp_path / "shared.db"))
+    yield target
+    target.backend.close()
+
+
+def create_table(table):
+    return lambda cursor, mode: cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER)")
+
+
+def never(cursor, mode):
+    raise AssertionError("migration ran twice")
+
+
+def test_runners_sharing_a_database_keep_their_own_versions(target):
+    core = MigrationRunner("core", [Migration(1, "table a", create_table("a")), Migration(2, "table b", create_table("b"))])
+    email = MigrationRunner("email", [Migration(1, "table c", create_table("c"))])
+
+    assert core.run(target) == 2
+    # Version 1 is already recorded, but for another schema
+    assert email.run(target) == 1
+    assert core.run(target) == 0
+    assert email.run(target) == 0
+
+    assert target.query("SELECT schema, version FROM schema_version ORDER BY schema, version") == [
+        ("core", 1), ("core", 2), ("email", 1)
+    ]
+    tables = {row[0] for row in target.query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"a", "b", "c"} <= tables
+
+
+def test_failed_migration_is_retried_on_the_next_run(target):
+    def broken(cursor, mode):
+        cursor.execute("CREATE TABLE d (id INTEGER)")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        MigrationRunner("core", [Migration(1, "table d", broken)]).run(target)
+    assert target.query("SELECT version FROM schema_version WHERE schema = 'core'") == []
+    assert target.query("SELECT name FROM sqlite_master WHERE name = 'd'") == []
+
+    assert MigrationRunner("core", [Migration(1, "table d", create_table("d"))]).run(target) == 1
+
+
+def test_versions_must_increase():
+    with pytest.raises(ValueError):
+        MigrationRunner("core", [Migration(2, "b", never), Migration(1, "a", never)])
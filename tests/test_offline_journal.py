@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from bot.core.circuit import CircuitBreaker
+from bot.core.database import Database
+from bot.core.journal import WriteJournal
+
+
+class Outage:
+    """Circuit breaker whose probe fails until ``end()``."""
+
+    def __init__(self):
+        self._up = threading.Event()
+        self.breaker = CircuitBreaker("profiles", self._probe, probe_interval=0.01)
+
+    def _probe(self):
+        if not self._up.is_set():
+            raise ConnectionError("still down")
+
+    def start(self):
+        self.breaker.trip(ConnectionError("connection refused"))
+
+    def end(self):
+        self._up.set()
+
+
+def wait_for_replay(journal, timeout=5):
+    deadline = time.monotonic() + timeout
+    while journal.pending or journal.stats()["replaying"]:
+        assert time.monotonic() < deadline, "journal did not drain"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def offline(database, tmp_path):
+    """``database`` with the breaker and offline journal it would have on PostgreSQL."""
+    outage = Outage()
+    database.breaker = outage.breaker
+    database.journal = WriteJournal("profiles", database._replay_journaled, path=str(tmp_path / "journal.db"))
+    outage.breaker.on_recover(database.journal.start_replay)
+    yield outage
+    outage.end()
+    wait_for_replay(database.journal)
+    database.journal.close()
+
+
+def test_queued_leave_replays_and_deletes_the_emptied_team(database, offline):
+    team_id, _ = database.create_team("Solo", "1", "one")
+    assert database.get_team_by_member("1")["id"] == team_id
+
+    offline.start()
+    assert database.leave_team("1", team_id) == Database.LEAVE_QUEUED
+    # The pending leave already shows in reads
+    assert database.get_team_by_member("1") is None
+    assert database.journal.pending == 1
+
+    offline.end()
+    wait_for_replay(database.journal)
+
+    assert database.journal.stats()["replayed"] == 1
+    assert database.get_team_by_member("1") is None
+    assert database.get_team_members(team_id) == []
+    with database.get_connection(readonly=True) as conn:
+        assert conn.execute("SELECT 1 FROM teams WHERE id = ?", (team_id,)).fetchone() is None
+
+
+def test_queued_leave_keeps_a_team_that_still_has_members(database, offline):
+    team_id, _ = database.create_team("Pair", "1", "one")
+    database.add_team_member(team_id, "2", "two")
+
+    offline.start()
+    assert database.leave_team("2", team_id) == Database.LEAVE_QUEUED
+    offline.end()
+    wait_for_replay(database.journal)
+
+    assert [member["discord_id"] for member in database.get_team_members(team_id)] == ["1"]
+    assert database.get_team_by_member("2") is None
+
+
+def test_writes_stay_in_order_while_the_journal_drains(database, offline):
+    team_id, _ = database.create_team("Pair", "1", "one")
+    database.add_team_member(team_id, "2", "two")
+
+    offline.start()
+    database.upsert_profile("2", "two", "Two", "python", "ai")
+    assert database.leave_team("2", team_id) == Database.LEAVE_QUEUED
+    database.upsert_profile("2", "two", "Two Renamed", "python, rust", "ai")
+    offline.end()
+    wait_for_replay(database.journal)
+
+    assert database.journal.stats()["replayed"] == 3
+    assert database.get_profile("2")["name"] == "Two Renamed"
+    assert database.get_team_by_member("2") is None
+
+
+def test_leave_outside_an_outage_runs_directly(database, offline):
+    team_id, _ = database.create_team("Solo", "1", "one")
+    assert database.leave_team("1", team_id) == Database.LEAVE_LEFT
+    assert database.leave_team("1", team_id) == Database.LEAVE_NOT_IN_TEAM
+    assert database.journal.stats()["appended"] == 0
+
+
+def test_expired_cache_entries_answer_reads_during_an_outage(database, offline, monkeypatch):
+    team_id, _ = database.create_team("Solo", "1", "one")
+    database.upsert_profile("1", "one", "One", "python", "ai")
+    # Store entries that are already expired
+    for cache in (database.profile_cache, database.team_cache.members, database.team_cache.teams):
+        cache.ttl = 0
+    database.profile_cache.clear()
+    database.team_cache.clear()
+    database.get_profile("1")
+    database.get_team_snapshot("1")
+
+    offline.start()
+
+    def unavailable(*args, **kwargs):
+        database.breaker.before_call()
+
+    monkeypatch.setattr(database, "get_connection", unavailable)
+    assert database.get_profile("1")["name"] == "One"
+    assert database.get_team_by_member("1")["id"] == team_id
+    assert database.leave_team("1", team_id) == Database.LEAVE_QUEUED
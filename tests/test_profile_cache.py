@@ -0,0 +1,98 @@
+from bot.core.cache import MISSING, LRUCache
+
+
+def test_read_fill_is_dropped_after_a_write():
+    cache = LRUCache(10, 60)
+    generation = cache.generation
+    cache.put("1", "fresh")
+    cache.put("1", "stale", generation)
+    assert cache.get("1") == "fresh"
+
+    cache.put("2", "read", cache.generation)
+    assert cache.get("2") == "read"
+
+
+def test_invalidate_drops_a_concurrent_read_fill():
+    cache = LRUCache(10, 60)
+    generation = cache.generation
+    cache.invalidate("1")
+    cache.put("1", "stale", generation)
+    assert cache.get("1") is MISSING
+
+
+def interleave_upsert(database, monkeypatch, name):
+    """Run an upsert of profile "1" right after the next profile row is read, before it is cached."""
+    row_to_dict = database._row_to_dict
+    done = []
+
+    def read_then_write(row):
+        profile = row_to_dict(row)
+        if not done:
+            done.append(True)
+            database.upsert_profile("1", "one", name, "python", "ai")
+        return profile
+
+    monkeypatch.setattr(database, "_row_to_dict", read_then_write)
+    return done
+
+
+def test_slow_get_profile_does_not_overwrite_a_newer_upsert(database, monkeypatch):
+    database.upsert_profile("1", "one", "Old", "python", "ai")
+    database.profile_cache.clear()
+
+    done = interleave_upsert(database, monkeypatch, "New")
+    # The read itself returns what it saw
+    assert database.get_profile("1")["name"] == "Old"
+    assert done
+    assert database.get_profile("1")["name"] == "New"
+
+
+def test_slow_get_profiles_does_not_overwrite_a_newer_upsert(database, monkeypatch):
+    database.upsert_profile("1", "one", "Old", "python", "ai")
+    database.upsert_profile("2", "two", "Two", "design", "ai")
+    database.profile_cache.clear()
+
+    interleave_upsert(database, monkeypatch, "New")
+    database.get_profiles(["1", "2"])
+    assert database.get_profile("1")["name"] == "New"
+
+
+def test_expired_entries_move_to_the_stale_store_once():
+    cache = LRUCache(10, 0)
+    cache.put("1", "old")
+    assert cache.get("1") is MISSING
+    assert cache.get("1") is MISSING
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["size"] == 0
+    assert stats["stale"] == 1
+    # Still there for reads during an outage
+    assert cache.peek("1") == "old"
+
+
+def test_writes_and_invalidation_clear_stale_values():
+    cache = LRUCache(10, 0)
+    cache.put("1", "old")
+    cache.put("2", "old")
+    cache.get("1")
+    cache.get("2")
+
+    cache.ttl = 60
+    cache.put("1", "new")
+    assert cache.peek("1") == "new"
+    assert cache.get("1") == "new"
+
+    cache.invalidate("2")
+    assert cache.peek("2") is MISSING
+    assert cache.stats()["stale"] == 0
+
+
+def test_stale_store_is_bounded():
+    cache = LRUCache(2, 0)
+    for key in "abc":
+        cache.put(key, key)
+        cache.get(key)
+    assert cache.stats()["stale"] == 2
+    assert cache.peek("a") is MISSING
+    assert cache.peek("c") == "c"
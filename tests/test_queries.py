@@ -0,0 +1,79 @@
+import re
+
+import psycopg2.errors
+import psycopg2.extensions
+import pytest
+
+from bot.core.database import Database
+from bot.core.queries import QueryRegistry
+from bot.email.database import EmailDatabase
+
+STAR = re.compile(r"(SELECT|RETURNING|\w+\.)\s*\*", re.IGNORECASE)
+
+
+class FakeConnection:
+    def __init__(self, status=psycopg2.extensions.TRANSACTION_STATUS_IDLE):
+        self.status = status
+
+    def get_transaction_status(self):
+        return self.status
+
+
+class StalePlanCursor:
+    """Raises "cached plan must not change result type" for the first ``stale`` EXECUTEs."""
+
+    def __init__(self, connection, stale=1):
+        self.connection = connection
+        self.stale = stale
+        self.prepared = set()
+        self.log = []
+        self.rowcount = 1
+        self._row = None
+
+    def execute(self, sql, params=()):
+        self.log.append(sql.split()[0])
+        if sql.startswith("SELECT 1 FROM pg_prepared_statements"):
+            self._row = (1,) if params[0] in self.prepared else None
+        elif sql.startswith("DEALLOCATE"):
+            self.prepared.discard(sql.split()[1])
+        elif sql.startswith("PREPARE"):
+            self.prepared.add(sql.split()[1])
+        elif sql.startswith("EXECUTE") and self.stale:
+            self.stale -= 1
+            raise psycopg2.errors.FeatureNotSupported("cached plan must not change result type")
+
+    def fetchone(self):
+        return self._row
+
+
+@pytest.fixture
+def registry():
+    return QueryRegistry("test", {"one": "SELECT id, name FROM things WHERE id = %s"}, prepare=True)
+
+
+def test_stale_plan_is_reprepared_and_retried_once(registry):
+    cursor = StalePlanCursor(FakeConnection())
+    registry.execute(cursor, "postgres", "one", (1,))
+
+    assert cursor.log == ["SELECT", "PREPARE", "EXECUTE", "SELECT", "DEALLOCATE", "PREPARE", "EXECUTE"]
+
+
+def test_stale_plan_twice_in_a_row_raises(registry):
+    cursor = StalePlanCursor(FakeConnection(), stale=2)
+    with pytest.raises(psycopg2.errors.FeatureNotSupported):
+        registry.execute(cursor, "postgres", "one", (1,))
+
+
+def test_stale_plan_inside_a_transaction_is_not_retried(registry):
+    # The error aborted the transaction, so a retry could only fail again
+    cursor = StalePlanCursor(FakeConnection(psycopg2.extensions.TRANSACTION_STATUS_INERROR))
+    with pytest.raises(psycopg2.errors.FeatureNotSupported):
+        registry.execute(cursor, "postgres", "one", (1,))
+    assert cursor.log.count("EXECUTE") == 1
+
+
+@pytest.mark.parametrize("queries", [Database.QUERIES, EmailDatabase.QUERIES], ids=["core", "email"])
+def test_statements_name_their_columns(queries):
+    for name, sql in queries.items():
+        for text in sql.values() if isinstance(sql, dict) else [sql]:
+            assert not STAR.search(text), name
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from config import Config
+from bot.core.recommender import TeammateRecommender
+
+
+def tags(discord_id, skills=(), interests=()):
+    return [{"discord_id": discord_id, "kind": "skill", "tag": tag} for tag in skills] + [
+        {"discord_id": discord_id, "kind": "interest", "tag": tag} for tag in interests
+    ]
+
+
+def recommender(tag_rows, membership_rows=(), refresh_interval=0):
+    return TeammateRecommender(lambda: (tag_rows, list(membership_rows)), refresh_interval=refresh_interval)
+
+
+def ranked(results):
+    return [result["discord_id"] for result in results]
+
+
+def test_complementary_skills_and_shared_interests_rank_first():
+    rows = (
+        tags("me", ["python", "sql"], ["ai", "health"])
+        + tags("clone", ["python", "sql"], ["ai", "health"])
+        + tags("complement", ["design", "react"], ["ai", "health"])
+        + tags("half", ["python", "design"], ["ai"])
+        + tags("stranger", ["design", "react"], ["gaming"])
+    )
+    results = recommender(rows).recommend("me", ["python", "sql"], ["ai", "health"], limit=10)
+
+    # The stranger brings the same skills as "complement" but shares no interest, so even a clone beats it
+    assert ranked(results) == ["complement", "half", "clone", "stranger"]
+    best = results[0]
+    assert best["complement"] == pytest.approx(0.5)
+    assert best["interest_similarity"] == pytest.approx(1.0)
+    assert sorted(best["brings"]) == ["design", "react"]
+    # A clone adds no skills and only scores on interests
+    clone = results[2]
+    assert clone["complement"] == 0
+    assert clone["brings"] == []
+    assert clone["score"] == pytest.approx(TeammateRecommender.INTEREST_WEIGHT)
+
+
+def test_scores_match_the_documented_formula():
+    rows = tags("me", ["a", "b"], ["x", "y"]) + tags("c", ["b", "c", "d"], ["y", "z"])
+    result, = recommender(rows).recommend("me", ["a", "b"], ["x", "y"])
+
+    complement = 2 / 4  # {c, d} out of {a, b, c, d}
+    interests = 1 / 2   # |{y}| / sqrt(2 * 2)
+    assert result["complement"] == pytest.approx(complement)
+    assert result["interest_similarity"] == pytest.approx(interests)
+    assert result["score"] == pytest.approx(0.6 * complement + 0.4 * interests)
+
+
+def test_self_teammates_and_full_teams_are_excluded(monkeypatch):
+    monkeypatch.setattr(Config, "TEAM_MAX_SIZE", 3)
+    rows = (
+        tags("me", ["python"], ["ai"])
+        + tags("teammate", ["design"], ["ai"])
+        + tags("full", ["design"], ["ai"])
+        + tags("open", ["design"], ["ai"])
+        + tags("free", ["design"], ["ai"])
+    )
+    memberships = [
+        {"discord_id": "me", "team_id": 1, "size": 2},
+        {"discord_id": "teammate", "team_id": 1, "size": 2},
+        {"discord_id": "full", "team_id": 2, "size": 3},
+        {"discord_id": "open", "team_id": 3, "size": 2},
+    ]
+    results = recommender(rows, memberships).recommend("me", ["python"], ["ai"], limit=10)
+    assert ranked(results) == ["free", "open"]
+
+
+def test_limit_and_zero_scores():
+    rows = tags("me", ["python"], ["ai"]) + tags("clone", ["python"]) + [
+        row for i in range(5) for row in tags(f"c{i}", ["design"], ["ai"])
+    ]
+    engine = recommender(rows)
+    assert len(engine.recommend("me", ["python"], ["ai"], limit=3)) == 3
+    # The clone brings nothing and shares nothing, so it is never suggested
+    assert "clone" not in ranked(engine.recommend("me", ["python"], ["ai"], limit=10))
+    assert engine.recommend("me", ["python"], ["ai"], limit=0) == []
+
+
+def test_marked_dirty_index_is_rebuilt_in_the_background():
+    rows = tags("me", ["python"], ["ai"]) + tags("a", ["design"], ["ai"])
+    engine = recommender(rows)
+    assert ranked(engine.recommend("me", ["python"], ["ai"])) == ["a"]
+
+    rows += tags("b", ["design", "react"], ["ai"])
+    engine.mark_dirty()
+    deadline = time.monotonic() + 5
+    while engine.stats()["profiles"] < 3:
+        assert time.monotonic() < deadline, "index was not rebuilt"
+        engine.current()
+        time.sleep(0.01)
+    assert ranked(engine.recommend("me", ["python"], ["ai"])) == ["b", "a"]
+
+
+def test_database_recommendations_follow_profile_changes(database):
+    database.upsert_profile("1", "one", "One", "python, sql", "ai")
+    database.upsert_profile("2", "two", "Two", "python, sql", "ai")
+    database.upsert_profile("3", "three", "Three", "design", "ai")
+    database.recommender.refresh_interval = 0
+
+    results = database.recommend_teammates("1")
+    assert ranked(results) == ["3", "2"]
+    assert results[0]["name"] == "Three"
+    assert results[0]["brings"] == ["design"]
+
+    # Once "3" joins a full team it drops out of the suggestions
+    team_id, _ = database.create_team("Full", "3", "three")
+    for member_id in range(10, 10 + Config.TEAM_MAX_SIZE - 1):
+        database.add_team_member(team_id, str(member_id), f"user{member_id}")
+    database.recommender._build()
+    assert ranked(database.recommend_teammates("1")) == ["2"]
+    assert database.recommend_teammates("404") is None
@@ -0,0 +1,45 @@
+import pytest
+
+
+def tag_counts(database, kind):
+    with database.get_connection(readonly=True) as conn:
+        rows = conn.execute("SELECT tag, count FROM tag_counts WHERE kind = ?", (kind,)).fetchall()
+    return {row["tag"]: row["count"] for row in rows}
+
+
+def test_rolled_back_upsert_leaves_the_vocabulary_alone(database, monkeypatch):
+    database.upsert_profile("1", "one", "One", "python", "ai")
+    vocabulary = database._get_tag_vocabulary("skill")
+
+    update_profile_stats = database._update_profile_stats
+
+    def fail_after_stats(*args):
+        update_profile_stats(*args)
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(database, "_update_profile_stats", fail_after_stats)
+    with pytest.raises(RuntimeError):
+        database.upsert_profile("2", "two", "Two", "kotlin", "ai")
+    with pytest.raises(RuntimeError):
+        database.delete_profile("1")
+
+    assert "kotlin" not in vocabulary
+    assert "python" in vocabulary
+    assert tag_counts(database, "skill") == {"python": 1}
+
+
+def test_last_holder_leaving_removes_only_that_tag(database):
+    database.upsert_profile("1", "one", "One", "python, rust", "ai")
+    database.upsert_profile("2", "two", "Two", "python", "ai")
+    vocabulary = database._get_tag_vocabulary("skill")
+
+    database.upsert_profile("1", "one", "One", "python", "ai")
+    assert tag_counts(database, "skill") == {"python": 2}
+    assert "rust" not in vocabulary
+
+    database.delete_profile("2")
+    assert tag_counts(database, "skill") == {"python": 1}
+    assert "python" in vocabulary
+
+    database.upsert_profile("3", "three", "Three", "rust", "ai")
+    assert "rust" in vocabulary
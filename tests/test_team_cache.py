@@ -0,0 +1,102 @@
+import pytest
+
+from bot.core.cache import MISSING, TeamCache
+
+
+def snapshot(team_id, *member_ids):
+    return {
+        "team": {"id": team_id},
+        "members": [{"discord_id": member_id} for member_id in member_ids],
+        "owner_name": member_ids[0],
+    }
+
+
+def test_snapshot_read_before_a_write_is_not_stored():
+    cache = TeamCache(100, 60)
+    generation = cache.generation
+    cache.invalidate_member("1")
+    cache.put_snapshot("1", snapshot(7, "1", "2"), generation)
+    assert cache.get_snapshot("1") is MISSING
+
+    cache.put_snapshot("1", snapshot(7, "1", "2"), cache.generation)
+    assert cache.get_snapshot("2")["team"]["id"] == 7
+
+
+def test_invalidating_a_member_drops_their_whole_team():
+    cache = TeamCache(100, 60)
+    cache.put_snapshot("1", snapshot(7, "1", "2"), cache.generation)
+    cache.put_snapshot("3", None, cache.generation)
+
+    cache.invalidate_member("2")
+    assert cache.get_snapshot("1") is MISSING
+    assert cache.get_team(7) is MISSING
+    # Unrelated entries survive
+    assert cache.get_snapshot("3") is None
+
+
+@pytest.fixture
+def team(database):
+    """Team owned by "1" with member "2", both rosters already cached."""
+    database.upsert_profile("1", "one", "One", "python", "ai")
+    database.upsert_profile("2", "two", "Two", "design", "ai")
+    team_id, _ = database.create_team("Builders", "1", "one")
+    database.add_team_member(team_id, "2", "two")
+    database.get_team_snapshot("1")
+    database.get_team_snapshot("2")
+    return team_id
+
+
+def member_ids(database, discord_id):
+    return [member["discord_id"] for member in database.get_team_snapshot(discord_id)["members"]]
+
+
+def test_cached_snapshots_answer_without_the_database(database, team, monkeypatch):
+    def no_connection(*args, **kwargs):
+        raise AssertionError("snapshot should come from the cache")
+
+    monkeypatch.setattr(database, "get_connection", no_connection)
+    assert member_ids(database, "1") == ["1", "2"]
+    assert database.get_team_members(team)[1]["discord_id"] == "2"
+
+
+def test_join_updates_every_members_view(database, team):
+    database.upsert_profile("3", "three", "Three", "rust", "ai")
+    assert database.get_team_snapshot("3") is None
+
+    database.add_team_member(team, "3", "three")
+    assert member_ids(database, "1") == ["1", "2", "3"]
+    assert database.get_team_snapshot("3")["team"]["id"] == team
+
+
+def test_leave_updates_the_remaining_members(database, team):
+    assert database.leave_team("2", team) == database.LEAVE_LEFT
+    assert member_ids(database, "1") == ["1"]
+    assert database.get_team_snapshot("2") is None
+
+
+def test_owner_rename_and_transfer_reach_cached_snapshots(database, team):
+    database.upsert_profile("1", "one", "One Renamed", "python", "ai")
+    assert database.get_team_snapshot("2")["owner_name"] == "One Renamed"
+
+    database.transfer_team_ownership(team, "2")
+    snapshot = database.get_team_snapshot("1")
+    assert snapshot["team"]["owner_id"] == "2"
+    assert snapshot["owner_name"] == "Two"
+
+
+def test_deleted_team_is_not_served_from_cache(database, team):
+    database.delete_team(team)
+    assert database.get_team_snapshot("1") is None
+    assert database.get_team_snapshot("2") is None
+
+
+def test_returned_snapshots_are_copies(database, team):
+    database.get_team_snapshot("1")["members"].clear()
+    assert member_ids(database, "1") == ["1", "2"]
+
+
+def test_deleting_the_owners_profile_reaches_cached_snapshots(database, team):
+    assert database.get_team_snapshot("2")["owner_name"] == "One"
+    database.delete_profile("1")
+    # Without a profile the owner shows up by id
+    assert database.get_team_snapshot("2")["owner_name"] == "1"
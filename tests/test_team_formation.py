@@ -0,0 +1,53 @@
+import pytest
+
+from bot.core.team_formation import form_teams, team_sizes
+
+
+def test_team_sizes_stay_within_one():
+    assert team_sizes(10, 4) == [4, 3, 3]
+    assert team_sizes(8, 4) == [4, 4]
+    assert team_sizes(1, 4) == []
+
+
+def test_form_teams_places_everyone_once():
+    people = [{"skills": [f"s{i % 5}"], "interests": [f"i{i % 3}"]} for i in range(11)]
+    teams, score = form_teams(people, 4)
+    assert sorted(i for team in teams for i in team) == list(range(11))
+    assert score["coverage"] >= score["baseline"]["coverage"]
+
+
+@pytest.fixture
+def teamless(database):
+    for i in range(1, 8):
+        database.upsert_profile(str(i), f"user{i}", f"User {i}", f"skill{i % 3}", "ai")
+    return database
+
+
+def test_confirming_creates_exactly_the_preview(teamless):
+    preview = teamless.auto_form_teams(4)
+    planned = [[member["discord_id"] for member in team] for team in preview["teams"]]
+    assert preview["unplaced"] == []
+
+    created = teamless.create_formed_teams(planned)
+    assert [team["owner_id"] for team in created] == [team[0] for team in planned]
+    for team, ids in zip(created, planned):
+        assert {member["discord_id"] for member in teamless.get_team_members(team["id"])} == set(ids)
+    assert teamless.auto_form_teams(4)["unassigned"] == 0
+
+
+def test_stale_preview_writes_nothing(teamless):
+    preview = teamless.auto_form_teams(4)
+    planned = [[member["discord_id"] for member in team] for team in preview["teams"]]
+    teamless.create_team("Elsewhere", planned[0][0], "someone")
+
+    with pytest.raises(RuntimeError):
+        teamless.create_formed_teams(planned)
+    with teamless.get_connection(readonly=True) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0] == 1
+
+
+def test_a_lone_user_is_reported_as_unplaced(database):
+    database.upsert_profile("1", "loner", "Loner", "python", "ai")
+    preview = database.auto_form_teams(4)
+    assert preview["teams"] == []
+    assert [person["discord_username"] for person in preview["unplaced"]] == ["loner"]
@@ -0,0 +1,59 @@
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from config import Config
+from bot.core.async_database import AsyncDatabase
+from bot.core.database import Database
+
+CAP = 100
+ATTEMPTS = 500
+
+
+@pytest.mark.parametrize("batched", [False, True], ids=["direct", "batched"])
+def test_concurrent_joins_respect_the_cap(tmp_path, monkeypatch, batched):
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(tmp_path / "profiles.db"))
+    monkeypatch.setattr(Config, "WRITE_BATCH_ENABLED", batched)
+    database = Database()
+    async_db = AsyncDatabase(database, max_workers=16, name="test")
+    try:
+        task_id = database.create_volunteer_task("Stage crew", "1", "creator", max_volunteers=CAP)
+        # 250 users, each trying twice
+        users = [str(1000 + i % (ATTEMPTS // 2)) for i in range(ATTEMPTS)]
+
+        async def join_all():
+            return await asyncio.gather(*(
+                async_db.join_volunteer_task(task_id, user, f"user{user}") for user in users
+            ))
+
+        results = asyncio.run(join_all())
+
+        outcomes = defaultdict(list)
+        for user, result in zip(users, results):
+            outcomes[user].append(result)
+        joined = {user for user, results in outcomes.items() if Database.JOIN_JOINED in results}
+
+        participants = database.get_volunteer_participants(task_id)
+        assert len(participants) == CAP
+        assert {p["discord_id"] for p in participants} == joined
+        for user, results in outcomes.items():
+            if user in joined:
+                assert sorted(results) == sorted([Database.JOIN_JOINED, Database.JOIN_DUPLICATE])
+            else:
+                assert results == [Database.JOIN_FULL, Database.JOIN_FULL]
+    finally:
+        async_db.shutdown()
+        database.close()
+
+
+def test_join_outcomes(database):
+    task_id = database.create_volunteer_task("Judging", "1", "creator", max_volunteers=1)
+
+    assert database.join_volunteer_task(task_id, "2", "two") == Database.JOIN_JOINED
+    assert database.join_volunteer_task(task_id, "2", "two") == Database.JOIN_DUPLICATE
+    assert database.join_volunteer_task(task_id, "3", "three") == Database.JOIN_FULL
+    assert database.join_volunteer_task(task_id + 1, "3", "three") == Database.JOIN_NOT_FOUND
+
+    database.set_volunteer_task_status(task_id, "closed")
+    assert database.join_volunteer_task(task_id, "4", "four") == Database.JOIN_CLOSED